@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+مقارنة خلفيات حفظ حالة التدفقات تحت الضغط المتزامن
+كل خيط يمثل تدفقاً يحفظ حالته بعد خطوة جديدة ثم يقرأها عبر واجهة FlowPersistence
+(save_state و load_state كما يستدعيهما ``@persist``)، عند 1 و16 و128 تدفقاً معاً.
+الخلفيات: SQLiteFlowPersistence من CrewAI كمرجع، و SQLiteWALFlowPersistence بلقطات
+كاملة وبالفروق، و LMDBFlowPersistence (تُتخطى إن لم تكن lmdb مثبتة). الناتج بصيغة JSON
+
+    python benchmarks/flow_persistence.py --output results.json
+    python benchmarks/flow_persistence.py --quick --only sqlite lmdb
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chat_interface"))
+
+from crewai.flow.persistence.sqlite import SQLiteFlowPersistence
+
+from flow_persistence import LMDBFlowPersistence, SQLiteWALFlowPersistence
+
+FULL_WORKERS = [1, 16, 128]
+QUICK_WORKERS = [1, 16]
+FULL_ROUNDS = 100
+QUICK_ROUNDS = 20
+# الفروق تُدمج في لقطة جديدة بعد هذا العدد من الخطوات
+COMPACT_AFTER = 32
+
+
+def _turn(worker, round_number):
+    return {
+        "user": f"سؤال {round_number} من الجلسة {worker} " * 4,
+        "bot": f"رد {round_number} " * 40,
+        "timestamp": "2026-01-01T00:00:00",
+    }
+
+
+def _flow_worker(persistence):
+    def run(worker, rounds):
+        flow_id = f"flow-{worker}"
+        # حالة تتراكم كما في تدفق يجمع الرسائل ومخرجات الأطقم
+        state = {"id": flow_id, "step": 0, "messages": []}
+        failed = 0
+        for round_number in range(rounds):
+            state["step"] = round_number
+            state["messages"].append(_turn(worker, round_number))
+            # SQLiteFlowPersistence يفتح اتصالاً جديداً مع كل عملية: تفشل بعضها
+            # بـ "database is locked" عند التزاحم
+            try:
+                persistence.save_state(flow_id, f"step_{round_number}", state)
+            except sqlite3.OperationalError:
+                failed += 1
+            try:
+                persistence.load_state(flow_id)
+            except sqlite3.OperationalError:
+                failed += 1
+        return failed
+
+    return run
+
+
+def _open_backend(name, directory):
+    """(دالة العمل، دالة الإغلاق) للخلفية"""
+    if name == "sqlite":
+        persistence = SQLiteFlowPersistence(os.path.join(directory, "flows.db"))
+        return _flow_worker(persistence), lambda: None
+    if name == "lmdb":
+        persistence = LMDBFlowPersistence(os.path.join(directory, "flows"))
+    else:
+        persistence = SQLiteWALFlowPersistence(
+            os.path.join(directory, "flows.db"),
+            compact_after=COMPACT_AFTER if name == "wal_delta" else None,
+        )
+    return _flow_worker(persistence), persistence.close
+
+
+def _lmdb_available():
+    try:
+        import lmdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+BACKENDS = ["sqlite", "wal", "wal_delta", "lmdb"]
+
+
+def bench(name, workers, rounds, repeat):
+    samples, failed = [], 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            run, close = _open_backend(name, directory)
+            errors, failures = [], []
+
+            def target(worker):
+                try:
+                    failures.append(run(worker, rounds))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=target, args=(worker,)) for worker in range(workers)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            close()
+            if errors:
+                raise errors[0]
+            failed += sum(failures)
+            # كل جولة = حفظ + قراءة
+            samples.append(workers * rounds * 2 / elapsed)
+    return samples, failed
+
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مقارنة خلفيات حفظ حالة التدفقات تحت الضغط المتزامن")
+    parser.add_argument("--only", nargs="*", choices=BACKENDS, help="قياس خلفيات محددة فقط")
+    parser.add_argument("--repeat", type=int, default=3, help="عدد مرات تكرار كل قياس")
+    parser.add_argument("--quick", action="store_true", help="أحجام صغيرة للتحقق السريع")
+    parser.add_argument("--output", help="ملف JSON للنتائج (الافتراضي: المخرج القياسي)")
+    args = parser.parse_args()
+
+    backends = args.only or BACKENDS
+    if "lmdb" in backends and not _lmdb_available():
+        print("⚠️  مكتبة lmdb غير مثبتة، تم تخطي خلفية LMDB", file=sys.stderr)
+        backends = [name for name in backends if name != "lmdb"]
+    workers = QUICK_WORKERS if args.quick else FULL_WORKERS
+    rounds = QUICK_ROUNDS if args.quick else FULL_ROUNDS
+
+    report = {
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "rounds_per_flow": rounds,
+        "results": [],
+    }
+    with contextlib.redirect_stdout(sys.stderr):
+        for name in backends:
+            for count in workers:
+                print(f"⏱️  {name} (flows={count})...", file=sys.stderr)
+                samples, failed = bench(name, count, rounds, args.repeat)
+                report["results"].append({
+                    "backend": name,
+                    "flows": count,
+                    "operations_per_second": summarize(samples),
+                    "failed_operations": failed,
+                })
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
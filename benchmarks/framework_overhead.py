@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+قياس الوقت الذي يستهلكه إطار CrewAI نفسه بعيداً عن زمن النماذج
+يستخدم نموذجاً وهمياً (BaseLLM) يرد فوراً وبشكل حتمي، فيعمل القياس دون
+اتصال بالشبكة ويُكتب الناتج بصيغة JSON لمقارنته بين الإصدارات
+
+    python benchmarks/framework_overhead.py --output results.json
+    python benchmarks/framework_overhead.py --quick --only crew_tasks event_handlers
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+# لا قياس عن بعد أثناء القياس
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import crewai
+from crewai import Agent, Crew, Process, Task
+from crewai.flow.persistence.sqlite import SQLiteFlowPersistence
+from crewai.lite_agent import LiteAgent
+from crewai.llms.base_llm import BaseLLM
+from crewai.tools import BaseTool
+from crewai.utilities.converter import convert_to_model
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from pydantic import BaseModel
+
+FULL_SIZES = {
+    "crew_tasks": [1, 10, 100, 500],
+    "crew_agents": [1, 10, 50],
+    "lite_agent_tools": [1, 10, 100],
+    "tool_dispatch": [1, 10, 100],
+    "converter_fields": [1, 10, 100],
+    "event_handlers": [1, 10, 100],
+    "flow_persistence_fields": [1, 10, 100],
+}
+
+QUICK_SIZES = {name: sizes[:2] for name, sizes in FULL_SIZES.items()}
+
+
+class StubLLM(BaseLLM):
+    """
+    نموذج وهمي حتمي: يطلب استخدام الأداة ``tool_name`` في أول استدعاء
+    إن حُددت، ثم يرد بإجابة نهائية ثابتة
+    """
+
+    def __init__(self, tool_name=None):
+        super().__init__(model="stub-model")
+        self.tool_name = tool_name
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        self.calls += 1
+        if self.tool_name and self.calls == 1:
+            return (
+                "Thought: I should use the tool\n"
+                f"Action: {self.tool_name}\n"
+                'Action Input: {"query": "benchmark"}'
+            )
+        return "Thought: I now know the final answer\nFinal Answer: done"
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_stop_words(self):
+        return False
+
+    def get_context_window_size(self):
+        return 8192
+
+
+class EchoTool(BaseTool):
+    name: str = "echo"
+    description: str = "Echo the query back"
+
+    def _run(self, query: str = "") -> str:
+        return query
+
+
+def make_tools(count):
+    """أدوات بسيطة بأسماء فريدة"""
+    return [
+        EchoTool(name=f"echo_{i}", description=f"Echo tool number {i}")
+        for i in range(count)
+    ]
+
+
+def make_agent(index, llm, tools=()):
+    return Agent(
+        role=f"Agent {index}",
+        goal="Finish the benchmark task",
+        backstory="A benchmark agent",
+        llm=llm,
+        tools=list(tools),
+        verbose=False,
+    )
+
+
+def timed(setup, run, repeat):
+    """تشغيل ``run`` على ما تُرجعه ``setup`` عدة مرات وإرجاع الأزمنة بالثواني"""
+    samples = []
+    for _ in range(repeat):
+        subject = setup()
+        started = time.perf_counter()
+        run(subject)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_crew_tasks(size, repeat):
+    def setup():
+        llm = StubLLM()
+        agent = make_agent(0, llm)
+        tasks = [
+            Task(description=f"Task {i}", expected_output="done", agent=agent)
+            for i in range(size)
+        ]
+        return Crew(agents=[agent], tasks=tasks, process=Process.sequential, verbose=False)
+
+    return timed(setup, lambda crew: crew.kickoff(), repeat)
+
+
+def bench_crew_agents(size, repeat):
+    def setup():
+        llm = StubLLM()
+        agents = [make_agent(i, llm) for i in range(size)]
+        tasks = [
+            Task(description=f"Task {i}", expected_output="done", agent=agent)
+            for i, agent in enumerate(agents)
+        ]
+        return Crew(agents=agents, tasks=tasks, process=Process.sequential, verbose=False)
+
+    return timed(setup, lambda crew: crew.kickoff(), repeat)
+
+
+def bench_lite_agent_tools(size, repeat):
+    def setup():
+        return LiteAgent(
+            role="Lite agent",
+            goal="Finish the benchmark task",
+            backstory="A benchmark agent",
+            llm=StubLLM(),
+            tools=make_tools(size),
+            verbose=False,
+        )
+
+    return timed(setup, lambda agent: agent.kickoff("Run the benchmark"), repeat)
+
+
+def bench_tool_dispatch(size, repeat):
+    """مهمة واحدة يستدعي فيها الوكيل أداة واحدة من بين ``size`` أداة"""
+
+    def setup():
+        tools = make_tools(size)
+        agent = make_agent(0, StubLLM(tool_name=tools[-1].name), tools)
+        task = Task(description="Use a tool", expected_output="done", agent=agent)
+        return Crew(agents=[agent], tasks=[task], verbose=False)
+
+    return timed(setup, lambda crew: crew.kickoff(), repeat)
+
+
+def bench_converter_fields(size, repeat, iterations=100):
+    model = type(
+        f"Output{size}",
+        (BaseModel,),
+        {"__annotations__": {f"field_{i}": int for i in range(size)}},
+    )
+    payload = "```json\n" + json.dumps({f"field_{i}": i for i in range(size)}) + "\n```"
+
+    def run(_):
+        for _ in range(iterations):
+            convert_to_model(payload, model, None, None)
+
+    return [sample / iterations for sample in timed(lambda: None, run, repeat)]
+
+
+def bench_event_handlers(size, repeat, iterations=1000):
+    class BenchmarkEvent(BaseEvent):
+        type: str = "benchmark_event"
+
+    event = BenchmarkEvent()
+
+    def run(_):
+        with crewai_event_bus.scoped_handlers():
+            for _ in range(size):
+                crewai_event_bus.on(BenchmarkEvent)(lambda source, event: None)
+            for _ in range(iterations):
+                crewai_event_bus.emit(None, event)
+
+    return [sample / iterations for sample in timed(lambda: None, run, repeat)]
+
+
+def bench_flow_persistence_fields(size, repeat, iterations=100):
+    state = {"id": str(uuid4()), **{f"field_{i}": "x" * 32 for i in range(size)}}
+
+    def setup():
+        directory = tempfile.mkdtemp()
+        return SQLiteFlowPersistence(os.path.join(directory, "flow_states.db"))
+
+    def run(persistence):
+        for i in range(iterations):
+            persistence.save_state(state["id"], f"step_{i}", state)
+        persistence.load_state(state["id"])
+
+    return [sample / iterations for sample in timed(setup, run, repeat)]
+
+
+BENCHMARKS = {
+    "crew_tasks": bench_crew_tasks,
+    "crew_agents": bench_crew_agents,
+    "lite_agent_tools": bench_lite_agent_tools,
+    "tool_dispatch": bench_tool_dispatch,
+    "converter_fields": bench_converter_fields,
+    "event_handlers": bench_event_handlers,
+    "flow_persistence_fields": bench_flow_persistence_fields,
+}
+
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def run_benchmarks(names, sizes, repeat):
+    results = []
+    for name in names:
+        for size in sizes[name]:
+            print(f"⏱️  {name} (size={size})...", file=sys.stderr)
+            results.append({
+                "benchmark": name,
+                "size": size,
+                "seconds": summarize(BENCHMARKS[name](size, repeat)),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس زمن إطار CrewAI بنموذج وهمي")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="تشغيل قياسات محددة فقط")
+    parser.add_argument("--repeat", type=int, default=3, help="عدد مرات تكرار كل قياس")
+    parser.add_argument("--quick", action="store_true", help="أحجام صغيرة للتحقق السريع")
+    parser.add_argument("--output", help="ملف JSON للنتائج (الافتراضي: المخرج القياسي)")
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    report = {
+        "crewai_version": crewai.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+    }
+    # مخرجات الإطار (اللوحات والسجلات) تُحوّل إلى stderr حتى يبقى JSON نظيفاً
+    with contextlib.redirect_stdout(sys.stderr):
+        report["results"] = run_benchmarks(args.only or list(BENCHMARKS), sizes, args.repeat)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+أداة كثيفة المعالجة من عدة أطقم في عملية واحدة: خيط الوكيل أم مجمع العمليات
+كل خيط يمثل طاقماً يستدعي الأداة نفسها عبر BaseTool.run، عند 1 و4 و16 خيطاً معاً.
+الأوضاع: BaseTool عادية (تمسك GIL) و ProcessPoolTool بعدد الأنوية. الناتج بصيغة JSON
+
+    python benchmarks/process_tools.py --output results.json
+    python benchmarks/process_tools.py --quick --only process
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chat_interface"))
+
+from crewai.tools import BaseTool
+
+from process_tools import ProcessPoolTool, ProcessToolExecutor
+
+FULL_WORKERS = [1, 4, 16]
+QUICK_WORKERS = [1, 4]
+FULL_CALLS = 20
+QUICK_CALLS = 4
+WORK = 200_000
+
+
+def _checksum(rounds: int) -> int:
+    total = 0
+    for i in range(rounds):
+        total = (total * 31 + i * i) % 1_000_003
+    return total
+
+
+class ThreadChecksum(BaseTool):
+    name: str = "checksum"
+    description: str = "CPU-bound checksum"
+
+    def _run(self, rounds: int) -> int:
+        return _checksum(rounds)
+
+
+class ProcessChecksum(ProcessPoolTool):
+    name: str = "checksum"
+    description: str = "CPU-bound checksum"
+
+    def _run(self, rounds: int) -> int:
+        return _checksum(rounds)
+
+
+MODES = ["thread", "process"]
+
+
+def bench(tool, workers, calls, repeat):
+    samples = []
+    for _ in range(repeat):
+        errors = []
+
+        def target():
+            try:
+                for _ in range(calls):
+                    tool.run(rounds=WORK)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=target) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        samples.append(workers * calls / elapsed)
+    return samples
+
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مقارنة تشغيل أداة كثيفة المعالجة في الخيط وفي مجمع العمليات")
+    parser.add_argument("--only", nargs="*", choices=MODES, help="قياس أوضاع محددة فقط")
+    parser.add_argument("--repeat", type=int, default=3, help="عدد مرات تكرار كل قياس")
+    parser.add_argument("--quick", action="store_true", help="أحجام صغيرة للتحقق السريع")
+    parser.add_argument("--output", help="ملف JSON للنتائج (الافتراضي: المخرج القياسي)")
+    args = parser.parse_args()
+
+    modes = args.only or MODES
+    workers = QUICK_WORKERS if args.quick else FULL_WORKERS
+    calls = QUICK_CALLS if args.quick else FULL_CALLS
+
+    executor = ProcessToolExecutor()
+    report = {
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "calls_per_worker": calls,
+        "results": [],
+    }
+    with contextlib.redirect_stdout(sys.stderr):
+        executor.warm()
+        tools = {
+            "thread": ThreadChecksum(),
+            "process": ProcessChecksum(process_executor=executor),
+        }
+        for mode in modes:
+            for count in workers:
+                print(f"⏱️  {mode} (workers={count})...", file=sys.stderr)
+                samples = bench(tools[mode], count, calls, args.repeat)
+                report["results"].append({
+                    "mode": mode,
+                    "workers": count,
+                    "calls_per_second": summarize(samples),
+                })
+    executor.shutdown()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@
 import os
 import json
 import asyncio
+import atexit
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, session
 from flask_socketio import SocketIO, emit
@@ -14,13 +15,62 @@ import speech_recognition as sr
 import pyttsx3
 import threading
 import uuid
+from functools import partial
 
 # استيراد نماذج CrewAI
 from crewai.llm import LLM
 from crewai.models.model_manager import HuggingFaceModelManager
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from async_tools import install_async_tools
+from coalescing_llm import CoalescingLLM, RequestCoalescer
+from conversation_store import ConversationStore
+from dispatcher import AsyncChatDispatcher, DispatcherBusyError, PendingReplies, SocketOutbox
+from event_dispatch import install_dispatch_table
+from event_queue import QueuedEventDispatcher
+from event_sink import EventSink
+from llm_pool import LLMPool
+from model_index import PERFORMANCE_LEVELS, ModelIndex
+from model_router import ModelRouter
+from response_cache import ResponseCache
+from streaming import ChunkCoalescer, forward_stream_chunk, resubscribe_chunk_handlers, stream_to
+from tool_input import install_tool_input_parser
+from tracing import create_tracer
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
+app.config['CHAT_MAX_CONCURRENCY'] = int(os.getenv('CHAT_MAX_CONCURRENCY', 64))
+app.config['CHAT_MAX_PENDING'] = int(os.getenv('CHAT_MAX_PENDING', 512))
+app.config['CHAT_REQUEST_TIMEOUT'] = float(os.getenv('CHAT_REQUEST_TIMEOUT', 120))
+app.config['CHAT_MAX_SESSIONS'] = int(os.getenv('CHAT_MAX_SESSIONS', 10000))
+app.config['CHAT_MAX_TURNS'] = int(os.getenv('CHAT_MAX_TURNS', 50))
+app.config['CHAT_SESSION_TTL'] = float(os.getenv('CHAT_SESSION_TTL', 3600))
+app.config['CHAT_MEMORY_LIMIT_MB'] = int(os.getenv('CHAT_MEMORY_LIMIT_MB', 64))
+app.config['CHAT_SPILL_PATH'] = os.getenv('CHAT_SPILL_PATH') or None
+app.config['CHAT_MODEL_POOL_SIZE'] = int(os.getenv('CHAT_MODEL_POOL_SIZE', 64))
+app.config['CHAT_MODEL_IDLE_TTL'] = float(os.getenv('CHAT_MODEL_IDLE_TTL', 900))
+app.config['CHAT_MODEL_LEVELS'] = tuple(
+    level.strip() for level in os.getenv('CHAT_MODEL_LEVELS', ','.join(PERFORMANCE_LEVELS)).split(',')
+    if level.strip()
+)
+app.config['CHAT_RESPONSE_CACHE'] = os.getenv('CHAT_RESPONSE_CACHE', '').lower() in ('1', 'true', 'yes')
+app.config['CHAT_CACHE_EMBEDDER'] = json.loads(os.getenv('CHAT_CACHE_EMBEDDER', 'null'))
+app.config['CHAT_CACHE_THRESHOLD'] = float(os.getenv('CHAT_CACHE_THRESHOLD', 0.95))
+app.config['CHAT_CACHE_TTL'] = float(os.getenv('CHAT_CACHE_TTL', 3600))
+app.config['CHAT_CACHE_MAX_ENTRIES'] = int(os.getenv('CHAT_CACHE_MAX_ENTRIES', 1024))
+app.config['CHAT_COALESCE_REQUESTS'] = os.getenv('CHAT_COALESCE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+app.config['CHAT_COALESCE_SAMPLED'] = os.getenv('CHAT_COALESCE_SAMPLED', '').lower() in ('1', 'true', 'yes')
+app.config['CHAT_EVENT_QUEUE_SIZE'] = int(os.getenv('CHAT_EVENT_QUEUE_SIZE', 0))
+app.config['CHAT_EVENT_OVERFLOW'] = os.getenv('CHAT_EVENT_OVERFLOW', 'drop')
+app.config['CHAT_STREAM_WINDOW_MS'] = float(os.getenv('CHAT_STREAM_WINDOW_MS', 50))
+app.config['CHAT_STREAM_MAX_BYTES'] = int(os.getenv('CHAT_STREAM_MAX_BYTES', 256))
+app.config['CHAT_CONSOLE_STREAM'] = os.getenv('CHAT_CONSOLE_STREAM', 'final_only')
+app.config['CHAT_EVENT_LOG_DIR'] = os.getenv('CHAT_EVENT_LOG_DIR') or None
+app.config['CHAT_TRACE_OTLP_ENDPOINT'] = os.getenv('CHAT_TRACE_OTLP_ENDPOINT') or None
+app.config['CHAT_TRACE_FILE'] = os.getenv('CHAT_TRACE_FILE') or None
+app.config['CHAT_EVENT_DISPATCH_TABLE'] = os.getenv('CHAT_EVENT_DISPATCH_TABLE', '').lower() in ('1', 'true', 'yes')
+app.config['CHAT_TOOL_INPUT_PARSER'] = os.getenv('CHAT_TOOL_INPUT_PARSER', '').lower() in ('1', 'true', 'yes')
+app.config['CHAT_ASYNC_TOOLS'] = os.getenv('CHAT_ASYNC_TOOLS', '').lower() in ('1', 'true', 'yes')
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 # إعداد محرك النطق
@@ -33,54 +83,105 @@ recognizer = sr.Recognizer()
 microphone = sr.Microphone()
 
 class ChatBot:
-    def __init__(self):
+    def __init__(self, store, llm_pool, levels=PERFORMANCE_LEVELS, response_cache=None):
         self.hf_manager = HuggingFaceModelManager()
-        self.current_model = None
-        self.conversation_history = []
+        self.model_index = ModelIndex(self.hf_manager, levels=levels)
+        self.router = ModelRouter(self.model_index)
+        self.store = store
+        self.llm_pool = llm_pool
+        self.response_cache = response_cache
         self.is_listening = False
         
-    def initialize_model(self, model_type="general"):
-        """تهيئة النموذج المحدد"""
+    def _load_model(self, model_type, stream=False):
+        """نموذج LLM جاهز لنوع المهمة، يختاره الموجّه حسب زمن الاستجابة والحمل"""
+        config = self.router.choose(model_type)
+        return self.llm_pool.get(config, stream=stream)
+    
+    def initialize_model(self, session_id, model_type="general"):
+        """تهيئة النموذج المحدد للجلسة"""
         try:
-            config = self.hf_manager.select_model(task_type=model_type)
-            self.current_model = LLM(
-                model=config["model"],
-                api_key=config["api_key"],
-                base_url=config["base_url"],
-                temperature=config["temperature"]
-            )
+            self._load_model(model_type)
+            self.store.set_model_type(session_id, model_type)
             return True, f"تم تحميل نموذج {model_type} بنجاح"
         except Exception as e:
             return False, f"خطأ في تحميل النموذج: {str(e)}"
     
-    def get_response(self, message, context=None):
+    def get_model(self, session_id, stream=False):
+        """النموذج المختار في الجلسة"""
+        model_type = self.store.get_model_type(session_id)
+        if model_type is None:
+            return None
+        return self._load_model(model_type, stream=stream)
+    
+    def _build_prompt(self, session_id, message, context=None):
+        """بناء الرسالة الكاملة مع السياق وتاريخ المحادثة"""
+        # إضافة السياق إذا كان متوفراً
+        if context:
+            full_message = f"السياق: {context}\n\nالسؤال: {message}"
+        else:
+            full_message = message
+        
+        # إضافة تاريخ المحادثة للسياق
+        recent_history = self.store.history(session_id, limit=5)  # آخر 5 رسائل
+        if recent_history:
+            history_text = "\n".join([f"المستخدم: {h['user']}\nالمساعد: {h['bot']}" 
+                                    for h in recent_history])
+            full_message = f"تاريخ المحادثة:\n{history_text}\n\nالرسالة الحالية: {message}"
+        
+        return full_message
+    
+    def get_response(self, session_id, message, context=None):
         """الحصول على رد من النموذج"""
-        if not self.current_model:
+        model = self.get_model(session_id)
+        if not model:
             return "يرجى تحديد نموذج أولاً"
         
         try:
-            # إضافة السياق إذا كان متوفراً
-            if context:
-                full_message = f"السياق: {context}\n\nالسؤال: {message}"
-            else:
-                full_message = message
-            
-            # إضافة تاريخ المحادثة للسياق
-            if self.conversation_history:
-                recent_history = self.conversation_history[-5:]  # آخر 5 رسائل
-                history_text = "\n".join([f"المستخدم: {h['user']}\nالمساعد: {h['bot']}" 
-                                        for h in recent_history])
-                full_message = f"تاريخ المحادثة:\n{history_text}\n\nالرسالة الحالية: {message}"
-            
-            response = self.current_model.call(full_message)
-            
-            # حفظ في تاريخ المحادثة
-            self.conversation_history.append({
-                'user': message,
-                'bot': response,
-                'timestamp': datetime.now().isoformat()
-            })
-            
+            full_message = self._build_prompt(session_id, message, context)
+            response, cache_key = None, None
+            if self.response_cache is not None:
+                response, cache_key = self.response_cache.lookup(model.model, full_message)
+            if response is None:
+                response = model.call(full_message)
+                if cache_key is not None:
+                    self.response_cache.store(cache_key, response)
+            self.store.append(session_id, message, response)
+            return response
+        except Exception as e:
+            return f"خطأ في الحصول على الرد: {str(e)}"
+    
+    async def aget_response(self, session_id, message, context=None, on_chunk=None):
+        """
+        الحصول على رد من النموذج دون حجز خيط الطلب.
+        عند تمرير ``on_chunk`` يُستخدم نموذج بث وتُمرر أجزاء الرد فور وصولها.
+        """
+        model = self.get_model(session_id, stream=on_chunk is not None)
+        if not model:
+            return "يرجى تحديد نموذج أولاً"
+        
+        try:
+            full_message = self._build_prompt(session_id, message, context)
+            response, cache_key = None, None
+            if self.response_cache is not None:
+                # البحث الدلالي قد يستدعي دالة التضمين: خارج حلقة الأحداث
+                response, cache_key = await asyncio.to_thread(
+                    self.response_cache.lookup, model.model, full_message
+                )
+            cached = response is not None
+            with stream_to(on_chunk):
+                if cached:
+                    if on_chunk is not None:
+                        on_chunk(response)
+                else:
+                    acall = getattr(model, "acall", None)
+                    if acall is not None:
+                        response = await acall(full_message)
+                    else:
+                        # LLM.call متزامن: يُنفذ في مجمع خيوط الموزع المحدود
+                        response = await asyncio.to_thread(model.call, full_message)
+            if not cached and cache_key is not None:
+                self.response_cache.store(cache_key, response)
+            self.store.append(session_id, message, response)
             return response
         except Exception as e:
             return f"خطأ في الحصول على الرد: {str(e)}"
@@ -98,12 +199,118 @@ class ChatBot:
             "arabic": "النموذج العربي"
         }
 
+# مخزن المحادثات لكل جلسة
+conversation_store = ConversationStore(
+    max_sessions=app.config['CHAT_MAX_SESSIONS'],
+    max_turns=app.config['CHAT_MAX_TURNS'],
+    ttl=app.config['CHAT_SESSION_TTL'],
+    max_bytes=app.config['CHAT_MEMORY_LIMIT_MB'] * 1024 * 1024,
+    spill_path=app.config['CHAT_SPILL_PATH']
+)
+
+# حساب معالجات كل صنف حدث مرة واحدة بدلاً من المرور على كل الأنواع مع كل رمز (اختياري)
+if app.config['CHAT_EVENT_DISPATCH_TABLE']:
+    install_dispatch_table(crewai_event_bus)
+
+# تحليل مدخلات الأدوات: JSON الصارم أولاً ثم الصيغة المكتشفة ثم الإصلاح (اختياري)
+if app.config['CHAT_TOOL_INPUT_PARSER']:
+    install_tool_input_parser()
+
+# الأدوات غير المتزامنة على حلقة kickoff_async أو حلقة خلفية مشتركة بدلاً من asyncio.run لكل استدعاء (اختياري)
+if app.config['CHAT_ASYNC_TOOLS']:
+    install_async_tools()
+
+# معالجات الأحداث البطيئة (العرض على الطرفية وغيره) في خيط خلفي (اختياري).
+# بث الأجزاء يبقى متزامناً لأنه يعتمد على سياق خيط الاستدعاء
+event_dispatcher = None
+if app.config['CHAT_EVENT_QUEUE_SIZE'] > 0:
+    event_dispatcher = QueuedEventDispatcher(
+        max_pending=app.config['CHAT_EVENT_QUEUE_SIZE'],
+        overflow=app.config['CHAT_EVENT_OVERFLOW']
+    )
+    event_dispatcher.defer_handlers(crewai_event_bus, keep=[forward_stream_chunk])
+
+# بقية معالجات الأجزاء (العرض على الطرفية) لا تحتاج كل رمز
+resubscribe_chunk_handlers(
+    crewai_event_bus,
+    app.config['CHAT_CONSOLE_STREAM'],
+    keep=[forward_stream_chunk]
+)
+
+# سجل دائم لكل الأحداث (اختياري)
+event_sink = None
+if app.config['CHAT_EVENT_LOG_DIR']:
+    event_sink = EventSink(app.config['CHAT_EVENT_LOG_DIR'])
+    event_sink.attach(crewai_event_bus)
+    atexit.register(event_sink.close)
+
+# مقاطع تتبع OpenTelemetry من أحداث البداية والنهاية (اختيارية)
+if app.config['CHAT_TRACE_OTLP_ENDPOINT'] or app.config['CHAT_TRACE_FILE']:
+    event_tracer, trace_provider = create_tracer(
+        otlp_endpoint=app.config['CHAT_TRACE_OTLP_ENDPOINT'],
+        file_path=app.config['CHAT_TRACE_FILE']
+    )
+    event_tracer.listen(crewai_event_bus)
+    atexit.register(trace_provider.shutdown)
+
+# دمج الاستدعاءات المتطابقة الجارية للنموذج نفسه (اختياري)
+llm_factory = LLM
+if app.config['CHAT_COALESCE_REQUESTS']:
+    llm_factory = partial(
+        CoalescingLLM,
+        coalescer=RequestCoalescer(share_sampled=app.config['CHAT_COALESCE_SAMPLED']),
+    )
+
+# مجمع النماذج الجاهزة (نموذج واحد لكل تكوين)
+llm_pool = LLMPool(
+    llm_factory,
+    idle_ttl=app.config['CHAT_MODEL_IDLE_TTL'],
+    max_size=app.config['CHAT_MODEL_POOL_SIZE']
+)
+
+# ذاكرة الردود المؤقتة (اختيارية)
+response_cache = None
+if app.config['CHAT_RESPONSE_CACHE']:
+    response_cache = ResponseCache(
+        embedder_config=app.config['CHAT_CACHE_EMBEDDER'],
+        threshold=app.config['CHAT_CACHE_THRESHOLD'],
+        ttl=app.config['CHAT_CACHE_TTL'],
+        max_entries=app.config['CHAT_CACHE_MAX_ENTRIES']
+    )
+
 # إنشاء مثيل الشات بوت
-chatbot = ChatBot()
+chatbot = ChatBot(
+    conversation_store,
+    llm_pool,
+    levels=app.config['CHAT_MODEL_LEVELS'],
+    response_cache=response_cache
+)
+chatbot.router.listen(crewai_event_bus)
+chatbot.model_index.warm(chatbot.get_available_models())
+
+# موزع الطلبات غير المتزامن
+dispatcher = AsyncChatDispatcher(
+    max_concurrency=app.config['CHAT_MAX_CONCURRENCY'],
+    max_pending=app.config['CHAT_MAX_PENDING']
+)
+
+# رسائل السوكت من خيوط الموزع تُرسل من مهمة خلفية في حلقة الخادم
+socket_outbox = SocketOutbox(socketio)
+socket_outbox.start()
+
+# ردود /api/chat تنتظر هنا حتى يستعلم عنها العميل
+pending_replies = PendingReplies(ttl=app.config['CHAT_REQUEST_TIMEOUT'] * 5)
+
+def get_session_id():
+    """معرف جلسة المستخدم الحالي (يُنشأ عند أول زيارة)"""
+    if 'chat_session_id' not in session:
+        session['chat_session_id'] = uuid.uuid4().hex
+    return session['chat_session_id']
 
 @app.route('/')
 def index():
     """الصفحة الرئيسية"""
+    get_session_id()
     return render_template('index.html')
 
 @app.route('/api/models')
@@ -111,13 +318,18 @@ def get_models():
     """الحصول على قائمة النماذج المتاحة"""
     return jsonify(chatbot.get_available_models())
 
+@app.route('/api/models/stats')
+def get_model_stats():
+    """إحصاءات زمن الاستجابة والأخطاء لكل نموذج"""
+    return jsonify(chatbot.router.stats())
+
 @app.route('/api/initialize', methods=['POST'])
 def initialize_model():
     """تهيئة النموذج المحدد"""
     data = request.get_json()
     model_type = data.get('model_type', 'general')
     
-    success, message = chatbot.initialize_model(model_type)
+    success, message = chatbot.initialize_model(get_session_id(), model_type)
     return jsonify({
         'success': success,
         'message': message,
@@ -126,7 +338,7 @@ def initialize_model():
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
-    """معالجة رسائل الدردشة"""
+    """جدولة رسالة الدردشة وإرجاع معرف الطلب فوراً دون انتظار الرد"""
     data = request.get_json()
     message = data.get('message', '')
     context = data.get('context', '')
@@ -134,13 +346,89 @@ def chat():
     if not message.strip():
         return jsonify({'error': 'الرسالة فارغة'})
     
-    response = chatbot.get_response(message, context)
+    session_id = get_session_id()
+    try:
+        future = dispatcher.submit(chatbot.aget_response, session_id, message, context)
+    except DispatcherBusyError:
+        return jsonify({'error': 'الخادم مشغول حالياً، يرجى المحاولة لاحقاً'}), 503
     
+    request_id = pending_replies.add(session_id, future)
+    return jsonify({'request_id': request_id, 'status': 'pending'}), 202
+
+@app.route('/api/chat/<request_id>')
+def chat_reply(request_id):
+    """الرد على طلب /api/chat إن اكتمل"""
+    future, age = pending_replies.get(get_session_id(), request_id)
+    if future is None:
+        return jsonify({'error': 'طلب غير معروف'}), 404
+    
+    if not future.done():
+        if age < app.config['CHAT_REQUEST_TIMEOUT']:
+            return jsonify({'request_id': request_id, 'status': 'pending'}), 202
+        future.cancel()
+        pending_replies.discard(request_id)
+        return jsonify({'error': 'انتهت مهلة انتظار الرد'}), 504
+    
+    pending_replies.discard(request_id)
     return jsonify({
-        'response': response,
+        'request_id': request_id,
+        'status': 'done',
+        'response': future.result(),
         'timestamp': datetime.now().isoformat()
     })
 
+def submit_chat(data, stream=False):
+    """جدولة رسالة سوكت على الموزع وإرسال الرد إلى العميل صاحب الطلب فقط"""
+    message = data.get('message', '')
+    context = data.get('context', '')
+    request_id = data.get('request_id')
+    sid = request.sid
+    
+    if not message.strip():
+        emit('chat_error', {'error': 'الرسالة فارغة', 'request_id': request_id})
+        return
+    
+    on_chunk = None
+    if stream:
+        def send_chunk(chunk):
+            socket_outbox.emit('chat_chunk', {'chunk': chunk, 'request_id': request_id}, to=sid)
+        
+        # رسالة سوكت واحدة لكل مجموعة أجزاء بدلاً من رسالة لكل رمز
+        on_chunk = ChunkCoalescer(
+            send_chunk,
+            window=app.config['CHAT_STREAM_WINDOW_MS'] / 1000,
+            max_bytes=app.config['CHAT_STREAM_MAX_BYTES']
+        )
+    
+    try:
+        future = dispatcher.submit(chatbot.aget_response, get_session_id(), message, context, on_chunk)
+    except DispatcherBusyError:
+        emit('chat_error', {'error': 'الخادم مشغول حالياً، يرجى المحاولة لاحقاً', 'request_id': request_id})
+        return
+    
+    def deliver(done):
+        """إرسال الرد الكامل عند انتهاء الطلب"""
+        try:
+            socket_outbox.emit('chat_response', {
+                'response': done.result(),
+                'request_id': request_id,
+                'timestamp': datetime.now().isoformat()
+            }, to=sid)
+        except Exception as e:
+            socket_outbox.emit('chat_error', {'error': f'خطأ: {str(e)}', 'request_id': request_id}, to=sid)
+    
+    future.add_done_callback(deliver)
+
+@socketio.on('chat_message')
+def handle_chat_message(data):
+    """معالجة رسائل الدردشة عبر السوكت دون انتظار رد النموذج"""
+    submit_chat(data)
+
+@socketio.on('chat_stream')
+def handle_chat_stream(data):
+    """معالجة رسائل الدردشة مع بث الرد جزءاً بجزء (chat_chunk) ثم الرد الكامل"""
+    submit_chat(data, stream=True)
+
 @socketio.on('connect')
 def handle_connect():
     """عند الاتصال بالسوكت"""
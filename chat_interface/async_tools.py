@@ -0,0 +1,131 @@
+"""
+تشغيل الأدوات غير المتزامنة دون asyncio.run لكل استدعاء
+BaseTool.run و CrewStructuredTool.invoke في CrewAI يشغّلان ``async def _run`` بحلقة
+أحداث جديدة تُنشأ وتُهدم مع كل استدعاء، ويفشلان إن استُدعيا من خيط تعمل فيه حلقة.
+هنا:
+1. ``kickoff_async`` في الطاقم و LiteAgent يسجل الحلقة التي ينتظر فيها المستدعي،
+   فتُنفذ الأدوات غير المتزامنة على تلك الحلقة نفسها (حلقة التدفق غير المتزامن مثلاً)
+   بينما ينتظر خيط الوكيل المتزامن النتيجة
+2. وفي غير ذلك تُنفذ على حلقة خلفية واحدة طويلة العمر يتشاركها كل المنفذين المتزامنين
+فلا تدفع أدوات HTTP كلفة إنشاء الحلقة مع كل استدعاء، ولا تحجز خيطاً أثناء الانتظار.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import threading
+
+from crewai import Crew
+from crewai.lite_agent import LiteAgent
+from crewai.tools import BaseTool
+from crewai.tools.structured_tool import CrewStructuredTool
+
+# الحلقة التي ينتظر فيها kickoff_async، تنتقل إلى خيط الوكيل مع السياق في asyncio.to_thread
+_caller_loop = contextvars.ContextVar("caller_loop", default=None)
+
+_background_loop = None
+_background_lock = threading.Lock()
+
+
+def _shared_loop():
+    """الحلقة الخلفية المشتركة (تُنشأ عند أول استخدام)"""
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="tool-loop", daemon=True).start()
+            _background_loop = loop
+        return _background_loop
+
+
+def _submit(coro, loop):
+    """جدولة coro على حلقة في خيط آخر داخل نسخة من سياق المستدعي"""
+    context = contextvars.copy_context()
+    done = concurrent.futures.Future()
+
+    def finish(task):
+        if task.cancelled():
+            done.cancel()
+        elif task.exception() is not None:
+            done.set_exception(task.exception())
+        else:
+            done.set_result(task.result())
+
+    def start():
+        if done.set_running_or_notify_cancel():
+            context.run(loop.create_task, coro).add_done_callback(finish)
+        else:
+            coro.close()
+
+    loop.call_soon_threadsafe(start)
+    return done
+
+
+def run_coroutine(coro):
+    """
+    تنفيذ coro من شيفرة متزامنة وإرجاع نتيجته: على حلقة kickoff_async إن وُجدت،
+    وإلا على الحلقة الخلفية المشتركة.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    loop = _caller_loop.get()
+    if loop is None or loop is running or not loop.is_running():
+        loop = _shared_loop()
+    if loop is running:
+        # انتظار الحلقة من داخل خيطها يوقفها للأبد: حلقة مؤقتة في خيط مستقل
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    return _submit(coro, loop).result()
+
+
+def _run(self, *args, **kwargs):
+    """بديل BaseTool.run بالسلوك نفسه"""
+    print(f"Using Tool: {self.name}")
+    result = self._run(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        result = run_coroutine(result)
+    self.current_usage_count += 1
+    return result
+
+
+def _invoke(self, input, config=None, **kwargs):
+    """بديل CrewStructuredTool.invoke بالسلوك نفسه"""
+    parsed_args = self._parse_args(input)
+    result = self.func(**parsed_args, **kwargs)
+    if asyncio.iscoroutine(result):
+        result = run_coroutine(result)
+    return result
+
+
+def _binding_caller_loop(kickoff_async):
+    @functools.wraps(kickoff_async)
+    async def wrapper(*args, **kwargs):
+        token = _caller_loop.set(asyncio.get_running_loop())
+        try:
+            return await kickoff_async(*args, **kwargs)
+        finally:
+            _caller_loop.reset(token)
+
+    wrapper.__async_tools__ = True
+    return wrapper
+
+
+def install_async_tools(
+    tool_class=BaseTool, structured_tool_class=CrewStructuredTool, kickoff_classes=(Crew, LiteAgent)
+):
+    """استبدال تشغيل الأدوات غير المتزامنة وربط kickoff_async بحلقته (مرة واحدة)"""
+    if tool_class.run is not _run:
+        _run.__wrapped__ = tool_class.run
+        tool_class.run = _run
+    if structured_tool_class.invoke is not _invoke:
+        _invoke.__wrapped__ = structured_tool_class.invoke
+        structured_tool_class.invoke = _invoke
+    for cls in kickoff_classes:
+        current = cls.kickoff_async
+        if inspect.iscoroutinefunction(current) and not getattr(current, "__async_tools__", False):
+            cls.kickoff_async = _binding_caller_loop(current)
@@ -0,0 +1,101 @@
+"""
+تشغيل طاقم (Crew) على مجموعة كبيرة من المدخلات بالتوازي
+بديل لـ Crew.kickoff_for_each يعمل على مجمع خيوط أو عمليات بحد أقصى للتزامن،
+ويُرجع كل نتيجة فور انتهائها مع إعادة المحاولة لكل عنصر على حدة
+"""
+
+import contextvars
+import time
+from collections import namedtuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from tool_cache import ToolResultCache, use_tool_cache
+
+KickoffResult = namedtuple(
+    "KickoffResult", ["index", "inputs", "output", "error", "attempts"]
+)
+
+
+def _new_crew(crew):
+    """نسخة مستقلة من الطاقم لكل عنصر (أو طاقم جديد من دالة إنشاء)"""
+    copy = getattr(crew, "copy", None)
+    if copy is None:
+        return crew()
+    new_crew = copy()
+    # Crew.copy ينشئ ذاكرة أدوات جديدة، والذاكرة المشتركة تبقى مشتركة بين النسخ
+    cache = getattr(crew, "_cache_handler", None)
+    if isinstance(cache, ToolResultCache):
+        use_tool_cache(new_crew, cache)
+    return new_crew
+
+
+def _kickoff(crew, index, inputs, retries, backoff, retry_on):
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            output = _new_crew(crew).kickoff(inputs=inputs)
+            return KickoffResult(index, inputs, output, None, attempts)
+        except retry_on as e:
+            if attempts > retries:
+                return KickoffResult(index, inputs, None, e, attempts)
+            time.sleep(backoff * 2 ** (attempts - 1))
+
+
+def _run_in_context(context, *args):
+    # لكل عنصر نسخة من سياق الخيط المُرسل: سياق الطاقم (OpenTelemetry baggage)
+    # الذي يضعه kickoff يبقى محصوراً في العنصر نفسه
+    return context.run(_kickoff, *args)
+
+
+def kickoff_each(
+    crew,
+    inputs,
+    max_workers=4,
+    use_processes=False,
+    retries=0,
+    backoff=1.0,
+    retry_on=(Exception,),
+):
+    """
+    تشغيل الطاقم لكل قاموس مدخلات وإرجاع KickoffResult لكل عنصر بترتيب الانتهاء.
+
+    - ``crew``: طاقم يُنسخ لكل عنصر، أو دالة تُنشئ طاقماً جديداً
+      (مع ``use_processes`` يجب أن تكون قابلة للنقل بـ pickle، مثل دالة على مستوى الوحدة)
+    - ``inputs``: أي iterable من القواميس (يُقرأ تدريجياً)
+    - ``max_workers``: أقصى عدد من التشغيلات المتزامنة
+    - ``retries`` و ``backoff``: إعادة محاولة العنصر الفاشل مع انتظار متضاعف
+    - ``retry_on``: الأخطاء التي تستحق إعادة المحاولة
+
+    العنصر الذي يفشل نهائياً يُرجع مع ``error`` بدلاً من إيقاف بقية العناصر.
+    """
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    items = enumerate(inputs)
+
+    with pool_class(max_workers=max_workers) as pool:
+
+        def submit(index, item):
+            args = (crew, index, item, retries, backoff, retry_on)
+            if use_processes:
+                return pool.submit(_kickoff, *args)
+            return pool.submit(_run_in_context, contextvars.copy_context(), *args)
+
+        # لا نرسل أكثر من ضعف عدد العمال مقدماً حتى لا تُقرأ المدخلات كلها في الذاكرة
+        running = set()
+        for index, item in items:
+            running.add(submit(index, item))
+            if len(running) >= max_workers * 2:
+                break
+
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                next_item = next(items, None)
+                if next_item is not None:
+                    running.add(submit(*next_item))
@@ -0,0 +1,134 @@
+"""
+دمج استدعاءات النماذج المتطابقة الجارية في استدعاء واحد
+الطلبات التي تصل إلى النموذج نفسه بالإعدادات والرسائل نفسها أثناء وجود طلب مطابق
+قيد التنفيذ لا تُرسل مرة أخرى، بل تنتظر رد الطلب الأول. لا توجد نافذة انتظار:
+أول طلب يُرسل فوراً، فلا يضيف الدمج أي تأخير.
+
+حدود المكسب: هذه ليست دفعات (batching). نقاط Hugging Face (TGI) لا تقبل دفعة من
+المحادثات في طلب واحد، وتجمع الطلبات المتزامنة بنفسها على الخادم. لذلك لا يرفع
+الدمج إنتاجية أطقم كثيرة تعمل بالتوازي على مهام مستقلة برسائل مختلفة: كل مهمة
+ما زالت ترسل طلباً لكل خطوة. المكسب هو حذف الطلبات المكررة فقط.
+
+لا تُدمج إلا الطلبات الحتمية (temperature == 0) افتراضياً، لأن مشاركة رد مأخوذ
+بالعينات بين وكلاء مختلفين تغيّر سلوكهم.
+"""
+
+import json
+import threading
+from concurrent.futures import Future
+
+import litellm
+from litellm.exceptions import ContextWindowExceededError
+
+from crewai.llm import LLM
+from crewai.utilities.events.llm_events import LLMCallType
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
+
+
+def _fingerprint(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=repr)
+
+
+class RequestCoalescer:
+    """
+    - ``completion``: دالة الإرسال (litellm.completion افتراضياً)
+    - ``share_sampled``: دمج الطلبات ذات temperature غير الصفرية أيضاً (معطل افتراضياً)
+
+    لا يوجد خيط خلفي: أول من يرسل الطلب ينفذه بنفسه، ومن يصل بطلب مطابق
+    أثناء تنفيذه ينتظر النتيجة نفسها (أو الاستثناء نفسه).
+    """
+
+    def __init__(self, completion=None, share_sampled=False):
+        self.completion = completion or litellm.completion
+        self.share_sampled = share_sampled
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def shareable(self, params):
+        return self.share_sampled or params.get("temperature") == 0
+
+    def submit(self, params):
+        """
+        إرسال معاملات litellm.completion، أو انتظار طلب مطابق جارٍ.
+        يعيد (الرد، shared) حيث shared صحيحة إن كان الرد لطلب أرسله غيره.
+        """
+        if not self.shareable(params):
+            return self.completion(**params), False
+
+        key = _fingerprint(params)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if leader:
+            try:
+                future.set_result(self.completion(**params))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                if not future.done():
+                    future.set_exception(RuntimeError("توقف الطلب دون نتيجة"))
+
+        return future.result(), not leader
+
+
+# مدمج مشترك بين كل النماذج حتى تُدمج استدعاءات الوكلاء المختلفين معاً
+default_coalescer = RequestCoalescer()
+
+
+class CoalescingLLM(LLM):
+    """
+    بديل مباشر لـ crewai.llm.LLM يرسل الاستدعاءات غير المبثوثة عبر RequestCoalescer.
+    الاستدعاءات التي تمرر أدوات (function calling) والبث تعمل كما في LLM،
+    وكذلك الاستدعاءات ذات temperature غير الصفرية ما لم يُفعّل share_sampled.
+    """
+
+    def __init__(self, *args, coalescer=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.coalescer = coalescer or default_coalescer
+
+    def _handle_non_streaming_response(
+        self,
+        params,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+    ):
+        if params.get("tools"):
+            return super()._handle_non_streaming_response(
+                params, callbacks, available_functions, from_task, from_agent
+            )
+
+        try:
+            response, shared = self.coalescer.submit(params)
+        except ContextWindowExceededError as e:
+            raise LLMContextLengthExceededException(str(e))
+
+        text_response = response.choices[0].message.content or ""
+        # الاستهلاك يُسجل مرة واحدة مع من أرسل الطلب فعلاً
+        usage_info = None if shared else getattr(response, "usage", None)
+        if usage_info:
+            for callback in callbacks or []:
+                if hasattr(callback, "log_success_event"):
+                    callback.log_success_event(
+                        kwargs=params,
+                        response_obj={"usage": usage_info},
+                        start_time=0,
+                        end_time=0,
+                    )
+
+        self._handle_emit_call_events(
+            response=text_response,
+            call_type=LLMCallType.LLM_CALL,
+            from_task=from_task,
+            from_agent=from_agent,
+            messages=params["messages"],
+        )
+        return text_response
@@ -0,0 +1,215 @@
+"""
+مخزن محادثات مفهرس بمعرف الجلسة
+يحافظ على ذاكرة ثابتة مهما زاد عدد المستخدمين عبر سياسة إخلاء LRU/TTL
+مع إمكانية نقل الجلسات المُخلاة إلى قاعدة SQLite على القرص
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import closing
+from datetime import datetime
+
+
+class _Session:
+    """حالة جلسة واحدة في الذاكرة"""
+
+    __slots__ = ("history", "model_type", "last_access", "size")
+
+    def __init__(self, max_turns, history=(), model_type=None):
+        self.history = deque(maxlen=max_turns)
+        self.model_type = model_type
+        self.last_access = time.monotonic()
+        self.size = 0
+        for turn in history:
+            self.add(turn)
+
+    def add(self, turn):
+        """إضافة رسالة وإرجاع التغير في الحجم التقريبي بالبايت"""
+        delta = _turn_size(turn)
+        if len(self.history) == self.history.maxlen:
+            delta -= _turn_size(self.history[0])
+        self.history.append(turn)
+        self.size += delta
+        return delta
+
+
+def _turn_size(turn):
+    return sys.getsizeof(turn["user"]) + sys.getsizeof(turn["bot"])
+
+
+class ConversationStore:
+    """
+    مخزن جلسات بترتيب LRU (OrderedDict): كل عمليات القراءة والكتابة O(1) لكل جلسة.
+
+    - ``max_sessions``: أقصى عدد من الجلسات في الذاكرة
+    - ``max_turns``: أقصى عدد من الرسائل المحفوظة لكل جلسة
+    - ``ttl``: الثواني التي تبقى فيها جلسة خاملة في الذاكرة
+    - ``max_bytes``: سقف تقريبي لحجم نصوص المحادثات في الذاكرة
+    - ``spill_path``: مسار قاعدة SQLite لحفظ الجلسات المُخلاة (اختياري)
+    """
+
+    def __init__(
+        self,
+        max_sessions=10000,
+        max_turns=50,
+        ttl=3600,
+        max_bytes=64 * 1024 * 1024,
+        spill_path=None,
+    ):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        if self.spill_path:
+            self._init_spill()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    @property
+    def memory_usage(self):
+        """الحجم التقريبي لنصوص المحادثات في الذاكرة بالبايت"""
+        return self._bytes
+
+    def history(self, session_id, limit=None):
+        """آخر ``limit`` رسائل من تاريخ الجلسة"""
+        with self._lock:
+            session = self._get(session_id, create=False)
+            if session is None:
+                return []
+            turns = list(session.history)
+        return turns[-limit:] if limit else turns
+
+    def append(self, session_id, user, bot):
+        """إضافة رسالة ورد إلى تاريخ الجلسة"""
+        turn = {
+            "user": user,
+            "bot": bot,
+            "timestamp": datetime.now().isoformat(),
+        }
+        with self._lock:
+            session = self._get(session_id)
+            self._bytes += session.add(turn)
+            self._evict()
+
+    def get_model_type(self, session_id):
+        """نوع النموذج المختار في الجلسة"""
+        with self._lock:
+            session = self._get(session_id, create=False)
+            return session.model_type if session else None
+
+    def set_model_type(self, session_id, model_type):
+        """تحديد نوع النموذج للجلسة"""
+        with self._lock:
+            self._get(session_id).model_type = model_type
+            self._evict()
+
+    def clear(self, session_id):
+        """حذف الجلسة من الذاكرة ومن القرص"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._bytes -= session.size
+            if self.spill_path:
+                self._delete_spilled(session_id)
+
+    def _get(self, session_id, create=True):
+        """جلب الجلسة ونقلها إلى نهاية ترتيب LRU"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._load_spilled(session_id) if self.spill_path else None
+            if session is None:
+                if not create:
+                    return None
+                session = _Session(self.max_turns)
+            session.last_access = time.monotonic()
+            self._sessions[session_id] = session
+            self._bytes += session.size
+            self._evict()
+        else:
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self):
+        """إخلاء الجلسات المنتهية ثم الأقل استخداماً حتى العودة تحت الحدود"""
+        expires_before = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            over_limit = (
+                len(self._sessions) > self.max_sessions
+                or self._bytes > self.max_bytes
+            )
+            if not over_limit and session.last_access > expires_before:
+                break
+            # لا نُخلي الجلسة الوحيدة المتبقية بسبب الحجم فقط
+            if len(self._sessions) == 1 and session.last_access > expires_before:
+                break
+            del self._sessions[session_id]
+            self._bytes -= session.size
+            if self.spill_path:
+                self._spill(session_id, session)
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.spill_path))
+
+    def _init_spill(self):
+        with self._connect() as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chat_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    model_type TEXT,
+                    history TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _spill(self, session_id, session):
+        with self._connect() as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO chat_sessions
+                    (session_id, model_type, history, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (
+                    session_id,
+                    session.model_type,
+                    json.dumps(list(session.history), ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+
+    def _load_spilled(self, session_id):
+        with self._connect() as conn, conn:
+            row = conn.execute(
+                "SELECT model_type, history FROM chat_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id = ?", (session_id,)
+            )
+        model_type, history = row
+        return _Session(self.max_turns, json.loads(history), model_type)
+
+    def _delete_spilled(self, session_id):
+        with self._connect() as conn, conn:
+            conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id = ?", (session_id,)
+            )
@@ -0,0 +1,177 @@
+"""
+موزع غير متزامن لطلبات الدردشة
+يشغّل استدعاءات النماذج على حلقة asyncio مستقلة مع حد أقصى للتزامن وضغط عكسي،
+ويسلّم النتائج دون حجز خيوط الخادم: رسائل السوكت عبر طابور تفرغه حلقة الخادم،
+وردود HTTP بمعرف طلب يستعلم عنه العميل.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DispatcherBusyError(RuntimeError):
+    """يُرفع عندما يمتلئ طابور الطلبات المعلقة"""
+
+
+class AsyncChatDispatcher:
+    """
+    يدير حلقة أحداث واحدة طويلة العمر في خيط خلفي.
+
+    - ``max_concurrency``: أقصى عدد من استدعاءات النماذج الجارية في الوقت نفسه
+    - ``max_pending``: أقصى عدد من الطلبات المقبولة (الجارية + المنتظرة)؛
+      بعده يُرفض الطلب فوراً بدلاً من تكديسه في الذاكرة
+    """
+
+    def __init__(self, max_concurrency=64, max_pending=512):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency يجب أن يكون 1 على الأقل")
+        if max_pending < max_concurrency:
+            raise ValueError("max_pending يجب ألا يقل عن max_concurrency")
+
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._thread = threading.Thread(
+            target=self._run_loop, name="chat-dispatcher", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        """تشغيل حلقة الأحداث في الخيط الخلفي"""
+        asyncio.set_event_loop(self._loop)
+        # الاستدعاءات المتزامنة (LLM.call) تعمل في مجمع خيوط بنفس حد التزامن
+        self._loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="chat-llm"
+            )
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        self._loop.run_forever()
+
+    @property
+    def pending(self):
+        """عدد الطلبات المقبولة التي لم تكتمل بعد"""
+        return self._pending
+
+    def submit(self, coroutine_function, *args, **kwargs):
+        """
+        جدولة دالة غير متزامنة على حلقة الموزع.
+        تُرجع concurrent.futures.Future يمكن انتظاره أو ربط callback به.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise DispatcherBusyError(
+                    f"عدد الطلبات المعلقة وصل إلى الحد الأقصى ({self.max_pending})"
+                )
+            self._pending += 1
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._dispatch(coroutine_function, args, kwargs), self._loop
+        )
+        future.add_done_callback(self._release)
+        return future
+
+    async def _dispatch(self, coroutine_function, args, kwargs):
+        """تنفيذ الطلب ضمن حد التزامن"""
+        async with self._semaphore:
+            return await coroutine_function(*args, **kwargs)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        """إيقاف حلقة الأحداث"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+class SocketOutbox:
+    """
+    رسائل سوكت تُنتج في خيوط الموزع وتُرسل من مهمة خلفية في حلقة الخادم.
+    socketio.emit من خيط نظام عادي غير موثوق مع eventlet دون monkey_patch،
+    و monkey_patch يحوّل خيط حلقة الموزع نفسه إلى خيط أخضر.
+
+    - ``interval``: الفاصل بالثواني بين مرات تفريغ الطابور
+    """
+
+    def __init__(self, socketio, interval=0.01):
+        self.socketio = socketio
+        self.interval = interval
+        self._messages = deque()
+        self._lock = threading.Lock()
+        self._task = None
+        self._stopped = False
+
+    def start(self):
+        """بدء مهمة التفريغ (مرة واحدة، من سياق الخادم)"""
+        with self._lock:
+            if self._task is None:
+                self._task = self.socketio.start_background_task(self._run)
+
+    def emit(self, event, data, to=None):
+        """إضافة رسالة إلى الطابور؛ آمنة من أي خيط"""
+        self._messages.append((event, data, to))
+
+    def drain(self):
+        """إرسال كل الرسائل المنتظرة بترتيبها"""
+        while True:
+            try:
+                event, data, to = self._messages.popleft()
+            except IndexError:
+                return
+            self.socketio.emit(event, data, to=to)
+
+    def _run(self):
+        while not self._stopped:
+            self.drain()
+            self.socketio.sleep(self.interval)
+
+    def close(self):
+        self._stopped = True
+
+
+class PendingReplies:
+    """
+    ردود طلبات HTTP الجارية، يستلمها صاحب الجلسة بمعرف الطلب بدلاً من انتظارها
+    في خيط الخادم. الردود التي لا يُستعلم عنها تُحذف بعد ``ttl`` ثانية.
+    """
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._replies = {}
+        self._lock = threading.Lock()
+
+    def add(self, owner, future):
+        """تسجيل طلب وإرجاع معرفه"""
+        request_id = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            for key, (_, stale, created) in list(self._replies.items()):
+                if now - created > self.ttl:
+                    stale.cancel()
+                    del self._replies[key]
+            self._replies[request_id] = (owner, future, now)
+        return request_id
+
+    def get(self, owner, request_id):
+        """(الطلب، عمره بالثواني) أو (None، None) إن لم يكن لهذا المالك"""
+        with self._lock:
+            entry = self._replies.get(request_id)
+        if entry is None or entry[0] != owner:
+            return None, None
+        return entry[1], time.monotonic() - entry[2]
+
+    def discard(self, request_id):
+        with self._lock:
+            self._replies.pop(request_id, None)
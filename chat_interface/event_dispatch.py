@@ -0,0 +1,106 @@
+"""
+جدول توزيع مسبق لمعالجات أحداث CrewAI
+الناقل يمر على كل أنواع الأحداث المسجلة مع كل حدث (isinstance) ليجد المعالجات،
+وهذا يتكرر مع كل رمز في البث. هنا تُحسب قائمة المعالجات مرة واحدة لكل صنف
+حدث وتُعاد حسابها فقط عند تسجيل معالج جديد أو تغيير النطاق (scoped_handlers)
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class DispatchTable:
+    """المعالجات المطابقة لكل صنف حدث: tuple من (النوع المسجل، المعالج)"""
+
+    def __init__(self, event_bus):
+        self.event_bus = event_bus
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = {}
+
+    def resolve(self, event_class):
+        entries = self._entries
+        resolved = entries.get(event_class)
+        if resolved is None:
+            with self._lock:
+                # بترتيب التسجيل نفسه الذي يستخدمه الناقل
+                resolved = tuple(
+                    (event_type, handler)
+                    for event_type, handlers in list(self.event_bus._handlers.items())
+                    if issubclass(event_class, event_type)
+                    for handler in handlers
+                )
+                if entries is self._entries:
+                    entries[event_class] = resolved
+        return resolved
+
+
+def install_dispatch_table(event_bus):
+    """
+    تفعيل جدول التوزيع على الناقل (crewai_event_bus عادةً).
+    يُستبدل ``emit`` بنسخة تستخدم الجدول، ويُبطل الجدول عند ``on``
+    و ``register_handler`` و ``scoped_handlers``.
+    """
+    existing = getattr(event_bus, "dispatch_table", None)
+    if existing is not None:
+        return existing
+
+    table = DispatchTable(event_bus)
+    bus_class = type(event_bus)
+
+    def emit(source, event):
+        for event_type, handler in table.resolve(type(event)):
+            try:
+                handler(source, event)
+            except Exception as e:
+                print(
+                    f"[EventBus Error] Handler '{handler.__name__}' failed for event '{event_type.__name__}': {e}"
+                )
+        event_bus._signal.send(source, event=event)
+
+    def register_handler(event_type, handler):
+        bus_class.register_handler(event_bus, event_type, handler)
+        table.invalidate()
+
+    def on(event_type):
+        register = bus_class.on(event_bus, event_type)
+
+        def decorator(handler):
+            register(handler)
+            table.invalidate()
+            return handler
+
+        return decorator
+
+    @contextmanager
+    def scoped_handlers():
+        try:
+            with bus_class.scoped_handlers(event_bus):
+                table.invalidate()
+                yield
+        finally:
+            table.invalidate()
+
+    event_bus.emit = emit
+    event_bus.register_handler = register_handler
+    event_bus.on = on
+    event_bus.scoped_handlers = scoped_handlers
+    event_bus.dispatch_table = table
+    return table
+
+
+def has_handlers(event_bus, event_class):
+    """
+    هل يوجد معالج لهذا الصنف من الأحداث؟
+    يُستخدم قبل بناء الحدث لتجنب إنشائه عندما لا يستمع إليه أحد.
+    """
+    table = getattr(event_bus, "dispatch_table", None)
+    if table is not None:
+        return bool(table.resolve(event_class))
+    return any(
+        handlers and issubclass(event_class, event_type)
+        for event_type, handlers in list(event_bus._handlers.items())
+    )
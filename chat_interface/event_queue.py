@@ -0,0 +1,110 @@
+"""
+تنفيذ معالجات أحداث CrewAI في خيط خلفي
+يُسجَّل على ناقل الأحداث بديل خفيف يضع الحدث في طابور محدود ويعود فوراً،
+فلا يضيف المعالج البطيء (العرض على الطرفية، إرسال السجلات) إلى زمن استدعاء النموذج
+"""
+
+import queue
+import threading
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+_STOP = object()
+
+
+class QueuedEventDispatcher:
+    """
+    - ``max_pending``: أقصى عدد من الأحداث المنتظرة في الطابور
+    - ``overflow``: ``"drop"`` يتجاهل الحدث عند امتلاء الطابور (ويزيد ``dropped``)،
+      و ``"block"`` ينتظر حتى يتوفر مكان
+
+    خيط واحد يُفرغ الطابور بترتيب الوصول، فتصل أحداث كل مصدر بترتيبها.
+    المعالجات التي تعتمد على خيط الاستدعاء نفسه (مثل بث الأجزاء عبر ContextVar
+    أو قياس زمن الاستدعاء) يجب أن تبقى متزامنة.
+    """
+
+    def __init__(self, max_pending=10000, overflow="drop"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"سياسة غير معروفة: {overflow}")
+        self.overflow = overflow
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = threading.Thread(
+            target=self._run, name="event-dispatcher", daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def on(self, event_bus, event_type):
+        """مثل ``event_bus.on`` لكن المعالج يُنفذ في الخيط الخلفي"""
+
+        def decorator(handler):
+            event_bus.register_handler(event_type, self.deferred(event_type, handler))
+            return handler
+
+        return decorator
+
+    def deferred(self, event_type, handler):
+        """معالج بديل يضع الحدث في الطابور بدلاً من تنفيذ ``handler``"""
+
+        def enqueue(source, event):
+            self._put((event_type, handler, source, event))
+
+        enqueue.__name__ = handler.__name__
+        enqueue.__wrapped__ = handler
+        enqueue.dispatcher = self
+        return enqueue
+
+    def defer_handlers(self, event_bus, keep=()):
+        """
+        نقل المعالجات المسجلة حالياً على الناقل (عدا ``keep``) إلى الخيط الخلفي.
+        تبقى المعالجات بترتيبها ولكل نوع حدث.
+        """
+        for event_type, handlers in event_bus._handlers.items():
+            handlers[:] = [
+                handler
+                if handler in keep or getattr(handler, "dispatcher", None) is self
+                else self.deferred(event_type, handler)
+                for handler in handlers
+            ]
+        table = getattr(event_bus, "dispatch_table", None)
+        if table is not None:
+            table.invalidate()
+
+    def flush(self):
+        """انتظار تنفيذ كل الأحداث الموجودة في الطابور (للاختبارات والإيقاف)"""
+        self._queue.join()
+
+    def shutdown(self):
+        """تنفيذ الأحداث المتبقية ثم إيقاف الخيط الخلفي"""
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def _put(self, item):
+        if self.overflow == "block":
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                event_type, handler, source, event = item
+                try:
+                    handler(source, event)
+                except Exception as e:
+                    # نفس رسالة الناقل: فشل معالج لا يوقف بقية المعالجات
+                    print(
+                        f"[EventBus Error] Handler '{handler.__name__}' failed for event '{event_type.__name__}': {e}"
+                    )
+            finally:
+                self._queue.task_done()
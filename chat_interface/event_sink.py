@@ -0,0 +1,187 @@
+"""
+سجل دائم لأحداث CrewAI في ملفات مضغوطة
+المعالج يأخذ لقطة رخيصة من حقول الحدث (نسخة سطحية من القوائم والقواميس) ويضيفها
+إلى ذاكرة مؤقتة، وخيط خلفي يحوّلها إلى JSON ويكتبها على دفعات في ملفات NDJSON
+مضغوطة (gzip) تُدوّر حسب الحجم والعمر. التحويل الكامل لا يجري على خيط الحدث، لذا
+الكائنات المتداخلة (كالمهمة والوكيل) تُحوّل بحالتها وقت الكتابة.
+كل سطر يحمل دفعة من نوع حدث واحد بتخطيط عمودي ثابت: أسماء الحقول مرة واحدة
+ثم صف لكل حدث، فلا تُكرر أسماء الحقول مع كل حدث
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.serialization import to_serializable
+
+SEGMENT_PATTERN = "events-*.ndjson.gz"
+
+
+def _snapshot(value):
+    # نسخة سطحية تكفي لتجميد القوائم والقواميس التي قد تتغير بعد الحدث
+    if isinstance(value, (dict, list, set)):
+        return value.copy()
+    return value
+
+
+class EventSink:
+    """
+    - ``directory``: مجلد ملفات السجل
+    - ``flush_interval``: الثواني بين دفعات الكتابة
+    - ``batch_size``: كتابة فورية عند تراكم هذا العدد من الأحداث
+    - ``max_segment_bytes`` و ``max_segment_age``: تدوير الملف حسب الحجم (قبل الضغط) والعمر
+    - ``max_pending``: أقصى عدد من الأحداث غير المكتوبة (تُهمل الزيادة وتُعد في ``dropped``)
+
+    الأحداث التي يتعذر تحويلها أو كتابتها تُعد في ``failed`` وتُسجل، ولا يتوقف الخيط الخلفي.
+    """
+
+    def __init__(
+        self,
+        directory,
+        flush_interval=1.0,
+        batch_size=1000,
+        max_segment_bytes=64 * 1024 * 1024,
+        max_segment_age=3600,
+        max_pending=100000,
+    ):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.failed = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending = deque()
+        self._columns = {}
+        self._segment = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._sequence = 0
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._worker.start()
+
+    def attach(self, event_bus, event_type=BaseEvent):
+        """تسجيل السجل على الناقل لكل الأحداث (أو لنوع محدد)"""
+        event_bus.register_handler(event_type, self.record)
+
+    def record(self, source, event):
+        """معالج الناقل: لقطة من حقول الحدث دون كتابة"""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        event_class = type(event)
+        columns = self._columns.get(event_class)
+        if columns is None:
+            columns = self._columns[event_class] = tuple(event_class.model_fields)
+        row = tuple(_snapshot(getattr(event, name, None)) for name in columns)
+        self._pending.append((event_class, event.type, row))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """كتابة كل الأحداث المنتظرة الآن"""
+        with self._write_lock:
+            self._write_pending()
+
+    def close(self):
+        """كتابة المتبقي وإغلاق الملف الحالي"""
+        self._closed = True
+        self._wakeup.set()
+        self._worker.join()
+        with self._write_lock:
+            self._write_pending()
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("تعذرت كتابة دفعة أحداث في السجل")
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        # تجميع الدفعة حسب صنف الحدث مع الحفاظ على ترتيب أول ظهور
+        groups = {}
+        for _ in range(len(self._pending)):
+            event_class, event_type, row = self._pending.popleft()
+            try:
+                row = [to_serializable(value) for value in row]
+            except Exception:
+                self.failed += 1
+                logging.exception(f"تعذر تحويل الحدث {event_class.__name__} للسجل")
+                continue
+            groups.setdefault(event_class, (event_type, []))[1].append(row)
+
+        for event_class, (event_type, rows) in groups.items():
+            block = {
+                "type": event_type,
+                "event": event_class.__name__,
+                "columns": self._columns[event_class],
+                "rows": rows,
+            }
+            try:
+                self._write(json.dumps(block, ensure_ascii=False, default=repr) + "\n")
+            except Exception:
+                self.failed += len(rows)
+                logging.exception(f"تعذرت كتابة أحداث {event_class.__name__} في السجل")
+        if self._segment is not None:
+            # دون fsync: يكفي أن تصل الدفعة إلى نظام الملفات
+            self._segment.flush()
+
+    def _write(self, line):
+        now = time.time()
+        if (
+            self._segment is None
+            or self._segment_bytes >= self.max_segment_bytes
+            or now - self._segment_opened >= self.max_segment_age
+        ):
+            self._rotate(now)
+        data = line.encode("utf-8")
+        self._segment.write(data)
+        self._segment_bytes += len(data)
+
+    def _rotate(self, now):
+        if self._segment is not None:
+            self._segment.close()
+        self._sequence += 1
+        name = f"events-{time.strftime('%Y%m%d-%H%M%S', time.gmtime(now))}-{os.getpid()}-{self._sequence:05d}.ndjson.gz"
+        self._segment = gzip.open(os.path.join(self.directory, name), "wb")
+        self._segment_bytes = 0
+        self._segment_opened = now
+
+
+def read_events(directory):
+    """
+    قراءة الأحداث من ملفات السجل دفعةً دفعة، كل حدث قاموس يحمل اسم صنفه في ``event``.
+    داخل الدفعة تُجمع الأحداث حسب النوع، فالترتيب الزمني الدقيق من حقل ``timestamp``.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN))):
+        with gzip.open(path, "rt", encoding="utf-8") as segment:
+            try:
+                for line in segment:
+                    block = json.loads(line)
+                    for row in block["rows"]:
+                        event = dict(zip(block["columns"], row))
+                        event["event"] = block["event"]
+                        yield event
+            except (EOFError, json.JSONDecodeError):
+                # ملف ما زال مفتوحاً للكتابة أو انقطع أثناءها
+                continue
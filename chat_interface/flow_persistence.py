@@ -0,0 +1,521 @@
+"""
+خلفيات حفظ حالة التدفق لـ ``@persist``
+SQLiteFlowPersistence في CrewAI يفتح اتصالاً جديداً ويثبّت معاملة مع كل طريقة
+محفوظة. هنا ``SQLiteWALFlowPersistence`` بالجدول نفسه (فيقرأ قواعد البيانات
+الموجودة) مع:
+1. اتصال دائم لكل خيط بوضع WAL و synchronous قابل للضبط
+2. سياسة "احفظ كل N خطوات أو كل T ثانية": الحالات المؤجلة تُكتب معاً في معاملة واحدة
+3. وضع اختياري يحفظ لقطة أساسية ثم الحقول التي تغيرت فقط مع كل طريقة (والعناصر المضافة
+   إلى القوائم) في جدول منفصل ``flow_state_deltas``، وتُدمج في لقطة جديدة دورياً وتُطبق
+   الفروق عند الاستعادة. ``flow_states`` لا يحوي إلا حالات كاملة، فيقرؤه
+   SQLiteFlowPersistence دون أن يرى الفروق (يرى حالة آخر لقطة)
+4. سياسة احتفاظ: آخر N حالة لكل تدفق، وحذف التدفقات المتوقفة منذ مدة، وإعادة بناء الملف؛
+   لا تعمل تلقائياً: يشغّلها ``RetentionJob`` دورياً بجوار الخلفية
+و ``LMDBFlowPersistence`` بالواجهة نفسها على ملف مُعيَّن في الذاكرة، لتجنب تنافس
+الأقفال على ملف SQLite واحد عند كثرة التدفقات المتزامنة.
+"""
+
+import atexit
+import copy
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from crewai.flow.persistence.base import FlowPersistence
+from pydantic import BaseModel
+
+
+def _state_dict(state_data):
+    """نسخة من الحالة لا تتأثر بتعديلات التدفق بعد الطريقة"""
+    if isinstance(state_data, BaseModel):
+        return state_data.model_dump(mode="json")
+    if isinstance(state_data, dict):
+        return copy.deepcopy(state_data)
+    raise ValueError(
+        f"state_data must be either a Pydantic BaseModel or dict, got {type(state_data)}"
+    )
+
+
+def _diff(old, new):
+    """الحقول التي تغيرت من ``old`` إلى ``new``؛ القائمة التي أُضيف إلى آخرها تُحفظ إضافاتها فقط"""
+    changed, extended = {}, {}
+    for name, value in new.items():
+        previous = old.get(name)
+        if name in old and value == previous:
+            continue
+        if (
+            isinstance(value, list)
+            and isinstance(previous, list)
+            and len(value) > len(previous)
+            and value[: len(previous)] == previous
+        ):
+            extended[name] = value[len(previous):]
+        else:
+            changed[name] = value
+    delta = {"set": changed, "extend": extended}
+    removed = [name for name in old if name not in new]
+    if removed:
+        delta["unset"] = removed
+    return delta
+
+
+def _apply(state, delta):
+    state.update(delta["set"])
+    for name, items in delta["extend"].items():
+        state[name].extend(items)
+    for name in delta.get("unset", ()):
+        state.pop(name, None)
+
+
+class _FlushScheduler:
+    """خيط واحد يكتب الحالات المؤجلة عند انتهاء ``persist_interval`` دون انتظار حفظ جديد"""
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, deadline, persistence):
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="flow-flush", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (deadline, next(self._sequence), weakref.ref(persistence)))
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                deadline, _, persistence = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            persistence = persistence()
+            if persistence is None:
+                continue
+            try:
+                persistence._flush_due()
+            except Exception:
+                logging.exception("تعذرت كتابة حالات التدفقات المؤجلة")
+
+
+_flush_scheduler = _FlushScheduler()
+
+# كل خلفية SQLiteWALFlowPersistence مفتوحة، لكتابة المؤجل منها عند خروج العملية
+_open_persistences = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_at_exit():
+    for persistence in list(_open_persistences):
+        try:
+            persistence.flush()
+        except Exception:
+            logging.exception("تعذرت كتابة حالات التدفقات المؤجلة عند الخروج")
+
+
+class SQLiteWALFlowPersistence(FlowPersistence):
+    """
+    - ``db_path``: مسار ملف قاعدة البيانات (الافتراضي مسار SQLiteFlowPersistence نفسه)
+    - ``synchronous``: إعداد PRAGMA synchronous؛ ``NORMAL`` آمن مع WAL
+      (قد تضيع آخر معاملة عند انقطاع الكهرباء فقط، دون تلف القاعدة)
+    - ``persist_every``: كتابة حالة التدفق كل هذا العدد من الخطوات (1: مع كل خطوة)
+    - ``persist_interval``: أو عند مرور هذه الثواني على أقدم حالة مؤجلة
+    - ``compact_after``: مع رقم تُحفظ الفروق عن الحالة السابقة في ``flow_state_deltas`` بدلاً
+      من الحالة كاملة، وتُكتب لقطة جديدة في ``flow_states`` بعد هذا العدد من الفروق وتُحذف
+      الصفوف الأقدم منها للتدفق نفسه (الافتراضي None: لقطة كاملة مع كل حفظ كما في
+      SQLiteFlowPersistence)
+    - ``cache_size``: عدد التدفقات التي تبقى آخر حالة مكتوبة لها في الذاكرة لحساب الفروق؛
+      التدفق غير الموجود فيها يبدأ بلقطة كاملة
+
+    الحالة المؤجلة تُقرأ من الذاكرة في ``load_state``، وتُكتب عند بلوغ ``persist_every``،
+    أو من خيط خلفي عند انتهاء ``persist_interval``، أو عند ``flush`` و ``close`` وخروج
+    العملية؛ ما لم يُكتب بعد يضيع إن توقفت العملية فجأة.
+    """
+
+    def __init__(
+        self,
+        db_path=None,
+        synchronous="NORMAL",
+        persist_every=1,
+        persist_interval=None,
+        compact_after=None,
+        cache_size=1024,
+    ):
+        from crewai.utilities.paths import db_storage_path
+
+        self.db_path = db_path or str(Path(db_storage_path()) / "flow_states.db")
+        self.synchronous = synchronous
+        self.persist_every = persist_every
+        self.persist_interval = persist_interval
+        self.compact_after = compact_after
+        self.cache_size = cache_size
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        # flow_uuid -> (الصف المؤجل، عدد الخطوات منذ آخر كتابة)
+        self._pending = {}
+        self._deadline = None
+        # flow_uuid -> (آخر حالة مكتوبة، عدد الفروق بعد اللقطة، معرف اللقطة)
+        self._written = OrderedDict()
+        self.init_db()
+        _open_persistences.add(self)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # يُغلق من close() في أي خيط
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def init_db(self):
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS flow_states (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    flow_uuid TEXT NOT NULL,
+                    method_name TEXT NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    state_json TEXT NOT NULL
+                )
+                """
+            )
+            # الفروق في جدول منفصل حتى لا يقرأها SQLiteFlowPersistence كحالات
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS flow_state_deltas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    flow_uuid TEXT NOT NULL,
+                    snapshot_id INTEGER NOT NULL,
+                    method_name TEXT NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    delta_json TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_flow_states_uuid ON flow_states (flow_uuid)"
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_flow_state_deltas_snapshot
+                ON flow_state_deltas (snapshot_id, id)
+                """
+            )
+            # لحذف التدفقات القديمة
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_flow_states_timestamp ON flow_states (timestamp)"
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_flow_state_deltas_timestamp
+                ON flow_state_deltas (timestamp)
+                """
+            )
+
+    def save_state(self, flow_uuid, method_name, state_data):
+        row = (method_name, datetime.now(timezone.utc).isoformat(), _state_dict(state_data))
+        with self._pending_lock:
+            _, steps = self._pending.pop(flow_uuid, (None, 0))
+            self._pending[flow_uuid] = (row, steps + 1)
+            now = time.monotonic()
+            if self._deadline is None and self.persist_interval is not None:
+                self._deadline = now + self.persist_interval
+                if self.persist_interval > 0:
+                    _flush_scheduler.schedule(self._deadline, self)
+            due = (self.persist_every is not None and steps + 1 >= self.persist_every) or (
+                self._deadline is not None and now >= self._deadline
+            )
+            if due:
+                self._write_pending()
+
+    def _write_pending(self):
+        """كتابة كل الحالات المؤجلة في معاملة واحدة (مع الاحتفاظ بالقفل)"""
+        if not self._pending:
+            return
+        written = {}
+        with self._connection() as conn:
+            for flow_uuid, ((method_name, timestamp, state), _) in self._pending.items():
+                previous, deltas, snapshot_id = self._written.get(flow_uuid, (None, None, None))
+                if previous is not None and deltas < self.compact_after:
+                    conn.execute(
+                        """
+                        INSERT INTO flow_state_deltas
+                            (flow_uuid, snapshot_id, method_name, timestamp, delta_json)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (flow_uuid, snapshot_id, method_name, timestamp, json.dumps(_diff(previous, state))),
+                    )
+                    written[flow_uuid] = (state, deltas + 1, snapshot_id)
+                    continue
+                row_id = conn.execute(
+                    """
+                    INSERT INTO flow_states (flow_uuid, method_name, timestamp, state_json)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (flow_uuid, method_name, timestamp, json.dumps(state)),
+                ).lastrowid
+                if self.compact_after is None:
+                    continue
+                if previous is not None:
+                    # لقطة جديدة: اللقطة السابقة وفروقها لم تعد لازمة
+                    conn.execute(
+                        "DELETE FROM flow_states WHERE flow_uuid = ? AND id < ?",
+                        (flow_uuid, row_id),
+                    )
+                    conn.execute("DELETE FROM flow_state_deltas WHERE flow_uuid = ?", (flow_uuid,))
+                written[flow_uuid] = (state, 0, row_id)
+        # بعد نجاح المعاملة فقط، وإلا حُسبت الفروق التالية من حالة لم تُكتب
+        for flow_uuid, entry in written.items():
+            self._written[flow_uuid] = entry
+            self._written.move_to_end(flow_uuid)
+        while len(self._written) > self.cache_size:
+            self._written.popitem(last=False)
+        self._pending.clear()
+        self._deadline = None
+
+    def flush(self):
+        """كتابة الحالات المؤجلة الآن"""
+        with self._pending_lock:
+            self._write_pending()
+
+    def _flush_due(self):
+        # قد تكون الحالات كُتبت بعد جدولة المؤقت وبدأت مهلة جديدة لها مؤقتها الخاص
+        with self._pending_lock:
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                self._write_pending()
+
+    def load_state(self, flow_uuid):
+        with self._pending_lock:
+            pending = self._pending.get(flow_uuid)
+        if pending is not None:
+            return copy.deepcopy(pending[0][2])
+        # آخر لقطة ثم الفروق المبنية عليها فقط
+        conn = self._connection()
+        snapshot = conn.execute(
+            """
+            SELECT id, state_json FROM flow_states
+            WHERE flow_uuid = ?
+            ORDER BY id DESC LIMIT 1
+            """,
+            (flow_uuid,),
+        ).fetchone()
+        if snapshot is None:
+            return None
+        state = json.loads(snapshot[1])
+        for (delta,) in conn.execute(
+            "SELECT delta_json FROM flow_state_deltas WHERE snapshot_id = ? ORDER BY id",
+            (snapshot[0],),
+        ):
+            _apply(state, json.loads(delta))
+        return state
+
+    def prune(self, keep_states=None, max_age=None):
+        """
+        تطبيق سياسة الاحتفاظ في معاملة واحدة، وإرجاع عدد التدفقات المحذوفة:
+        - ``keep_states``: الإبقاء على آخر ``keep_states`` لقطة لكل تدفق في ``flow_states``
+          (فروق آخر لقطة تبقى دائماً لأن الحالة الأخيرة تحتاجها)
+        - ``max_age``: حذف التدفقات التي لم تُحفظ منذ هذه الثواني (المنتهية أو المتوقفة)
+        """
+        removed = []
+        with self._pending_lock:
+            self._write_pending()
+            with self._connection() as conn:
+                if max_age is not None:
+                    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age)).isoformat()
+                    removed = [
+                        flow_uuid
+                        for (flow_uuid,) in conn.execute(
+                            """
+                            SELECT DISTINCT flow_uuid FROM flow_states WHERE timestamp < ?
+                            EXCEPT
+                            SELECT flow_uuid FROM flow_states WHERE timestamp >= ?
+                            EXCEPT
+                            SELECT flow_uuid FROM flow_state_deltas WHERE timestamp >= ?
+                            """,
+                            (cutoff, cutoff, cutoff),
+                        )
+                    ]
+                    for table in ("flow_states", "flow_state_deltas"):
+                        conn.executemany(
+                            f"DELETE FROM {table} WHERE flow_uuid = ?",
+                            [(flow_uuid,) for flow_uuid in removed],
+                        )
+                if keep_states is not None:
+                    conn.execute(
+                        """
+                        DELETE FROM flow_states
+                        WHERE id < (
+                            SELECT recent.id FROM flow_states AS recent
+                            WHERE recent.flow_uuid = flow_states.flow_uuid
+                            ORDER BY recent.id DESC LIMIT 1 OFFSET ?
+                        )
+                        """,
+                        (max(keep_states, 1) - 1,),
+                    )
+                    # فروق اللقطات المحذوفة لا تُقرأ بعد الآن
+                    conn.execute(
+                        """
+                        DELETE FROM flow_state_deltas
+                        WHERE snapshot_id NOT IN (SELECT id FROM flow_states)
+                        """
+                    )
+            for flow_uuid in removed:
+                self._written.pop(flow_uuid, None)
+        return len(removed)
+
+    def compact(self, min_free_ratio=0.25):
+        """
+        إعادة بناء الملف (VACUUM) إن تجاوزت الصفحات الفارغة بعد الحذف ``min_free_ratio``
+        من حجمه، ثم تقليص ملف WAL. يُرجع True إن أُعيد البناء.
+        """
+        conn = self._connection()
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        rebuilt = bool(total_pages) and free_pages / total_pages >= min_free_ratio
+        if rebuilt:
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return rebuilt
+
+    def close(self):
+        """كتابة الحالات المؤجلة وإغلاق اتصالات كل الخيوط"""
+        self.flush()
+        _open_persistences.discard(self)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class LMDBFlowPersistence(FlowPersistence):
+    """
+    آخر حالة لكل تدفق في LMDB (يتطلب ``pip install lmdb``).
+    القراءات من الذاكرة المُعيَّنة مباشرة ولا تنتظر الكاتب، والكتابة بكاتب واحد في كل مرة.
+    لا يُحفظ تاريخ الخطوات: كل حفظ يستبدل حالة التدفق السابقة.
+
+    - ``path``: مجلد القاعدة (الافتراضي ``flow_states.lmdb`` بجوار قاعدة SQLiteFlowPersistence)
+    - ``map_size``: الحجم الأقصى للقاعدة بالبايت (ملف متناثر لا يُحجز مسبقاً)
+    - ``max_readers``: أقصى عدد من الخيوط القارئة في الوقت نفسه
+    - ``sync``: مزامنة القرص مع كل معاملة؛ بدونها (الافتراضي، كـ ``synchronous=NORMAL``)
+      قد تضيع آخر المعاملات عند انقطاع الكهرباء دون تلف القاعدة
+    """
+
+    def __init__(self, path=None, map_size=1024 ** 3, max_readers=256, sync=False):
+        from crewai.utilities.paths import db_storage_path
+
+        self.path = path or str(Path(db_storage_path()) / "flow_states.lmdb")
+        self.map_size = map_size
+        self.max_readers = max_readers
+        self.sync = sync
+        self.init_db()
+
+    def init_db(self):
+        import lmdb
+
+        self._env = lmdb.open(
+            self.path,
+            map_size=self.map_size,
+            max_readers=self.max_readers,
+            max_dbs=2,
+            sync=self.sync,
+            readahead=False,
+        )
+        # states: الحالة بصيغة JSON؛ meta: [method_name، وقت الحفظ]
+        self._states = self._env.open_db(b"states")
+        self._meta = self._env.open_db(b"meta")
+
+    def save_state(self, flow_uuid, method_name, state_data):
+        key = flow_uuid.encode("utf-8")
+        state = json.dumps(_state_dict(state_data)).encode("utf-8")
+        meta = json.dumps([method_name, time.time()]).encode("utf-8")
+        with self._env.begin(write=True) as txn:
+            txn.put(key, state, db=self._states)
+            txn.put(key, meta, db=self._meta)
+
+    def load_state(self, flow_uuid):
+        with self._env.begin(buffers=True) as txn:
+            state = txn.get(flow_uuid.encode("utf-8"), db=self._states)
+            # المخزن صالح داخل المعاملة فقط
+            return None if state is None else json.loads(bytes(state))
+
+    def prune(self, keep_states=None, max_age=None):
+        """
+        حذف التدفقات التي لم تُحفظ منذ ``max_age`` ثانية، وإرجاع عددها.
+        ``keep_states`` للتوافق مع SQLiteWALFlowPersistence: تُحفظ هنا آخر حالة فقط.
+        """
+        if max_age is None:
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        with self._env.begin(write=True) as txn:
+            for key, meta in list(txn.cursor(db=self._meta)):
+                if json.loads(meta)[1] < cutoff:
+                    txn.delete(key, db=self._meta)
+                    txn.delete(key, db=self._states)
+                    removed += 1
+        return removed
+
+    def compact(self, min_free_ratio=0.25):
+        """LMDB يعيد استخدام الصفحات المحررة تلقائياً، فلا حاجة لإعادة البناء"""
+        return False
+
+    def close(self):
+        self._env.sync(True)
+        self._env.close()
+
+
+class RetentionJob:
+    """
+    خيط خلفي يطبق ``prune`` ثم ``compact`` على الخلفية كل ``interval`` ثانية.
+    الخلفيات لا تنظف نفسها، فيُنشئها من يملك الخلفية (التطبيق لا يشغّل تدفقات)
+    ويوقفها بـ ``stop()`` قبل ``close()``. أخطاء الجولة تُسجل ولا توقف الخيط.
+    """
+
+    def __init__(self, persistence, interval=3600, keep_states=None, max_age=None, min_free_ratio=0.25):
+        self.persistence = persistence
+        self.interval = interval
+        self.keep_states = keep_states
+        self.max_age = max_age
+        self.min_free_ratio = min_free_ratio
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="flow-retention", daemon=True)
+        self._thread.start()
+
+    def run_once(self):
+        """جولة تنظيف واحدة؛ يُرجع عدد التدفقات المحذوفة"""
+        removed = self.persistence.prune(keep_states=self.keep_states, max_age=self.max_age)
+        self.persistence.compact(min_free_ratio=self.min_free_ratio)
+        return removed
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logging.exception("تعذر تنظيف حالات التدفقات المحفوظة")
@@ -0,0 +1,86 @@
+"""
+مجمع نماذج LLM جاهزة للاستخدام
+يُنشأ كل نموذج مرة واحدة لكل تكوين (model, base_url, temperature) ووضع بث
+ثم يُعاد استخدامه، مع إخلاء النماذج الخاملة
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LLMPool:
+    """
+    - ``factory``: الدالة التي تنشئ النموذج (عادةً crewai.llm.LLM)
+    - ``idle_ttl``: الثواني التي يبقى فيها نموذج غير مستخدم قبل إخلائه
+    - ``max_size``: أقصى عدد من النماذج في المجمع (يُخلى الأقل استخداماً)
+    """
+
+    def __init__(self, factory, idle_ttl=900, max_size=64):
+        self.factory = factory
+        self.idle_ttl = idle_ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, config, stream=False):
+        """
+        إرجاع نموذج جاهز للتكوين المحدد (وإنشاؤه عند أول استخدام).
+        ``config`` كائن ModelConfig من الفهرس: كل تكوين فريد كائن واحد،
+        فيكفي (config, stream) مفتاحاً للمجمع.
+        """
+        key = (config, stream)
+        with self._lock:
+            llm = self._touch(key)
+        if llm is not None:
+            return llm
+
+        # الإنشاء خارج القفل حتى لا يوقف عميل بطيء بقية النماذج
+        llm = self.factory(
+            model=config.model,
+            api_key=config.api_key,
+            base_url=config.base_url,
+            temperature=config.temperature,
+            stream=stream,
+        )
+        with self._lock:
+            # أنشأه خيط آخر في الأثناء: تُعاد نسخته حتى يبقى نموذج واحد لكل تكوين
+            existing = self._touch(key)
+            if existing is not None:
+                return existing
+            now = time.monotonic()
+            self._entries[key] = [llm, now]
+            self._evict(now)
+            return llm
+
+    def _touch(self, key):
+        """النموذج المخزن للمفتاح مع تحديث وقت استخدامه، أو None (مع الاحتفاظ بالقفل)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        entry[1] = now
+        self._entries.move_to_end(key)
+        self._evict(now)
+        return entry[0]
+
+    def evict_idle(self):
+        """إخلاء النماذج التي تجاوزت مدة الخمول"""
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def clear(self):
+        """إفراغ المجمع"""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, now):
+        expires_before = now - self.idle_ttl
+        while self._entries:
+            key, (_, last_used) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_size and last_used > expires_before:
+                break
+            del self._entries[key]
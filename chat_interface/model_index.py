@@ -0,0 +1,115 @@
+"""
+فهرس ثابت لتحويل نوع المهمة إلى تكوين النموذج
+يُحل كل نوع مهمة مرة واحدة (عند بدء التشغيل أو أول استخدام) ثم تصبح
+كل عملية اختيار بحثاً واحداً في قاموس دون إنشاء كائنات جديدة
+"""
+
+import threading
+from dataclasses import dataclass
+
+# مستويات الأداء التي يدعمها HuggingFaceModelManager.select_model
+PERFORMANCE_LEVELS = ("fast", "balanced", "best")
+
+
+@dataclass(frozen=True, eq=False)
+class ModelConfig:
+    """
+    تكوين نموذج مجمّد. كل تكوين فريد له كائن واحد فقط في الفهرس،
+    لذا تُقارن التكوينات وتُستخدم كمفاتيح بالهوية (أسرع من مقارنة الحقول).
+    """
+
+    __slots__ = ("model", "api_key", "base_url", "temperature")
+
+    model: str
+    api_key: str
+    base_url: str
+    temperature: float
+
+    def as_dict(self):
+        """التكوين بصيغة قاموس كما يُرجعه select_model"""
+        return {
+            "model": self.model,
+            "api_key": self.api_key,
+            "base_url": self.base_url,
+            "temperature": self.temperature,
+        }
+
+
+def normalize_task_type(task_type):
+    """توحيد كتابة نوع المهمة: 'Code-Python ' -> 'code_python'"""
+    return "_".join(task_type.replace("-", " ").split()).casefold()
+
+
+class ModelIndex:
+    """
+    - ``manager``: HuggingFaceModelManager لحل نوع المهمة أول مرة فقط
+    - ``levels``: مستويات الأداء المؤهلة لكل نوع مهمة
+    - ``default_level``: المستوى المفضل (أول المرشحين)
+    """
+
+    def __init__(self, manager, levels=PERFORMANCE_LEVELS, default_level="balanced"):
+        self.manager = manager
+        self.levels = tuple(levels)
+        self.default_level = default_level
+        self._candidates = {}
+        self._interned = {}
+        self._lock = threading.Lock()
+
+    def warm(self, task_types):
+        """حل أنواع المهام مسبقاً عند بدء التشغيل (يتجاهل الأنواع غير المتاحة)"""
+        for task_type in task_types:
+            try:
+                self.candidates(task_type)
+            except ValueError:
+                continue
+
+    def resolve(self, task_type):
+        """التكوين المفضل لنوع المهمة"""
+        return self.candidates(task_type)[0]
+
+    def candidates(self, task_type):
+        """التكوينات المؤهلة لنوع المهمة (tuple)، المفضل أولاً"""
+        candidates = self._candidates.get(task_type)
+        if candidates is None:
+            candidates = self._build(task_type)
+        return candidates
+
+    def _build(self, task_type):
+        normalized = normalize_task_type(task_type)
+        with self._lock:
+            candidates = self._candidates.get(normalized)
+            if candidates is None:
+                candidates = self._select_candidates(normalized)
+                self._candidates[normalized] = candidates
+            # الكتابة الأصلية تصبح اسماً مستعاراً للنوع الموحد
+            self._candidates[task_type] = candidates
+        return candidates
+
+    def _select_candidates(self, task_type):
+        ordered = sorted(self.levels, key=lambda level: level != self.default_level)
+        candidates = []
+        for level in ordered:
+            try:
+                config = self.manager.select_model(
+                    task_type=task_type, performance_level=level
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+            config = self._intern(config)
+            if config not in candidates:
+                candidates.append(config)
+        if not candidates:
+            candidates.append(self._intern(self.manager.select_model(task_type=task_type)))
+        return tuple(candidates)
+
+    def _intern(self, config):
+        key = (config["model"], config["base_url"], config["temperature"])
+        interned = self._interned.get(key)
+        if interned is None:
+            interned = self._interned[key] = ModelConfig(
+                model=config["model"],
+                api_key=config["api_key"],
+                base_url=config["base_url"],
+                temperature=config["temperature"],
+            )
+        return interned
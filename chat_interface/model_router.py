@@ -0,0 +1,220 @@
+"""
+موجّه النماذج حسب زمن الاستجابة والحمل
+يحتفظ بإحصاءات متحركة لكل نموذج (زمن الاستجابة، نسبة الأخطاء، الرموز في الثانية)
+من أحداث استدعاء النماذج، ويختار بين النماذج المؤهلة لنوع المهمة
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+
+class ModelStats:
+    """إحصاءات متحركة لنموذج واحد (آخر ``window`` استدعاء)"""
+
+    def __init__(self, window=100):
+        self.samples = deque(maxlen=window)
+        self.inflight = 0
+        self.open_until = 0.0
+
+    def record(self, latency, ok, tokens=0):
+        self.samples.append((latency, ok, tokens))
+
+    @property
+    def error_rate(self):
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok, _ in self.samples if not ok) / len(self.samples)
+
+    @property
+    def p95_latency(self):
+        latencies = sorted(latency for latency, ok, _ in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)]
+
+    @property
+    def tokens_per_second(self):
+        total_time = sum(latency for latency, ok, _ in self.samples if ok)
+        if not total_time:
+            return None
+        return sum(tokens for _, ok, tokens in self.samples if ok) / total_time
+
+    def snapshot(self):
+        return {
+            "calls": len(self.samples),
+            "inflight": self.inflight,
+            "error_rate": self.error_rate,
+            "p95_latency": self.p95_latency,
+            "tokens_per_second": self.tokens_per_second,
+            "available": self.open_until <= time.monotonic(),
+        }
+
+
+class ModelRouter:
+    """
+    - ``index``: ModelIndex يحدد النماذج المؤهلة لكل نوع مهمة (المفضل أولاً)
+    - ``tolerance``: نسبة التحسن المطلوبة لترك النموذج المفضل
+    - ``max_error_rate`` و ``cooldown``: إيقاف النموذج مؤقتاً عند تدهوره
+    - ``stale_after``: الاستدعاء الذي لم يصل حدث نهايته خلال هذه المدة (أُلغي أو فشل
+      معالجه) يُحذف من الحمل الجاري حتى لا يبقى يثقل النموذج للأبد
+    """
+
+    def __init__(
+        self,
+        index,
+        window=100,
+        min_samples=5,
+        tolerance=0.2,
+        max_error_rate=0.5,
+        cooldown=30.0,
+        stale_after=600.0,
+    ):
+        self.index = index
+        self.window = window
+        self.min_samples = min_samples
+        self.tolerance = tolerance
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.stale_after = stale_after
+        self._stats = {}
+        # معرف الاستدعاء -> (النموذج، وقت البداية)
+        self._started = {}
+        self._next_expiry = 0.0
+        self._lock = threading.Lock()
+
+    def choose(self, task_type):
+        """اختيار التكوين الأنسب الآن لنوع المهمة"""
+        candidates = self.index.candidates(task_type)
+        preferred = candidates[0]
+        if len(candidates) == 1:
+            return preferred
+
+        now = time.monotonic()
+        with self._lock:
+            self._expire_stale(now)
+            available = [
+                config for config in candidates
+                if self._get_stats(config.model).open_until <= now
+            ]
+            if not available:
+                # كل النماذج متدهورة: نختار الأقل أخطاءً
+                return min(
+                    candidates,
+                    key=lambda config: self._get_stats(config.model).error_rate,
+                )
+            if preferred not in available:
+                preferred = available[0]
+
+            preferred_stats = self._get_stats(preferred.model)
+            if len(preferred_stats.samples) < self.min_samples:
+                return preferred
+            baseline = preferred_stats.p95_latency
+            if baseline is None:
+                return preferred
+
+            best, best_score = preferred, self._score(preferred, baseline)
+            for config in available:
+                score = self._score(config, baseline)
+                if score < best_score * (1 - self.tolerance):
+                    best, best_score = config, score
+            return best
+
+    def _score(self, config, baseline):
+        """
+        زمن الاستجابة المتوقع: p95 مضروباً في الحمل الحالي.
+        النموذج الذي لا يملك عينات كافية يُقدّر بزمن النموذج المفضل، فيُجرَّب
+        فقط عندما يكون المفضل تحت الحمل.
+        """
+        stats = self._get_stats(config.model)
+        p95 = stats.p95_latency if len(stats.samples) >= self.min_samples else None
+        return (p95 if p95 is not None else baseline) * (1 + stats.inflight)
+
+    def _get_stats(self, model):
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(self.window)
+        return stats
+
+    def _release(self, call_id):
+        """إزالة استدعاء من الحمل الجاري وإرجاع (النموذج، وقت البداية) أو None"""
+        entry = self._started.pop(call_id, None)
+        if entry is not None:
+            stats = self._get_stats(entry[0])
+            stats.inflight = max(0, stats.inflight - 1)
+        return entry
+
+    def _expire_stale(self, now):
+        """حذف الاستدعاءات التي لم يصل حدث نهايتها (مرة كل ``stale_after / 10`` على الأكثر)"""
+        if now < self._next_expiry:
+            return
+        self._next_expiry = now + self.stale_after / 10
+        for call_id, (_, started) in list(self._started.items()):
+            if now - started >= self.stale_after:
+                self._release(call_id)
+
+    def call_started(self, model, call_id):
+        """تسجيل بداية استدعاء"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire_stale(now)
+            # استدعاء سابق بالمعرف نفسه لم يصل حدث نهايته
+            self._release(call_id)
+            self._get_stats(model).inflight += 1
+            self._started[call_id] = (model, now)
+
+    def call_finished(self, model, call_id, ok=True, tokens=0):
+        """تسجيل نهاية استدعاء ونتيجته"""
+        with self._lock:
+            entry = self._release(call_id)
+            if entry is None:
+                return
+            model, started = entry
+            stats = self._get_stats(model)
+            stats.record(time.monotonic() - started, ok, tokens)
+            if (
+                len(stats.samples) >= self.min_samples
+                and stats.error_rate >= self.max_error_rate
+            ):
+                stats.open_until = time.monotonic() + self.cooldown
+                # نبدأ نافذة جديدة بعد فترة الإيقاف
+                stats.samples.clear()
+
+    def stats(self):
+        """لقطة من إحصاءات جميع النماذج"""
+        with self._lock:
+            self._expire_stale(time.monotonic())
+            return {model: stats.snapshot() for model, stats in self._stats.items()}
+
+    def listen(self, event_bus):
+        """ربط الموجّه بأحداث استدعاء النماذج على ناقل الأحداث"""
+        from crewai.utilities.events.llm_events import (
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+        )
+
+        def call_id(source):
+            # الناقل يستدعي المعالجات في خيط الاستدعاء نفسه
+            return (threading.get_ident(), id(source))
+
+        @event_bus.on(LLMCallStartedEvent)
+        def on_llm_call_started(source, event):
+            model = getattr(source, "model", None)
+            if model:
+                self.call_started(model, call_id(source))
+
+        @event_bus.on(LLMCallCompletedEvent)
+        def on_llm_call_completed(source, event):
+            model = getattr(source, "model", None)
+            if model:
+                # تقدير تقريبي: 4 أحرف لكل رمز
+                tokens = len(str(event.response or "")) / 4
+                self.call_finished(model, call_id(source), ok=True, tokens=tokens)
+
+        @event_bus.on(LLMCallFailedEvent)
+        def on_llm_call_failed(source, event):
+            model = getattr(source, "model", None)
+            if model:
+                self.call_finished(model, call_id(source), ok=False)
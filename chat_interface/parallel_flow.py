@@ -0,0 +1,186 @@
+"""
+تشغيل مستمعي التدفق المستقلين بالتوازي
+يجمع Flow المستمعين الجاهزين بـ asyncio.gather، لكن الطرق المتزامنة تعمل داخل
+حلقة الأحداث نفسها فتُنفذ واحدة بعد الأخرى. هنا تُرسل الطرق المتزامنة إلى مجمع
+خيوط محدود، فيصبح زمن تفرع التدفق إلى عدة أطقم زمن أطول فرع لا مجموع الفروع.
+
+لكل طريقة نسخة خاصة من الحالة، وتُدمج تغييراتها في الحالة المشتركة عند انتهائها
+مقارنةً بالحالة عند بدايتها: العناصر المضافة إلى آخر القوائم ومفاتيح القواميس المعدلة
+تُدمج من كل الفروع، وإن وضع فرعان قيمتين مختلفتين في الحقل نفسه (أو مفتاح القاموس
+نفسه) يُرفع ``BranchConflictError``. ويؤجَّل حفظ ``@persist`` للطريقة إلى ما بعد
+الدمج، فتُحفظ الحالة المشتركة لا نسخة الفرع.
+
+النسخة تُؤخذ بـ ``copy.deepcopy`` للحالة كاملة عند بداية كل طريقة: كلفتها تتناسب مع
+حجم الحالة، وتتطلب حالة قابلة للنسخ العميق (كما يتطلب Flow نفسه لأحداث الطرق).
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from crewai.flow.flow import Flow
+from crewai.flow.persistence.decorators import PersistenceDecorator
+from pydantic import BaseModel
+
+# الفرع الذي تنفذه الطريقة الحالية (في مهمة asyncio أو خيط المجمع)
+_current_branch = contextvars.ContextVar("flow_branch", default=None)
+
+_MISSING = object()
+
+
+class BranchConflictError(RuntimeError):
+    """يُرفع عندما يضع فرعان متزامنان قيمتين مختلفتين في الحقل نفسه"""
+
+
+def _fields(state):
+    if isinstance(state, BaseModel):
+        return {name: getattr(state, name) for name in type(state).model_fields}
+    return dict(state)
+
+
+def _assign(state, name, value):
+    if isinstance(state, BaseModel):
+        setattr(state, name, value)
+    else:
+        state[name] = value
+
+
+def _extends(value, base):
+    return isinstance(value, list) and isinstance(base, list) and value[: len(base)] == base
+
+
+def _merge_dict(name, base, current, value):
+    """تطبيق مفاتيح القاموس التي غيّرها الفرع على نسخة من القيمة المشتركة"""
+    merged = dict(current)
+    for key in base.keys() | value.keys():
+        before, after = base.get(key, _MISSING), value.get(key, _MISSING)
+        if after is before or after == before:
+            continue
+        now = current.get(key, _MISSING)
+        if not (now is before or now == before or now == after):
+            raise BranchConflictError(f"غيّر فرعان متزامنان المفتاح {key!r} في الحقل {name!r}")
+        if after is _MISSING:
+            merged.pop(key, None)
+        else:
+            merged[key] = after
+    return merged
+
+
+class _Branch:
+    """نسخة الحالة لطريقة واحدة، مع قيم الحقول عند البداية لمعرفة ما غيّرته"""
+
+    __slots__ = ("flow", "base", "state", "persists")
+
+    def __init__(self, flow):
+        self.flow = flow
+        # الدمج يستبدل الحقول ولا يعدّلها في مكانها، فتكفي الإشارات إلى قيمها الحالية
+        self.base = _fields(flow._state)
+        self.state = flow._copy_state()
+        # استدعاءات حفظ @persist المؤجلة إلى ما بعد الدمج
+        self.persists = []
+
+    def merge(self):
+        shared = self.flow._state
+        current = _fields(shared)
+        merged = {}
+        # التحقق من كل الحقول قبل التعديل، فلا يُدمج نصف الفرع عند التعارض
+        for name, value in _fields(self.state).items():
+            base = self.base.get(name, _MISSING)
+            if value is base or value == base:
+                continue
+            now = current.get(name, _MISSING)
+            if now is base or now == base or now == value:
+                merged[name] = value
+            elif _extends(value, base) and _extends(now, base):
+                # أضاف الفرعان إلى آخر القائمة نفسها: إضافات هذا الفرع بعد الأخرى
+                merged[name] = now + value[len(base):]
+            elif all(isinstance(item, dict) for item in (base, now, value)):
+                merged[name] = _merge_dict(name, base, now, value)
+            else:
+                raise BranchConflictError(f"غيّر فرعان متزامنان الحقل {name!r}")
+        for name, value in merged.items():
+            _assign(shared, name, value)
+
+
+def _persist_state(cls, flow_instance, method_name, persistence_instance, verbose=False):
+    """بديل PersistenceDecorator.persist_state يؤجل الحفظ داخل فروع ParallelFlow"""
+    branch = _current_branch.get()
+    if branch is not None and branch.flow is flow_instance:
+        branch.persists.append((method_name, persistence_instance, verbose))
+        return
+    _persist_state.__wrapped__(flow_instance, method_name, persistence_instance, verbose)
+
+
+def _defer_persistence():
+    """استبدال حفظ @persist (مرة واحدة)"""
+    if getattr(PersistenceDecorator.persist_state, "__func__", None) is not _persist_state:
+        _persist_state.__wrapped__ = PersistenceDecorator.persist_state
+        PersistenceDecorator.persist_state = classmethod(_persist_state)
+
+
+class ParallelFlow(Flow):
+    """
+    Flow ينفذ الطرق المتزامنة في مجمع خيوط، فتعمل المستمعات الجاهزة معاً.
+
+    - ``max_workers``: أقصى عدد من الطرق المتزامنة التي تعمل في الوقت نفسه
+
+    الموجّهات (``@router``) تبقى في حلقة الأحداث لأن Flow يقرأ نتيجتها من آخر
+    المخرجات، لكنها تعمل على نسخة من الحالة كغيرها فلا تُعدَّل الحالة المشتركة في
+    مكانها أبداً. تغييرات الطريقة التي ترفع استثناءً لا تُدمج في الحالة ولا تُحفظ،
+    والطريقة التي تتعارض تغييراتها مع فرع آخر ترفع ``BranchConflictError``.
+    """
+
+    max_workers = 8
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._executor = None
+        _defer_persistence()
+
+    @property
+    def state(self):
+        branch = _current_branch.get()
+        if branch is not None and branch.flow is self:
+            return branch.state
+        return self._state
+
+    async def kickoff_async(self, inputs=None):
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="flow-method"
+        ) as executor:
+            self._executor = executor
+            try:
+                return await super().kickoff_async(inputs)
+            finally:
+                self._executor = None
+
+    async def _execute_method(self, method_name, method, *args, **kwargs):
+        return await super()._execute_method(
+            method_name, self._in_branch(method_name, method), *args, **kwargs
+        )
+
+    def _in_branch(self, method_name, method):
+        """تغليف الطريقة لتعمل على نسخة من الحالة (وفي المجمع إن كانت متزامنة)"""
+        in_executor = method_name not in self._routers
+
+        async def run(*args, **kwargs):
+            branch = _Branch(self)
+            token = _current_branch.set(branch)
+            try:
+                if asyncio.iscoroutinefunction(method):
+                    result = await method(*args, **kwargs)
+                elif in_executor:
+                    call = partial(contextvars.copy_context().run, method, *args, **kwargs)
+                    result = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+                else:
+                    result = method(*args, **kwargs)
+            finally:
+                _current_branch.reset(token)
+            branch.merge()
+            # بعد الدمج وخارج الفرع: تُحفظ الحالة المشتركة بما فيها تغييرات الفروع الأخرى
+            for name, persistence, verbose in branch.persists:
+                PersistenceDecorator.persist_state(self, name, persistence, verbose)
+            return result
+
+        return run
@@ -0,0 +1,366 @@
+"""
+تشغيل الأدوات كثيفة المعالجة في عمليات منفصلة
+الأداة في CrewAI تعمل في خيط الوكيل وتمسك GIL طوال عملها، فتتوقف كل الأطقم الأخرى
+في العملية حتى تنتهي (تحليل الملفات، تحليل الشيفرة، الحسابات العددية). هنا:
+1. عمال دائمون في عمليات منفصلة يُعاد استخدامهم بين الاستدعاءات، مع نسخة
+   من الأداة تبقى في العامل
+2. المعاملات بـ pickle (البروتوكول 5)، والمخازن الكبيرة (bytes و bytearray و
+   مصفوفات numpy و PickleBuffer) عبر ذاكرة مشتركة بدلاً من الأنبوب
+3. مهلة وحد للذاكرة لكل استدعاء؛ العامل الذي يتجاوز المهلة أو يسقط يُقتل ويُستبدل
+``ProcessPoolTool`` يستبدل ``_run`` في الصنف فقط، فتبقى أحداث ToolUsage وعداد الاستخدام كما هي.
+"""
+
+import asyncio
+import atexit
+import functools
+import inspect
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Any, Optional
+
+from pydantic import Field, PrivateAttr
+
+from crewai.tools import BaseTool
+
+try:
+    import resource
+except ImportError:  # Windows: لا حد للذاكرة
+    resource = None
+
+
+class ToolProcessError(RuntimeError):
+    """يُرفع عندما يسقط عامل الأداة أو تتعذر إعادة نتيجتها"""
+
+
+class ToolTimeoutError(ToolProcessError, TimeoutError):
+    """يُرفع عندما يتجاوز الاستدعاء مهلته، بعد قتل العامل"""
+
+
+def _noop():
+    return None
+
+
+def _set_memory_limit(limit):
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (limit or hard, hard))
+
+
+def _attach(block):
+    """مخزن من الذاكرة المشتركة أو بايتات مرسلة في الأنبوب"""
+    if isinstance(block, bytes):
+        return block, None
+    name, size = block
+    # متتبع الموارد مشترك مع المستدعي، وهو من يحذف الكتلة بعد الاستدعاء
+    shm = shared_memory.SharedMemory(name=name)
+    return shm.buf[:size], shm
+
+
+def _worker_main(conn, memory_limit):
+    _set_memory_limit(memory_limit)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        except Exception as e:
+            # الرسالة قُرئت كاملة، فيبقى الأنبوب صالحاً للاستدعاء التالي
+            conn.send((False, ToolProcessError(f"تعذر قراءة الاستدعاء في العامل: {e!r}")))
+            continue
+        payload, blocks, limit = message
+        attached = [_attach(block) for block in blocks]
+        try:
+            _set_memory_limit(limit or memory_limit)
+            func, args, kwargs = pickle.loads(payload, buffers=[buffer for buffer, _ in attached])
+            reply = (True, func(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+        finally:
+            _set_memory_limit(memory_limit)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send((False, ToolProcessError(f"تعذر إرجاع نتيجة الأداة: {e}")))
+        func = args = kwargs = reply = None
+        for buffer, shm in attached:
+            if shm is not None:
+                try:
+                    buffer.release()
+                    shm.close()
+                except BufferError:
+                    # ما زال كائن من الاستدعاء يشير إلى الكتلة؛ تُغلق مع جمع المهملات
+                    pass
+
+
+class _LargeBuffer:
+    """bytes أو bytearray كبير يُنقل خارج الأنبوب ويعود بنوعه في العامل"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __reduce_ex__(self, protocol):
+        return type(self.data), (pickle.PickleBuffer(self.data),)
+
+
+class _Worker:
+    def __init__(self, context, memory_limit):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit), name="tool-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def _default_start_method():
+    methods = multiprocessing.get_all_start_methods()
+    # fork من عملية فيها خيوط قد يرث أقفالاً مغلقة
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+class ProcessToolExecutor:
+    """
+    - ``max_workers``: عدد العمليات (الافتراضي عدد الأنوية)
+    - ``timeout``: المهلة الافتراضية لكل استدعاء بالثواني
+    - ``memory_limit``: الحد الافتراضي لذاكرة العامل بالبايت (RLIMIT_AS، على POSIX)
+    - ``shared_memory_threshold``: المخازن الأكبر من هذا الحجم تمر عبر الذاكرة المشتركة
+    - ``start_method``: طريقة إنشاء العمليات (الافتراضي forkserver حيث يتوفر)
+    """
+
+    def __init__(
+        self,
+        max_workers=None,
+        timeout=None,
+        memory_limit=None,
+        shared_memory_threshold=1024 * 1024,
+        start_method=None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.shared_memory_threshold = shared_memory_threshold
+        self._context = multiprocessing.get_context(start_method or _default_start_method())
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._closed = False
+
+    def warm(self):
+        """تشغيل كل العمال مسبقاً وانتظار جاهزيتهم بدلاً من عند أول استدعاء"""
+        with self._lock:
+            missing = self.max_workers - len(self._workers)
+        workers = [self._start_worker() for _ in range(missing)]
+        ping = pickle.dumps((_noop, (), {}), protocol=5)
+        for worker in workers:
+            worker.conn.send((ping, [], None))
+        for worker in workers:
+            # يعود الرد بعد أن ينتهي العامل من استيراد وحداته
+            worker.conn.recv()
+            self._idle.put(worker)
+
+    def _start_worker(self):
+        worker = _Worker(self._context, self.memory_limit)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _checkout(self):
+        """عامل خامل حي أو عامل جديد"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return self._start_worker()
+            if worker.process.is_alive():
+                return worker
+            self._discard(worker)
+
+    def _discard(self, worker):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _wrap(self, value):
+        if isinstance(value, (bytes, bytearray)) and len(value) >= self.shared_memory_threshold:
+            return _LargeBuffer(value)
+        return value
+
+    def _dump(self, func, args, kwargs):
+        """(payload، كتل المخازن، كتل الذاكرة المشتركة المنشأة)"""
+        args = tuple(self._wrap(value) for value in args)
+        kwargs = {name: self._wrap(value) for name, value in kwargs.items()}
+        buffers = []
+        payload = pickle.dumps((func, args, kwargs), protocol=5, buffer_callback=buffers.append)
+        blocks, created = [], []
+        for buffer in buffers:
+            view = buffer.raw()
+            if view.nbytes < self.shared_memory_threshold:
+                blocks.append(bytes(view))
+                continue
+            shm = shared_memory.SharedMemory(create=True, size=view.nbytes)
+            shm.buf[: view.nbytes] = view
+            created.append(shm)
+            blocks.append((shm.name, view.nbytes))
+        return payload, blocks, created
+
+    def call(self, func, args=(), kwargs=None, timeout=None, memory_limit=None):
+        """تنفيذ ``func(*args, **kwargs)`` في عامل وإرجاع نتيجته أو رفع استثنائه"""
+        if self._closed:
+            raise ToolProcessError("تم إيقاف منفذ الأدوات")
+        timeout = self.timeout if timeout is None else timeout
+        payload, blocks, created = self._dump(func, args, kwargs or {})
+
+        self._slots.acquire()
+        try:
+            worker = self._checkout()
+            try:
+                worker.conn.send((payload, blocks, memory_limit))
+                finished = worker.conn.poll(timeout)
+                if finished:
+                    ok, value = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                self._discard(worker)
+                raise ToolProcessError(f"توقف عامل الأداة بشكل غير متوقع: {e!r}") from None
+            if not finished:
+                self._discard(worker)
+                raise ToolTimeoutError(f"تجاوزت الأداة المهلة ({timeout} ثانية)")
+            self._idle.put(worker)
+        finally:
+            self._slots.release()
+            for shm in created:
+                shm.close()
+                shm.unlink()
+
+        if not ok:
+            raise value
+        return value
+
+    def shutdown(self):
+        """إيقاف كل العمال"""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, set()
+        for worker in workers:
+            worker.conn.close()
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def default_process_executor():
+    """منفذ مشترك بعدد الأنوية، يُنشأ عند أول استخدام ويُوقف عند الخروج"""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ProcessToolExecutor()
+            atexit.register(_shared_executor.shutdown)
+        return _shared_executor
+
+
+# نسخ الأدوات داخل العامل، حتى لا تُبنى الأداة مع كل استدعاء:
+# مفتاح الأداة -> (حقولها عند البناء، النسخة)، وتُخلى الأقدم استخداماً بعد الحد
+_tool_instances = OrderedDict()
+_MAX_TOOL_INSTANCES = 64
+
+# حقول لا تُنقل إلى العامل: مخطط المعاملات يُبنى هناك من جديد، و cache_function و
+# process_executor غير قابلين لـ pickle، والباقي عدادات تتغير مع كل استدعاء فتُعيد بناء الأداة
+_LOCAL_FIELDS = {
+    "args_schema",
+    "cache_function",
+    "process_executor",
+    "current_usage_count",
+    "max_usage_count",
+    "description_updated",
+}
+
+
+def _call_tool(cls, key, state, args, kwargs):
+    """يعمل داخل العامل: ``_run`` الأصلي للأداة"""
+    cached = _tool_instances.get(key)
+    if cached is not None and cached[0] == state:
+        tool = cached[1]
+        _tool_instances.move_to_end(key)
+    else:
+        # أداة جديدة أو تغيرت حقولها منذ البناء
+        tool = cls(**state)
+        _tool_instances[key] = (state, tool)
+        _tool_instances.move_to_end(key)
+        while len(_tool_instances) > _MAX_TOOL_INSTANCES:
+            _tool_instances.popitem(last=False)
+    # _run في الصنف يرسل إلى العامل؛ __wrapped__ هو تنفيذ الأداة الفعلي
+    result = cls._run.__wrapped__(tool, *args, **kwargs)
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    return result
+
+
+def _in_process(run):
+    """``_run`` للصنف: يرسل الاستدعاء إلى عامل، ويبقى التنفيذ الأصلي في ``__wrapped__``"""
+
+    # wraps ينسخ التعليقات التوضيحية التي يبني منها BaseTool مخطط المعاملات
+    @functools.wraps(run)
+    def _run(self, *args, **kwargs):
+        return self._run_in_process(*args, **kwargs)
+
+    _run._in_process = True
+    return _run
+
+
+class ProcessPoolTool(BaseTool):
+    """
+    أداة ينفذ ``_run`` فيها في عامل من ProcessToolExecutor بدلاً من خيط الوكيل.
+    يجب أن تكون الأداة معرّفة في وحدة قابلة للاستيراد، وحقولها ومعاملاتها ونتيجتها قابلة لـ pickle.
+
+    - ``process_timeout``: مهلة كل استدعاء بالثواني (الافتراضي مهلة المنفذ)
+    - ``process_memory_limit``: حد الذاكرة لكل استدعاء بالبايت (الافتراضي حد المنفذ)
+    - ``process_executor``: المنفذ (الافتراضي المنفذ المشترك)
+    """
+
+    process_timeout: Optional[float] = None
+    process_memory_limit: Optional[int] = None
+    process_executor: Optional[Any] = Field(default=None, exclude=True)
+
+    _process_key: str = PrivateAttr(default_factory=lambda: uuid.uuid4().hex)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        # BaseTool.run و to_structured_tool يستدعيان self._run: يمر عبر العامل بحقول
+        # النسخة نفسها (وكذلك نسخ model_copy)
+        run = cls.__dict__.get("_run")
+        if run is not None and not getattr(run, "_in_process", False):
+            cls._run = _in_process(run)
+
+    def _run_in_process(self, *args, **kwargs):
+        state = {
+            name: getattr(self, name)
+            for name in type(self).model_fields
+            if name not in _LOCAL_FIELDS
+        }
+        executor = self.process_executor or default_process_executor()
+        return executor.call(
+            _call_tool,
+            (type(self), self._process_key, state, args, kwargs),
+            timeout=self.process_timeout,
+            memory_limit=self.process_memory_limit,
+        )
@@ -0,0 +1,160 @@
+"""
+ذاكرة تخزين مؤقت دلالية لردود النماذج
+تبحث أولاً بتجزئة الرسالة بعد توحيدها، ثم بالتشابه الدلالي باستخدام
+دالة التضمين التي يهيئها EmbeddingConfigurator، فتتجنب إعادة الاستدعاء البعيد
+للرسائل المتطابقة أو شبه المتطابقة
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from crewai.rag.embeddings.configurator import EmbeddingConfigurator
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from event_dispatch import has_handlers
+
+
+class ResponseCacheHitEvent(BaseEvent):
+    """رد مُقدم من الذاكرة المؤقتة دون استدعاء النموذج"""
+
+    type: str = "response_cache_hit"
+    model: str
+    similarity: float
+
+
+class ResponseCacheMissEvent(BaseEvent):
+    """لا يوجد رد مخزن مطابق للرسالة"""
+
+    type: str = "response_cache_miss"
+    model: str
+
+
+CacheKey = namedtuple("CacheKey", ["model", "digest", "vector"])
+
+
+class _Entry:
+    __slots__ = ("response", "vector", "expires_at")
+
+    def __init__(self, response, vector, expires_at):
+        self.response = response
+        self.vector = vector
+        self.expires_at = expires_at
+
+
+def normalize_prompt(prompt):
+    """توحيد المسافات وحالة الأحرف قبل التجزئة والتضمين"""
+    return " ".join(prompt.split()).casefold()
+
+
+class ResponseCache:
+    """
+    - ``embedder_config``: إعداد دالة التضمين لـ EmbeddingConfigurator
+      (``None`` يعني البحث بالتطابق التام فقط)
+    - ``threshold``: أدنى تشابه (cosine) لاعتبار الرسالة مطابقة
+    - ``ttl``: مدة صلاحية الرد المخزن بالثواني
+    - ``max_entries``: أقصى عدد من الردود (يُخلى الأقل استخداماً)
+    """
+
+    def __init__(self, embedder_config=None, threshold=0.95, ttl=3600, max_entries=1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = (
+            EmbeddingConfigurator().configure_embedder(embedder_config)
+            if embedder_config is not None
+            else None
+        )
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, model, prompt):
+        """
+        البحث عن رد مخزن للرسالة.
+        يُرجع (الرد أو None، مفتاح) ويُمرر المفتاح إلى ``store`` عند الإخفاق
+        حتى لا يُحسب التضمين مرتين.
+        """
+        normalized = normalize_prompt(prompt)
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get((model, digest))
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end((model, digest))
+                response = entry.response
+            else:
+                response = None
+
+        if response is not None:
+            self._emit_hit(model, 1.0)
+            return response, CacheKey(model, digest, None)
+
+        vector = self._embed(normalized)
+        if vector is not None:
+            response, similarity = self._nearest(model, vector, now)
+            if response is not None:
+                self._emit_hit(model, similarity)
+                return response, CacheKey(model, digest, vector)
+
+        if has_handlers(crewai_event_bus, ResponseCacheMissEvent):
+            crewai_event_bus.emit(self, ResponseCacheMissEvent(model=model))
+        return None, CacheKey(model, digest, vector)
+
+    def store(self, key, response):
+        """تخزين رد النموذج للمفتاح الذي أرجعه ``lookup``"""
+        with self._lock:
+            self._entries[(key.model, key.digest)] = _Entry(
+                response, key.vector, time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end((key.model, key.digest))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _embed(self, normalized):
+        if self.embedder is None:
+            return None
+        vector = np.asarray(self.embedder([normalized])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _nearest(self, model, vector, now):
+        """أقرب رد مخزن للنموذج نفسه بالتشابه (cosine)"""
+        with self._lock:
+            expired = []
+            candidates = []
+            for key, entry in self._entries.items():
+                if entry.expires_at <= now:
+                    expired.append(key)
+                elif key[0] == model and entry.vector is not None:
+                    candidates.append((key, entry))
+            for key in expired:
+                del self._entries[key]
+            if not candidates:
+                return None, 0.0
+
+            similarities = np.stack([entry.vector for _, entry in candidates]) @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                return None, similarity
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            return entry.response, similarity
+
+    def _emit_hit(self, model, similarity):
+        if has_handlers(crewai_event_bus, ResponseCacheHitEvent):
+            crewai_event_bus.emit(
+                self, ResponseCacheHitEvent(model=model, similarity=similarity)
+            )
@@ -0,0 +1,225 @@
+"""
+تمرير أجزاء الرد (LLMStreamChunkEvent) إلى صاحب الطلب فقط
+ناقل الأحداث يستدعي المعالجات في خيط الاستدعاء نفسه، لذا يكفي متغير سياق
+(ContextVar) لربط كل جزء بالطلب الذي أنتجه دون خلط بين الجلسات.
+يمكن أيضاً تجميع الأجزاء الصغيرة قبل إرسالها، واشتراك كل معالج بالوتيرة التي تناسبه
+"""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMStreamChunkEvent,
+)
+
+# وتيرة تسليم الأجزاء للمعالج: كل جزء، مجمعة كل ``interval`` ثانية، أو الرد كاملاً في النهاية
+CHUNK_MODES = ("every_chunk", "interval", "final_only")
+
+_chunk_callback = contextvars.ContextVar("chat_chunk_callback", default=None)
+
+
+@contextmanager
+def stream_to(callback):
+    """توجيه أجزاء الرد الناتجة داخل هذا السياق إلى ``callback``"""
+    token = _chunk_callback.set(callback)
+    try:
+        yield
+    finally:
+        _chunk_callback.reset(token)
+        # إرسال ما تبقى في ChunkCoalescer
+        flush = getattr(callback, "flush", None)
+        if flush is not None:
+            flush()
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def forward_stream_chunk(source, event):
+    """إرسال الجزء إلى الطلب الحالي إن كان يطلب البث"""
+    callback = _chunk_callback.get()
+    if callback is not None:
+        callback(event.chunk)
+
+
+class _FlushScheduler:
+    """خيط واحد يرسل ما تبقى في كل ChunkCoalescer عند انتهاء نافذته دون انتظار جزء جديد"""
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, deadline, coalescer, generation):
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="chunk-flush", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (deadline, next(self._sequence), coalescer, generation))
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                deadline, _, coalescer, generation = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            coalescer._flush_window(generation)
+
+
+_flush_scheduler = _FlushScheduler()
+
+
+class ChunkCoalescer:
+    """
+    تجميع الأجزاء المتتالية قبل تمريرها إلى ``callback``.
+    يُرسل أول جزء فوراً (زمن أول رمز لا يتأخر)، ثم تُرسل الأجزاء المجمعة عند مرور
+    ``window`` ثانية على أول جزء فيها، حتى لو توقف البث ولم يصل جزء جديد، أو عند
+    بلوغ ``max_bytes``، ويُرسل الباقي عند ``flush()``. النص المرسل مطابق للرد حرفياً.
+    """
+
+    def __init__(self, callback, window=0.05, max_bytes=256):
+        self.callback = callback
+        self.window = window
+        self.max_bytes = max_bytes
+        self._buffer = []
+        self._size = 0
+        self._sent_first = False
+        # يتغير مع كل إرسال، فيتجاهل المؤقت نافذة أُرسلت بالفعل
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, chunk):
+        with self._lock:
+            if not self._sent_first:
+                self._sent_first = True
+                self.callback(chunk)
+                return
+            if not self._buffer:
+                _flush_scheduler.schedule(time.monotonic() + self.window, self, self._generation)
+            self._buffer.append(chunk)
+            self._size += len(chunk.encode("utf-8"))
+            if self._size >= self.max_bytes:
+                self._send()
+
+    def _flush_window(self, generation):
+        with self._lock:
+            if generation == self._generation:
+                self._send()
+
+    def _send(self):
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._size = 0
+            self._generation += 1
+            self.callback(text)
+
+    def flush(self):
+        with self._lock:
+            self._send()
+
+
+class _ChunkSubscription:
+    """أجزاء كل استدعاء جارٍ لمعالج واحد، تُسلّم حسب الوضع المطلوب"""
+
+    def __init__(self, handler, mode, interval):
+        self.handler = handler
+        self.mode = mode
+        self.interval = interval
+        # (الخيط، مصدر الحدث) -> [الأجزاء، آخر حدث، وقت أول جزء]
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def on_chunk(self, source, event):
+        key = (threading.get_ident(), id(source))
+        now = time.monotonic()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = [[], event, now]
+            call[0].append(event.chunk)
+            call[1] = event
+            if self.mode != "interval" or now - call[2] < self.interval:
+                return
+            del self._calls[key]
+        self._deliver(source, call)
+
+    def on_finished(self, source, event):
+        with self._lock:
+            call = self._calls.pop((threading.get_ident(), id(source)), None)
+        if call is not None:
+            self._deliver(source, call)
+
+    def _deliver(self, source, call):
+        chunks, last_event, _ = call
+        self.handler(source, last_event.model_copy(update={"chunk": "".join(chunks)}))
+
+
+def subscribe_chunks(event_bus, mode="every_chunk", interval=0.1):
+    """
+    مثل ``event_bus.on(LLMStreamChunkEvent)`` مع اختيار وتيرة التسليم (CHUNK_MODES).
+    في الوضعين المجمّعين يصل للمعالج حدث واحد يحمل الأجزاء متصلة، ويُسلّم الباقي
+    عند انتهاء الاستدعاء أو فشله.
+    """
+    if mode not in CHUNK_MODES:
+        raise ValueError(f"وضع غير معروف: {mode}")
+
+    def decorator(handler):
+        if mode == "every_chunk":
+            event_bus.register_handler(LLMStreamChunkEvent, handler)
+            return handler
+        for event_type, subscription_handler in _subscription_handlers(handler, mode, interval):
+            event_bus.register_handler(event_type, subscription_handler)
+        return handler
+
+    return decorator
+
+
+def resubscribe_chunk_handlers(event_bus, mode, interval=0.1, keep=()):
+    """
+    تغيير وتيرة معالجات الأجزاء المسجلة حالياً (مثل العرض على الطرفية) إلى ``mode``.
+    المعالجات في ``keep`` تبقى تستقبل كل جزء.
+    """
+    if mode not in CHUNK_MODES:
+        raise ValueError(f"وضع غير معروف: {mode}")
+    if mode == "every_chunk":
+        return
+    handlers = event_bus._handlers.get(LLMStreamChunkEvent, [])
+    moved = [handler for handler in handlers if handler not in keep]
+    handlers[:] = [handler for handler in handlers if handler in keep]
+    for handler in moved:
+        for event_type, subscription_handler in _subscription_handlers(handler, mode, interval):
+            event_bus._handlers.setdefault(event_type, []).append(subscription_handler)
+    table = getattr(event_bus, "dispatch_table", None)
+    if table is not None:
+        table.invalidate()
+
+
+def _subscription_handlers(handler, mode, interval):
+    subscription = _ChunkSubscription(handler, mode, interval)
+
+    def on_chunk(source, event):
+        subscription.on_chunk(source, event)
+
+    def on_finished(source, event):
+        subscription.on_finished(source, event)
+
+    # يظهر اسم المعالج الأصلي في رسائل أخطاء الناقل
+    on_chunk.__name__ = on_finished.__name__ = handler.__name__
+    return [
+        (LLMStreamChunkEvent, on_chunk),
+        (LLMCallCompletedEvent, on_finished),
+        (LLMCallFailedEvent, on_finished),
+    ]
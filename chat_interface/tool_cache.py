@@ -0,0 +1,199 @@
+"""
+ذاكرة مؤقتة لنتائج الأدوات مشتركة بين الأطقم والعمليات
+CacheHandler في CrewAI قاموس داخل تشغيل طاقم واحد، ومفتاحه نص القاموس كما هو.
+هنا المفتاح (اسم الأداة، المعاملات بعد توحيد ترتيبها)، مع طبقة LRU في الذاكرة
+وطبقة SQLite على القرص يتشاركها كل العمال، وصلاحية لكل أداة وشرط تخزين لكل أداة،
+وإخلاء حسب الحجم. فتعمل الأدوات الحتمية المكلفة (البحث، الجلب، تنفيذ الشيفرة)
+مرة واحدة لكل مدخل مهما تعددت الأطقم والعمليات.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import PrivateAttr
+
+from crewai.agents.cache.cache_handler import CacheHandler
+
+
+def cache_key(tool, arguments):
+    """مفتاح ثابت لا يتأثر بترتيب المعاملات أو المسافات"""
+    canonical = json.dumps(
+        arguments, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(f"{tool}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+class ToolResultCache(CacheHandler):
+    """
+    - ``path``: ملف SQLite المشترك بين العمليات (بدونه: الذاكرة فقط)
+    - ``ttl``: مدة الصلاحية الافتراضية بالثواني
+    - ``tool_ttl``: مدة صلاحية لكل أداة بالاسم (0: لا تُخزن نتائجها)
+    - ``cacheable``: شرط لكل أداة ``(arguments, output) -> bool`` قبل التخزين
+    - ``max_entries``: أقصى عدد من النتائج في الذاكرة (يُخلى الأقل استخداماً)
+    - ``max_bytes``: سقف حجم النتائج على القرص (يُخلى الأقدم استخداماً)
+    """
+
+    path: Optional[str] = None
+    ttl: float = 3600
+    tool_ttl: Dict[str, float] = {}
+    cacheable: Dict[str, Callable[[Any, Any], bool]] = {}
+    max_entries: int = 1024
+    max_bytes: int = 256 * 1024 * 1024
+
+    _entries: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _local: Any = PrivateAttr(default_factory=threading.local)
+    _connections: list = PrivateAttr(default_factory=list)
+    _writes: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        if self.path:
+            with self._connection() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS tool_results (
+                        key TEXT PRIMARY KEY,
+                        tool TEXT NOT NULL,
+                        output TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        expires_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    ) WITHOUT ROWID
+                    """
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS tool_results_expires_at ON tool_results (expires_at)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS tool_results_accessed_at ON tool_results (accessed_at)"
+                )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def add(self, tool, input, output):
+        """تخزين نتيجة الأداة (يستدعيها ToolsHandler بعد تشغيل الأداة)"""
+        ttl = self.tool_ttl.get(tool, self.ttl)
+        if ttl <= 0:
+            return
+        predicate = self.cacheable.get(tool)
+        if predicate is not None and not predicate(input, output):
+            return
+
+        key = cache_key(tool, input)
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._entries[key] = (output, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        if not self.path:
+            return
+        try:
+            stored = json.dumps(output, ensure_ascii=False)
+        except TypeError:
+            # نتيجة غير قابلة للتسلسل: تبقى في ذاكرة هذه العملية فقط
+            return
+        with self._connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO tool_results
+                    (key, tool, output, size, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, tool, stored, len(stored), expires_at, now),
+            )
+        # العداد مشترك بين الخيوط: يُحدّث مع مدخلات الذاكرة تحت القفل نفسه
+        with self._lock:
+            self._writes += 1
+            due = self._writes % 64 == 1
+        if due:
+            self.evict()
+
+    def read(self, tool, input):
+        """نتيجة مخزنة صالحة للأداة والمعاملات أو None"""
+        key = cache_key(tool, input)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                del self._entries[key]
+
+        if not self.path:
+            return None
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT output, expires_at FROM tool_results WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE tool_results SET accessed_at = ? WHERE key = ?", (now, key))
+        output = json.loads(row[0])
+        with self._lock:
+            self._entries[key] = (output, row[1])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return output
+
+    def evict(self):
+        """حذف النتائج المنتهية من القرص ثم الأقدم استخداماً حتى العودة تحت ``max_bytes``"""
+        if not self.path:
+            return
+        with self._connection() as conn:
+            conn.execute("DELETE FROM tool_results WHERE expires_at <= ?", (time.time(),))
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tool_results").fetchone()
+            excess = total - self.max_bytes
+            if excess <= 0:
+                return
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM tool_results ORDER BY accessed_at"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM tool_results WHERE key = ?", victims)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM tool_results")
+
+    def close(self):
+        """إغلاق اتصالات كل الخيوط"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def use_tool_cache(crew, cache):
+    """ربط الطاقم ووكلائه بذاكرة مؤقتة مشتركة بدلاً من ذاكرته الخاصة"""
+    crew._cache_handler = cache
+    if crew.cache:
+        for agent in crew.agents:
+            agent.set_cache_handler(cache)
+    return crew
@@ -0,0 +1,224 @@
+"""
+تنفيذ عدة استدعاءات أدوات من خطوة واحدة بالتزامن
+حين يرجع النموذج عدة استدعاءات أدوات في رد واحد ينفذ LLM في CrewAI الأول فقط،
+وكل أداة تعمل بعد الأخرى. هنا تُنتظر الأدوات غير المتزامنة معاً في حلقة الأحداث،
+وتُرسل المتزامنة إلى مجمع خيوط محدود، وتعود النتائج بترتيب الاستدعاءات مع
+أحداث بدء وانتهاء لكل استدعاء، وعدّاد استخدام دقيق لكل أداة رغم التزامن.
+
+النطاق: هذا لا يغيّر خطوات الوكلاء. CrewAgentExecutor و LiteAgent في CrewAI يستدعيان
+``llm.call(messages, callbacks=...)`` دون أدوات ولا ``available_functions`` ويحللان
+استدعاء أداة واحداً من نص الرد عبر ToolUsage، فلا يصل ConcurrentToolLLM إلى تنفيذ
+الأدوات من خطوة وكيل. المستفيد هو من يستدعي ``LLM.call(..., tools=...,
+available_functions=...)`` مباشرة، أو ToolCallRunner على قائمة استدعاءات. ولا يمر
+ToolCallRunner عبر ToolUsage: لا ذاكرة أدوات مؤقتة، ولا إصلاح مدخلات
+(``_validate_tool_input``)، ولا بيانات الوكيل والمهمة في الأحداث؛ تُتحقق المعاملات
+من ``args_schema`` فقط.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import json
+import logging
+import threading
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from crewai.llm import LLM
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallType
+from crewai.utilities.events.tool_usage_events import (
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+from async_tools import run_coroutine
+
+ToolCall = namedtuple("ToolCall", ["name", "arguments"])
+ToolCallResult = namedtuple("ToolCallResult", ["name", "arguments", "output", "error"])
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def _default_executor():
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-call")
+        return _shared_executor
+
+
+# قفل عدّاد الاستخدام لكل أداة، يتشاركه كل المنفذين: id الأداة -> قفل
+# (أدوات pydantic لا تقبل hash، فيُحذف القفل مع الأداة عبر weakref.finalize)
+_usage_locks = {}
+_usage_locks_guard = threading.Lock()
+
+
+def _usage_lock(tool):
+    key = id(tool)
+    with _usage_locks_guard:
+        lock = _usage_locks.get(key)
+        if lock is None:
+            lock = _usage_locks[key] = threading.Lock()
+            weakref.finalize(tool, _usage_locks.pop, key, None)
+        return lock
+
+
+def _validated(tool, arguments):
+    """المعاملات بعد التحقق منها بمخطط الأداة، كما في CrewStructuredTool.invoke"""
+    parse = getattr(tool, "_parse_args", None)
+    if parse is not None:
+        return parse(arguments)
+    schema = getattr(tool, "args_schema", None)
+    if schema is None or not hasattr(tool, "current_usage_count"):
+        return arguments
+    try:
+        return schema.model_validate(arguments).model_dump()
+    except Exception as e:
+        raise ValueError(f"Arguments validation failed: {e}")
+
+
+def _callable_for(tool):
+    """الدالة الفعلية للأداة، دون BaseTool.run الذي يشغّل asyncio.run ويزيد العداد بنفسه"""
+    func = getattr(tool, "func", None)
+    if func is not None and hasattr(tool, "args_schema"):
+        return func
+    if hasattr(tool, "_run") and hasattr(tool, "current_usage_count"):
+        return tool._run
+    return tool
+
+
+class ToolCallRunner:
+    """
+    - ``tools``: أدوات (BaseTool أو CrewStructuredTool) أو قاموس اسم -> أداة أو دالة
+    - ``executor``: مجمع خيوط للأدوات المتزامنة (الافتراضي مجمع مشترك بثمانية خيوط)
+    - ``source``: مصدر أحداث استخدام الأدوات على الناقل
+    """
+
+    def __init__(self, tools, executor=None, source=None):
+        if not isinstance(tools, dict):
+            tools = {tool.name: tool for tool in tools}
+        self.tools = tools
+        self.executor = executor or _default_executor()
+        self.source = source if source is not None else self
+
+    def run(self, calls):
+        """تنفيذ الاستدعاءات من شيفرة متزامنة وإرجاع ToolCallResult لكل استدعاء بترتيبها"""
+        return run_coroutine(self.arun(calls))
+
+    async def arun(self, calls):
+        """تنفيذ الاستدعاءات في الحلقة الحالية"""
+        return list(await asyncio.gather(*(self._call(ToolCall(*call)) for call in calls)))
+
+    def _reserve(self, tool):
+        """حجز استخدام من حد الأداة قبل التشغيل، حتى لا يتجاوزه استدعاءان متزامنان"""
+        limit = getattr(tool, "max_usage_count", None)
+        if not hasattr(tool, "current_usage_count"):
+            return True
+        with _usage_lock(tool):
+            if limit is not None and tool.current_usage_count >= limit:
+                return False
+            tool.current_usage_count += 1
+            return True
+
+    def _release(self, tool):
+        if hasattr(tool, "current_usage_count"):
+            with _usage_lock(tool):
+                tool.current_usage_count -= 1
+
+    async def _call(self, call):
+        tool = self.tools.get(call.name)
+        if tool is None:
+            return ToolCallResult(call.name, call.arguments, None, f"Tool '{call.name}' not found")
+        try:
+            arguments = _validated(tool, call.arguments)
+        except ValueError as e:
+            error = str(e)
+            crewai_event_bus.emit(
+                self.source,
+                ToolUsageErrorEvent(tool_name=call.name, tool_args=call.arguments, error=error),
+            )
+            return ToolCallResult(call.name, call.arguments, None, error)
+        if not self._reserve(tool):
+            return ToolCallResult(
+                call.name,
+                call.arguments,
+                None,
+                f"Tool '{call.name}' has reached its usage limit of {tool.max_usage_count} times "
+                "and cannot be used anymore.",
+            )
+
+        started_at = datetime.now()
+        crewai_event_bus.emit(
+            self.source, ToolUsageStartedEvent(tool_name=call.name, tool_args=call.arguments)
+        )
+        func = _callable_for(tool)
+        try:
+            if inspect.iscoroutinefunction(func):
+                output = await func(**arguments)
+            else:
+                run = contextvars.copy_context().run
+                output = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, lambda: run(func, **arguments)
+                )
+                if inspect.isawaitable(output):
+                    output = await output
+        except Exception as e:
+            # الاستدعاء الفاشل لا يُحتسب من حد الاستخدام، كما في ToolUsage
+            self._release(tool)
+            error = f"Tool execution error: {e}"
+            crewai_event_bus.emit(
+                self.source,
+                ToolUsageErrorEvent(tool_name=call.name, tool_args=call.arguments, error=error),
+            )
+            return ToolCallResult(call.name, call.arguments, None, error)
+
+        crewai_event_bus.emit(
+            self.source,
+            ToolUsageFinishedEvent(
+                output=output,
+                tool_name=call.name,
+                tool_args=call.arguments,
+                started_at=started_at,
+                finished_at=datetime.now(),
+            ),
+        )
+        return ToolCallResult(call.name, call.arguments, output, None)
+
+
+class ConcurrentToolLLM(LLM):
+    """
+    LLM ينفذ كل استدعاءات الأدوات في الرد بالتزامن بدلاً من الأول فقط.
+    مع استدعاء واحد يُرجع نتيجته كما في LLM، ومع عدة استدعاءات تُضم النتائج
+    الناجحة بترتيبها في نص واحد.
+
+    يعمل فقط حين يمرر المستدعي ``available_functions`` إلى ``call``؛ وكلاء CrewAI لا
+    يمررونها، فلا يتغير تنفيذ أدواتهم باستخدام هذا النموذج.
+    """
+
+    def _handle_tool_call(self, tool_calls, available_functions=None):
+        if not tool_calls or not available_functions:
+            return None
+        calls = []
+        for tool_call in tool_calls:
+            try:
+                arguments = json.loads(tool_call.function.arguments or "{}")
+            except json.JSONDecodeError as e:
+                logging.error(f"Error parsing arguments for '{tool_call.function.name}': {e}")
+                continue
+            calls.append(ToolCall(tool_call.function.name, arguments))
+
+        results = ToolCallRunner(available_functions, source=self).run(calls)
+        outputs = [result.output for result in results if result.error is None]
+        for result in results:
+            if result.error is not None:
+                logging.error(f"Error executing function '{result.name}': {result.error}")
+        if not outputs:
+            return None
+        response = outputs[0] if len(outputs) == 1 else "\n\n".join(str(output) for output in outputs)
+        self._handle_emit_call_events(response=response, call_type=LLMCallType.TOOL_CALL)
+        return response
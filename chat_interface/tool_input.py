@@ -0,0 +1,115 @@
+"""
+تحليل مدخلات الأدوات على مراحل
+يقبل ToolUsage مدخلات الأداة بصيغة JSON أو قاموس Python أو JSON5 أو JSON معطوب
+قابل للإصلاح، لكنه يجربها بالترتيب نفسه مهما كان شكل النص، ويشغّل إصلاح JSON
+مع كل مدخل ليس قاموس Python. هنا:
+1. JSON الصارم أولاً ودون نسخ النص (لا strip على مدخلات بحجم الميغابايت)
+2. فحص سريع بتعابير منتظمة يحدد أي صيغة تُجرب بعدها (Python أو JSON5)
+3. الإصلاح المكلف في النهاية فقط
+ويُحفظ اسم المرحلة الناجحة وزمن التحليل على ToolUsage فيظهر مع حدث بدء الأداة.
+"""
+
+import ast
+import json
+import re
+import time
+from collections import namedtuple
+
+import json5
+from json_repair import repair_json
+
+from crewai.tools.tool_usage import ToolUsage
+
+INVALID_INPUT_MESSAGE = "Tool input must be a valid dictionary in JSON or Python literal format"
+
+# ``tier``: المرحلة التي نجحت، ``attempts``: المراحل التي جُربت بالترتيب
+ParsedToolInput = namedtuple("ParsedToolInput", ["arguments", "tier", "attempts", "seconds"])
+
+_LEADING_SPACE = re.compile(r"\s*")
+# مفاتيح دون علامات تنصيص أو تعليقات: لا يفهمها إلا JSON5
+_JSON5_HINTS = re.compile(r"[{,]\s*[A-Za-z_$][\w$]*\s*:|//|/\*")
+
+
+def _strict_json(text):
+    return json.loads(text)
+
+
+def _python_literal(text):
+    return ast.literal_eval(text)
+
+
+def _json5(text):
+    return json5.loads(text)
+
+
+def _repaired(text):
+    return json.loads(str(repair_json(text, skip_json_loads=True)))
+
+
+_PARSERS = {
+    "json": _strict_json,
+    "python": _python_literal,
+    "json5": _json5,
+    "repair": _repaired,
+}
+
+
+def _tiers(text, start):
+    """ترتيب المراحل: JSON إن بدأ النص بـ { ثم الصيغة الأرجح ثم الإصلاح"""
+    if text.startswith("{", start):
+        yield "json"
+    # الفحص بعد فشل JSON فقط، حتى لا يمر المسار السريع على النص مرتين
+    if _JSON5_HINTS.search(text, start):
+        yield from ("json5", "python")
+    else:
+        yield from ("python", "json5")
+    yield "repair"
+
+
+def parse_tool_input(tool_input):
+    """
+    تحليل مدخل الأداة إلى قاموس وإرجاع ParsedToolInput.
+    يرفع ValueError إن لم تنجح أي مرحلة، أو إن لم يكن المدخل نصاً غير فارغ.
+    """
+    started = time.perf_counter()
+    if tool_input is None:
+        return ParsedToolInput({}, None, (), 0.0)
+    if not isinstance(tool_input, str) or not tool_input or tool_input.isspace():
+        raise ValueError(INVALID_INPUT_MESSAGE)
+
+    start = _LEADING_SPACE.match(tool_input).end()
+    attempts = []
+    for tier in _tiers(tool_input, start):
+        attempts.append(tier)
+        try:
+            arguments = _PARSERS[tier](tool_input)
+        except Exception:
+            continue
+        if isinstance(arguments, dict):
+            return ParsedToolInput(arguments, tier, tuple(attempts), time.perf_counter() - started)
+    raise ValueError(INVALID_INPUT_MESSAGE)
+
+
+def _validate_tool_input(self, tool_input):
+    """بديل ToolUsage._validate_tool_input بالسلوك نفسه"""
+    if tool_input is not None and (not isinstance(tool_input, str) or not tool_input or tool_input.isspace()):
+        # كما في الأصل: المدخل الفارغ يُرفض دون حدث خطأ تحقق
+        raise Exception(INVALID_INPUT_MESSAGE)
+    try:
+        parsed = parse_tool_input(tool_input)
+    except ValueError:
+        self._emit_validate_input_error(INVALID_INPUT_MESSAGE)
+        raise Exception(INVALID_INPUT_MESSAGE)
+    self.tool_input_parse = parsed
+    if parsed.tier == "repair":
+        self._printer.print(content=f"Repaired JSON: {json.dumps(parsed.arguments)}", color="blue")
+    return parsed.arguments
+
+
+def install_tool_input_parser(tool_usage_class=ToolUsage):
+    """استبدال تحليل مدخلات الأدوات في ToolUsage (مرة واحدة)"""
+    current = tool_usage_class._validate_tool_input
+    if current is _validate_tool_input:
+        return
+    _validate_tool_input.__wrapped__ = current
+    tool_usage_class._validate_tool_input = _validate_tool_input
@@ -0,0 +1,262 @@
+"""
+تحويل أحداث CrewAI إلى مقاطع تتبع OpenTelemetry
+كل زوج بداية/نهاية (الطاقم، المهمة، الوكيل، الأداة، استدعاء النموذج، التدفق وطرقه)
+يصبح مقطعاً (span) بتوقيت الحدثين نفسيهما، متداخلاً داخل المقطع المفتوح في
+الخيط نفسه، فتظهر مواضع البطء عبر الأطقم دون ربط يدوي
+"""
+
+import threading
+
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+from crewai.utilities.crew.crew_context import get_crew_context
+from crewai.utilities.events.agent_events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+)
+from crewai.utilities.events.crew_events import (
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+)
+from crewai.utilities.events.flow_events import (
+    FlowFinishedEvent,
+    FlowStartedEvent,
+    MethodExecutionFailedEvent,
+    MethodExecutionFinishedEvent,
+    MethodExecutionStartedEvent,
+)
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+)
+from crewai.utilities.events.task_events import (
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+)
+from crewai.utilities.events.tool_usage_events import (
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+
+def _nanoseconds(timestamp):
+    return int(timestamp.timestamp() * 1_000_000_000)
+
+
+def _attributes(**values):
+    """سمات المقطع: تُهمل القيم الفارغة وتُحوّل غير البسيطة إلى نص"""
+    return {
+        f"crewai.{name}": value if isinstance(value, (str, bool, int, float)) else str(value)
+        for name, value in values.items()
+        if value is not None
+    }
+
+
+def _crew_context_attributes():
+    context = get_crew_context()
+    if context is None:
+        return {}
+    return _attributes(crew_id=context.id, crew_key=context.key)
+
+
+class EventTracer:
+    """
+    - ``tracer``: متتبع OpenTelemetry (انظر ``create_tracer``)
+
+    المقاطع المفتوحة تُحفظ في مكدس لكل خيط، لأن الناقل يستدعي المعالجات في
+    خيط الحدث نفسه؛ لذلك يجب أن تبقى معالجات المتتبع متزامنة.
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self, kind, key, name, event, attributes):
+        stack = self._stack()
+        context = trace.set_span_in_context(stack[-1][2]) if stack else None
+        span = self.tracer.start_span(
+            name,
+            context=context,
+            start_time=_nanoseconds(event.timestamp),
+            attributes={**_crew_context_attributes(), **attributes},
+        )
+        stack.append((kind, key, span))
+
+    def end(self, kind, key, event, attributes=None, error=None):
+        stack = self._stack()
+        for position in range(len(stack) - 1, -1, -1):
+            if stack[position][:2] == (kind, key):
+                break
+        else:
+            return
+
+        end_time = _nanoseconds(event.timestamp)
+        # مقاطع داخلية لم يصل حدث نهايتها تُغلق مع المقطع الأب
+        for _, _, orphan in reversed(stack[position + 1:]):
+            orphan.set_status(Status(StatusCode.ERROR, "لم يصل حدث النهاية"))
+            orphan.end(end_time=end_time)
+        span = stack[position][2]
+        del stack[position:]
+
+        if attributes:
+            span.set_attributes(attributes)
+        if error is not None:
+            span.add_event("exception", {"exception.message": str(error)})
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end(end_time=end_time)
+
+    def listen(self, event_bus):
+        """ربط المتتبع بأحداث البداية والنهاية على ناقل الأحداث"""
+
+        # ----------- الطاقم -----------
+        @event_bus.on(CrewKickoffStartedEvent)
+        def on_crew_started(source, event):
+            self.start("crew", id(source), f"crew {event.crew_name}", event,
+                       _attributes(crew_name=event.crew_name))
+
+        @event_bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            usage = getattr(event.output, "token_usage", None)
+            self.end("crew", id(source), event, _attributes(
+                total_tokens=getattr(usage, "total_tokens", None),
+                prompt_tokens=getattr(usage, "prompt_tokens", None),
+                completion_tokens=getattr(usage, "completion_tokens", None),
+                cached_prompt_tokens=getattr(usage, "cached_prompt_tokens", None),
+                successful_requests=getattr(usage, "successful_requests", None),
+            ))
+
+        @event_bus.on(CrewKickoffFailedEvent)
+        def on_crew_failed(source, event):
+            self.end("crew", id(source), event, error=event.error)
+
+        # ----------- المهمة -----------
+        @event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            task = event.task or source
+            name = getattr(task, "name", None) or getattr(task, "description", "")[:60]
+            self.start("task", id(source), f"task {name}", event,
+                       _attributes(task_id=getattr(task, "id", None), task_name=name))
+
+        @event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            self.end("task", id(source), event)
+
+        @event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            self.end("task", id(source), event, error=event.error)
+
+        # ----------- الوكيل -----------
+        @event_bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            role = getattr(event.agent, "role", None)
+            self.start("agent", id(source), f"agent {role}", event,
+                       _attributes(agent_id=getattr(event.agent, "id", None), agent_role=role))
+
+        @event_bus.on(AgentExecutionCompletedEvent)
+        def on_agent_completed(source, event):
+            self.end("agent", id(source), event)
+
+        @event_bus.on(AgentExecutionErrorEvent)
+        def on_agent_failed(source, event):
+            self.end("agent", id(source), event, error=event.error)
+
+        # ----------- الأدوات -----------
+        @event_bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            # زمن تحليل مدخلات الأداة ومرحلته (انظر tool_input.install_tool_input_parser)
+            parsed = getattr(source, "tool_input_parse", None)
+            self.start("tool", (id(source), event.tool_name), f"tool {event.tool_name}", event,
+                       _attributes(tool_name=event.tool_name, tool_class=event.tool_class,
+                                   agent_role=event.agent_role, run_attempts=event.run_attempts,
+                                   input_parse_tier=getattr(parsed, "tier", None),
+                                   input_parse_seconds=getattr(parsed, "seconds", None)))
+
+        @event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            self.end("tool", (id(source), event.tool_name), event,
+                     _attributes(from_cache=event.from_cache))
+
+        @event_bus.on(ToolUsageErrorEvent)
+        def on_tool_failed(source, event):
+            self.end("tool", (id(source), event.tool_name), event, error=event.error)
+
+        # ----------- استدعاءات النماذج -----------
+        @event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            model = getattr(source, "model", None)
+            self.start("llm", id(source), f"llm {model}", event,
+                       _attributes(model=model, task_name=event.task_name,
+                                   agent_role=event.agent_role))
+
+        @event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            response = event.response if isinstance(event.response, str) else ""
+            self.end("llm", id(source), event, _attributes(
+                call_type=event.call_type.value,
+                response_chars=len(response),
+                # تقدير تقريبي كما في موجّه النماذج: 4 أحرف لكل رمز
+                estimated_completion_tokens=len(response) // 4,
+            ))
+
+        @event_bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            self.end("llm", id(source), event, error=event.error)
+
+        # ----------- التدفقات -----------
+        @event_bus.on(FlowStartedEvent)
+        def on_flow_started(source, event):
+            self.start("flow", id(source), f"flow {event.flow_name}", event,
+                       _attributes(flow_name=event.flow_name))
+
+        @event_bus.on(FlowFinishedEvent)
+        def on_flow_finished(source, event):
+            self.end("flow", id(source), event)
+
+        @event_bus.on(MethodExecutionStartedEvent)
+        def on_method_started(source, event):
+            self.start("method", (id(source), event.method_name),
+                       f"flow.method {event.method_name}", event,
+                       _attributes(flow_name=event.flow_name, method_name=event.method_name))
+
+        @event_bus.on(MethodExecutionFinishedEvent)
+        def on_method_finished(source, event):
+            self.end("method", (id(source), event.method_name), event)
+
+        @event_bus.on(MethodExecutionFailedEvent)
+        def on_method_failed(source, event):
+            self.end("method", (id(source), event.method_name), event, error=event.error)
+
+
+def create_tracer(otlp_endpoint=None, file_path=None, service_name="crewai-chat"):
+    """
+    إنشاء EventTracer بمزوّد مستقل يصدّر المقاطع إلى OTLP (HTTP) و/أو ملف JSON محلي.
+    يُرجع (المتتبع، المزوّد)؛ استدعِ ``provider.shutdown()`` عند الإيقاف لتصدير المتبقي.
+    """
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    if otlp_endpoint:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint)))
+    if file_path:
+        output = open(file_path, "a", encoding="utf-8")
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+            out=output,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )))
+    return EventTracer(provider.get_tracer(__name__)), provider
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# chat_interface is a flat application directory, not an installed package
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "..", "chat_interface")
+)
@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+from crewai import Agent, Crew, Task
+from crewai.lite_agent import LiteAgent
+from crewai.tools import BaseTool
+from crewai.tools.structured_tool import CrewStructuredTool
+
+from async_tools import install_async_tools, run_coroutine
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class LoopProbe(BaseTool):
+    name: str = "probe"
+    description: str = "reports the loop it ran on"
+
+    async def _run(self) -> tuple:
+        await asyncio.sleep(0)
+        return asyncio.get_running_loop(), threading.current_thread().name, request_id.get()
+
+
+@pytest.fixture
+def installed(monkeypatch):
+    monkeypatch.setattr(BaseTool, "run", BaseTool.run)
+    monkeypatch.setattr(CrewStructuredTool, "invoke", CrewStructuredTool.invoke)
+    monkeypatch.setattr(Crew, "kickoff_async", Crew.kickoff_async)
+    monkeypatch.setattr(LiteAgent, "kickoff_async", LiteAgent.kickoff_async)
+    install_async_tools()
+    install_async_tools()
+
+
+def test_sync_callers_share_one_background_loop(installed):
+    tool = LoopProbe()
+    token = request_id.set("r1")
+    try:
+        first_loop, thread, seen_id = tool.run()
+        second_loop, _, _ = tool.to_structured_tool().invoke({})
+    finally:
+        request_id.reset(token)
+
+    assert first_loop is second_loop
+    assert thread == "tool-loop"
+    assert seen_id == "r1"
+    assert tool.current_usage_count == 1
+
+
+def test_tools_can_be_called_from_inside_a_running_loop(installed):
+    async def main():
+        return LoopProbe().run()
+
+    loop, _, _ = asyncio.run(main())
+
+    assert loop.is_running()
+
+
+def test_kickoff_async_runs_async_tools_on_the_callers_loop(installed, monkeypatch):
+    agent = Agent(role="researcher", goal="g", backstory="b", llm="gpt-4o-mini")
+    crew = Crew(agents=[agent], tasks=[Task(description="d", expected_output="o", agent=agent)])
+    tool = LoopProbe()
+    monkeypatch.setattr(Crew, "kickoff", lambda self, inputs=None: tool.run())
+
+    async def main():
+        return asyncio.get_running_loop(), await crew.kickoff_async()
+
+    caller_loop, (tool_loop, thread, _) = asyncio.run(main())
+
+    assert tool_loop is caller_loop
+    assert thread == "MainThread"
+
+
+def test_run_coroutine_propagates_errors():
+    async def fail():
+        raise LookupError("missing")
+
+    with pytest.raises(LookupError, match="missing"):
+        run_coroutine(fail())
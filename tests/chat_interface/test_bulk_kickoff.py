@@ -0,0 +1,86 @@
+import contextvars
+import threading
+import time
+
+from bulk_kickoff import kickoff_each
+
+request_tag = contextvars.ContextVar("request_tag", default=None)
+
+
+class FakeCrew:
+    def __init__(self, delay=0.0, failures=None, seen=None):
+        self.delay = delay
+        self.failures = failures if failures is not None else {}
+        self.seen = seen if seen is not None else []
+        self.lock = threading.Lock()
+
+    def copy(self):
+        return self
+
+    def kickoff(self, inputs):
+        with self.lock:
+            self.seen.append((inputs["n"], request_tag.get()))
+            remaining = self.failures.get(inputs["n"], 0)
+            if remaining:
+                self.failures[inputs["n"]] = remaining - 1
+                raise RuntimeError("flaky")
+        # each kickoff sets its own context, like the crew baggage
+        request_tag.set(f"crew-{inputs['n']}")
+        time.sleep(self.delay * inputs["n"])
+        return f"output {inputs['n']}"
+
+
+def make_crew():
+    return FakeCrew()
+
+
+def test_every_input_produces_one_result():
+    results = list(kickoff_each(FakeCrew(), ({"n": n} for n in range(20)), max_workers=4))
+
+    assert sorted(r.index for r in results) == list(range(20))
+    assert all(r.output == f"output {r.inputs['n']}" for r in results)
+
+
+def test_results_stream_in_completion_order():
+    inputs = [{"n": n} for n in (3, 0)]
+    results = list(kickoff_each(FakeCrew(delay=0.1), inputs, max_workers=2))
+
+    assert [r.index for r in results] == [1, 0]
+
+
+def test_failed_items_are_retried():
+    crew = FakeCrew(failures={1: 2})
+    results = {r.index: r for r in kickoff_each(crew, [{"n": 0}, {"n": 1}], retries=2, backoff=0)}
+
+    assert results[1].output == "output 1"
+    assert results[1].attempts == 3
+    assert results[0].attempts == 1
+
+
+def test_exhausted_retries_return_the_error():
+    crew = FakeCrew(failures={0: 5})
+    (result,) = kickoff_each(crew, [{"n": 0}], retries=1, backoff=0)
+
+    assert result.output is None
+    assert isinstance(result.error, RuntimeError)
+    assert result.attempts == 2
+
+
+def test_context_is_copied_per_item_and_does_not_leak():
+    crew = FakeCrew()
+    token = request_tag.set("caller")
+    try:
+        list(kickoff_each(crew, [{"n": n} for n in range(6)], max_workers=2))
+        assert request_tag.get() == "caller"
+    finally:
+        request_tag.reset(token)
+
+    assert all(tag == "caller" for _, tag in crew.seen)
+
+
+def test_process_pool_uses_crew_factory():
+    results = list(
+        kickoff_each(make_crew, [{"n": n} for n in range(4)], max_workers=2, use_processes=True)
+    )
+
+    assert sorted(r.output for r in results) == [f"output {n}" for n in range(4)]
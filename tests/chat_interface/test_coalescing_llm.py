@@ -0,0 +1,168 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from litellm import ModelResponse
+from litellm.exceptions import ContextWindowExceededError
+
+from coalescing_llm import CoalescingLLM, RequestCoalescer
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
+
+
+def reply(text):
+    return ModelResponse(choices=[{"message": {"role": "assistant", "content": text}}])
+
+
+class FakeCompletion:
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, messages, **params):
+        with self.lock:
+            self.calls.append((messages, params))
+        time.sleep(self.delay)
+        return reply("echo: " + messages[-1]["content"])
+
+
+def params(content, model="huggingface/mistral-7b", temperature=0):
+    return {
+        "model": model,
+        "temperature": temperature,
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+def submit_all(coalescer, requests):
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        return [response for response, _ in executor.map(coalescer.submit, requests)]
+
+
+def test_identical_inflight_requests_are_sent_once():
+    completion = FakeCompletion()
+    coalescer = RequestCoalescer(completion=completion)
+
+    results = submit_all(coalescer, [params("same")] * 5)
+
+    assert all(r.choices[0].message.content == "echo: same" for r in results)
+    assert len(completion.calls) == 1
+
+
+def test_sampled_requests_are_shared_only_when_enabled():
+    completion = FakeCompletion()
+    submit_all(RequestCoalescer(completion=completion), [params("same", temperature=0.7)] * 3)
+    assert len(completion.calls) == 3
+
+    completion = FakeCompletion()
+    submit_all(RequestCoalescer(completion=completion, share_sampled=True), [params("same", temperature=0.7)] * 3)
+    assert len(completion.calls) == 1
+
+
+def test_distinct_requests_are_sent_immediately():
+    completion = FakeCompletion(delay=0)
+    coalescer = RequestCoalescer(completion=completion)
+
+    start = time.perf_counter()
+    results = submit_all(
+        coalescer, [params("a"), params("a", temperature=0.1), params("a", model="huggingface/llama"), params("b")]
+    )
+
+    assert time.perf_counter() - start < 0.1
+    assert len(results) == 4
+    assert len(completion.calls) == 4
+
+
+def test_finished_requests_are_not_reused():
+    completion = FakeCompletion(delay=0)
+    coalescer = RequestCoalescer(completion=completion)
+
+    coalescer.submit(params("q"))
+    coalescer.submit(params("q"))
+
+    assert len(completion.calls) == 2
+
+
+def test_followers_receive_the_leaders_error():
+    started = threading.Event()
+
+    def completion(messages, **params):
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("bad")
+
+    coalescer = RequestCoalescer(completion=completion)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(coalescer.submit, params("q"))
+        started.wait()
+        follower = executor.submit(coalescer.submit, params("q"))
+
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    # the failed request is no longer in flight
+    with pytest.raises(ValueError):
+        coalescer.submit(params("q"))
+
+
+def test_coalescing_llm_returns_text():
+    completion = FakeCompletion(delay=0)
+    llm = CoalescingLLM(
+        model="gpt-4o-mini",
+        api_key="test",
+        coalescer=RequestCoalescer(completion=completion),
+    )
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        answers = list(executor.map(llm.call, ["one", "two", "three"]))
+
+    assert answers == ["echo: one", "echo: two", "echo: three"]
+    assert "coalescer" not in llm.additional_params
+
+
+def test_coalescing_llm_converts_context_window_errors():
+    def completion(messages, **params):
+        raise ContextWindowExceededError("too long", "gpt-4o-mini", "openai")
+
+    llm = CoalescingLLM(
+        model="gpt-4o-mini",
+        api_key="test",
+        coalescer=RequestCoalescer(completion=completion),
+    )
+
+    with pytest.raises(LLMContextLengthExceededException):
+        llm.call("hello")
+
+
+def test_usage_is_logged_once_for_shared_replies():
+    def completion(messages, **params):
+        time.sleep(0.2)
+        response = reply("shared")
+        response.usage = {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4}
+        return response
+
+    class UsageLog:
+        def __init__(self):
+            self.events = []
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self.events.append(response_obj["usage"])
+
+    llm = CoalescingLLM(
+        model="gpt-4o-mini",
+        api_key="test",
+        temperature=0,
+        coalescer=RequestCoalescer(completion=completion),
+    )
+    log = UsageLog()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        answers = list(executor.map(lambda _: llm.call("same", callbacks=[log]), range(3)))
+
+    assert answers == ["shared"] * 3
+    assert len(log.events) == 1
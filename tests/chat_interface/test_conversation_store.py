@@ -0,0 +1,79 @@
+import time
+
+from conversation_store import ConversationStore
+
+
+def test_history_is_isolated_per_session():
+    store = ConversationStore()
+    store.append("a", "hi", "hello a")
+    store.append("b", "hi", "hello b")
+
+    assert [turn["bot"] for turn in store.history("a")] == ["hello a"]
+    assert [turn["bot"] for turn in store.history("b")] == ["hello b"]
+    assert store.history("missing") == []
+    assert "missing" not in store
+
+
+def test_history_is_bounded_per_session():
+    store = ConversationStore(max_turns=3)
+    for i in range(10):
+        store.append("a", f"q{i}", f"r{i}")
+
+    assert [turn["user"] for turn in store.history("a")] == ["q7", "q8", "q9"]
+    assert [turn["user"] for turn in store.history("a", limit=2)] == ["q8", "q9"]
+
+
+def test_least_recently_used_session_is_evicted():
+    store = ConversationStore(max_sessions=2)
+    store.append("a", "q", "r")
+    store.append("b", "q", "r")
+    store.history("a")
+    store.append("c", "q", "r")
+
+    assert "a" in store
+    assert "b" not in store
+    assert "c" in store
+
+
+def test_idle_sessions_expire():
+    store = ConversationStore(ttl=0.01)
+    store.append("a", "q", "r")
+    time.sleep(0.02)
+    store.append("b", "q", "r")
+
+    assert "a" not in store
+    assert len(store) == 1
+
+
+def test_memory_ceiling_is_enforced():
+    store = ConversationStore(max_bytes=2000)
+    for i in range(20):
+        store.append(f"s{i}", "q" * 100, "r" * 100)
+
+    assert store.memory_usage <= 2000
+    assert len(store) < 20
+    assert "s19" in store
+
+
+def test_evicted_sessions_spill_to_disk(tmp_path):
+    store = ConversationStore(max_sessions=1, spill_path=str(tmp_path / "chat.db"))
+    store.set_model_type("a", "code")
+    store.append("a", "q1", "r1")
+    store.append("b", "q2", "r2")
+
+    assert "a" not in store
+    assert [turn["user"] for turn in store.history("a")] == ["q1"]
+    assert store.get_model_type("a") == "code"
+    assert "b" not in store
+
+
+def test_clear_removes_session_everywhere(tmp_path):
+    store = ConversationStore(max_sessions=1, spill_path=str(tmp_path / "chat.db"))
+    store.append("a", "q1", "r1")
+    store.append("b", "q2", "r2")
+    store.clear("a")
+    store.clear("b")
+
+    assert store.history("a") == []
+    assert store.history("b") == []
+    assert store.memory_usage == 0
@@ -0,0 +1,143 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from dispatcher import AsyncChatDispatcher, DispatcherBusyError, PendingReplies, SocketOutbox
+
+
+def wait_for_idle(dispatcher, timeout=5):
+    deadline = time.monotonic() + timeout
+    while dispatcher.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return dispatcher.pending
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = AsyncChatDispatcher(max_concurrency=2, max_pending=3)
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_submit_returns_coroutine_result(dispatcher):
+    async def echo(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert dispatcher.submit(echo, "hello").result(timeout=5) == "hello"
+    assert wait_for_idle(dispatcher) == 0
+
+
+def test_concurrency_is_bounded(dispatcher):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_call():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        threading.Event().wait(0.05)
+        with lock:
+            running -= 1
+
+    async def request():
+        await asyncio.to_thread(slow_call)
+
+    futures = [dispatcher.submit(request) for _ in range(3)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert peak == 2
+
+
+def test_submit_rejects_when_pending_limit_reached(dispatcher):
+    release = threading.Event()
+
+    async def blocked():
+        await asyncio.to_thread(release.wait)
+
+    futures = [dispatcher.submit(blocked) for _ in range(3)]
+    with pytest.raises(DispatcherBusyError):
+        dispatcher.submit(blocked)
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert wait_for_idle(dispatcher) == 0
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        AsyncChatDispatcher(max_concurrency=0)
+    with pytest.raises(ValueError):
+        AsyncChatDispatcher(max_concurrency=4, max_pending=2)
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.sent = []
+        self.tasks = []
+
+    def emit(self, event, data, to=None):
+        self.sent.append((event, data, to))
+
+    def start_background_task(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        self.tasks.append(thread)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def test_outbox_emits_from_its_own_task_in_order():
+    socketio = FakeSocketIO()
+    outbox = SocketOutbox(socketio, interval=0.005)
+    outbox.start()
+    outbox.start()
+
+    producer = threading.Thread(
+        target=lambda: [outbox.emit("chat_chunk", {"n": n}, to="sid") for n in range(5)]
+    )
+    producer.start()
+    producer.join()
+    deadline = time.monotonic() + 2
+    while len(socketio.sent) < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    outbox.close()
+
+    assert len(socketio.tasks) == 1
+    assert [data["n"] for _, data, _ in socketio.sent] == [0, 1, 2, 3, 4]
+
+
+def test_pending_replies_are_scoped_to_their_owner(dispatcher):
+    async def echo(value):
+        return value
+
+    replies = PendingReplies()
+    request_id = replies.add("alice", dispatcher.submit(echo, "hi"))
+
+    assert replies.get("bob", request_id) == (None, None)
+    future, age = replies.get("alice", request_id)
+    assert future.result(timeout=5) == "hi"
+    assert age >= 0
+
+    replies.discard(request_id)
+    assert replies.get("alice", request_id) == (None, None)
+
+
+def test_expired_replies_are_dropped():
+    replies = PendingReplies(ttl=0)
+    future = concurrent.futures.Future()
+    old = replies.add("alice", future)
+    time.sleep(0.01)
+    replies.add("alice", concurrent.futures.Future())
+
+    assert replies.get("alice", old) == (None, None)
+    assert future.cancelled()
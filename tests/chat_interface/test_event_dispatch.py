@@ -0,0 +1,110 @@
+import pytest
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.events.crewai_event_bus import CrewAIEventsBus
+
+from event_dispatch import has_handlers, install_dispatch_table
+
+
+class ParentEvent(BaseEvent):
+    type: str = "parent_event"
+
+
+class ChildEvent(ParentEvent):
+    type: str = "child_event"
+
+
+class OtherEvent(BaseEvent):
+    type: str = "other_event"
+
+
+@pytest.fixture
+def bus():
+    # a private bus so the global singleton is left untouched
+    bus = object.__new__(CrewAIEventsBus)
+    bus._initialize()
+    install_dispatch_table(bus)
+    return bus
+
+
+def test_wildcard_and_exact_handlers_run_in_registration_order(bus):
+    seen = []
+
+    @bus.on(BaseEvent)
+    def on_any(source, event):
+        seen.append(("any", event.type))
+
+    @bus.on(ChildEvent)
+    def on_child(source, event):
+        seen.append(("child", event.type))
+
+    bus.emit(None, ChildEvent())
+    bus.emit(None, OtherEvent())
+
+    assert seen == [
+        ("any", "child_event"),
+        ("child", "child_event"),
+        ("any", "other_event"),
+    ]
+
+
+def test_table_is_rebuilt_after_registration(bus):
+    seen = []
+    bus.emit(None, ChildEvent())  # caches an empty entry
+
+    @bus.on(ParentEvent)
+    def on_parent(source, event):
+        seen.append(event.type)
+
+    bus.emit(None, ChildEvent())
+
+    assert seen == ["child_event"]
+
+
+def test_scoped_handlers_restore_the_previous_table(bus):
+    seen = []
+
+    @bus.on(ChildEvent)
+    def outer(source, event):
+        seen.append("outer")
+
+    with bus.scoped_handlers():
+
+        @bus.on(ChildEvent)
+        def inner(source, event):
+            seen.append("inner")
+
+        bus.emit(None, ChildEvent())
+
+    bus.emit(None, ChildEvent())
+
+    assert seen == ["inner", "outer"]
+
+
+def test_has_handlers_short_circuits_unobserved_events(bus):
+    assert not has_handlers(bus, ChildEvent)
+
+    bus.register_handler(ParentEvent, lambda source, event: None)
+
+    assert has_handlers(bus, ChildEvent)
+    assert not has_handlers(bus, OtherEvent)
+
+
+def test_failing_handler_does_not_stop_others(bus, capsys):
+    seen = []
+
+    @bus.on(ChildEvent)
+    def broken_handler(source, event):
+        raise RuntimeError("boom")
+
+    @bus.on(ChildEvent)
+    def on_child(source, event):
+        seen.append(event.type)
+
+    bus.emit(None, ChildEvent())
+
+    assert seen == ["child_event"]
+    assert "Handler 'broken_handler' failed for event 'ChildEvent': boom" in capsys.readouterr().out
+
+
+def test_install_is_idempotent(bus):
+    assert install_dispatch_table(bus) is bus.dispatch_table
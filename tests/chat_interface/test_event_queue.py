@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from event_queue import QueuedEventDispatcher
+
+
+class SampleEvent(BaseEvent):
+    type: str = "sample_event"
+    value: int = 0
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = QueuedEventDispatcher()
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_handlers_run_on_the_worker_thread(dispatcher):
+    threads = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @dispatcher.on(crewai_event_bus, SampleEvent)
+        def on_sample(source, event):
+            threads.append(threading.current_thread().name)
+
+        crewai_event_bus.emit(None, SampleEvent())
+        dispatcher.flush()
+
+    assert threads == ["event-dispatcher"]
+
+
+def test_events_keep_their_order(dispatcher):
+    seen = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @dispatcher.on(crewai_event_bus, SampleEvent)
+        def on_sample(source, event):
+            seen.append((source, event.value))
+
+        for value in range(100):
+            crewai_event_bus.emit("a" if value % 2 else "b", SampleEvent(value=value))
+        dispatcher.flush()
+
+    assert [value for source, value in seen if source == "a"] == list(range(1, 100, 2))
+    assert [value for source, value in seen if source == "b"] == list(range(0, 100, 2))
+
+
+def test_emit_does_not_wait_for_slow_handlers(dispatcher):
+    release = threading.Event()
+    seen = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @dispatcher.on(crewai_event_bus, SampleEvent)
+        def on_sample(source, event):
+            release.wait(5)
+            seen.append(event.value)
+
+        crewai_event_bus.emit(None, SampleEvent(value=1))
+        assert seen == []
+        release.set()
+        dispatcher.flush()
+
+    assert seen == [1]
+
+
+def test_drop_policy_counts_overflow():
+    dispatcher = QueuedEventDispatcher(max_pending=1, overflow="drop")
+    release = threading.Event()
+    started = threading.Event()
+
+    with crewai_event_bus.scoped_handlers():
+
+        @dispatcher.on(crewai_event_bus, SampleEvent)
+        def on_sample(source, event):
+            started.set()
+            release.wait(5)
+
+        crewai_event_bus.emit(None, SampleEvent())  # taken by the worker
+        started.wait(5)
+        crewai_event_bus.emit(None, SampleEvent())  # fills the queue
+        crewai_event_bus.emit(None, SampleEvent())  # dropped
+        release.set()
+        dispatcher.flush()
+
+    assert dispatcher.dropped == 1
+    dispatcher.shutdown()
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        QueuedEventDispatcher(overflow="spill")
+
+
+def test_failing_handler_is_isolated(dispatcher, capsys):
+    seen = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @dispatcher.on(crewai_event_bus, SampleEvent)
+        def broken_handler(source, event):
+            raise RuntimeError("boom")
+
+        @dispatcher.on(crewai_event_bus, SampleEvent)
+        def on_sample(source, event):
+            seen.append(event.value)
+
+        crewai_event_bus.emit(None, SampleEvent(value=7))
+        dispatcher.flush()
+
+    assert seen == [7]
+    assert "Handler 'broken_handler' failed for event 'SampleEvent': boom" in capsys.readouterr().out
+
+
+def test_defer_handlers_moves_existing_handlers(dispatcher):
+    threads = {}
+
+    with crewai_event_bus.scoped_handlers():
+
+        @crewai_event_bus.on(SampleEvent)
+        def slow_listener(source, event):
+            threads["slow"] = threading.current_thread().name
+
+        @crewai_event_bus.on(SampleEvent)
+        def inline_listener(source, event):
+            threads["inline"] = threading.current_thread().name
+
+        dispatcher.defer_handlers(crewai_event_bus, keep=[inline_listener])
+        # already deferred handlers are not wrapped twice
+        dispatcher.defer_handlers(crewai_event_bus, keep=[inline_listener])
+        assert crewai_event_bus._handlers[SampleEvent][0].__wrapped__ is slow_listener
+        crewai_event_bus.emit(None, SampleEvent())
+        dispatcher.flush()
+
+    assert threads["slow"] == "event-dispatcher"
+    assert threads["inline"] != "event-dispatcher"
@@ -0,0 +1,155 @@
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from event_sink import EventSink, read_events
+
+
+class StepEvent(BaseEvent):
+    type: str = "step_event"
+    step: int = 0
+    detail: dict = {}
+
+
+class Unprintable:
+    def __repr__(self):
+        raise RuntimeError("no repr")
+
+
+class DoneEvent(BaseEvent):
+    type: str = "done_event"
+    result: str = ""
+
+
+@pytest.fixture
+def sink(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=60)
+    yield sink
+    sink.close()
+
+
+def segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".ndjson.gz"))
+
+
+def test_events_round_trip_through_segments(sink, tmp_path):
+    with crewai_event_bus.scoped_handlers():
+        sink.attach(crewai_event_bus)
+        crewai_event_bus.emit(None, StepEvent(step=1, detail={"tool": "search"}))
+        crewai_event_bus.emit(None, DoneEvent(result="ok"))
+        crewai_event_bus.emit(None, StepEvent(step=2))
+    sink.close()
+
+    events = list(read_events(str(tmp_path)))
+
+    assert [(e["event"], e.get("step"), e.get("result")) for e in events] == [
+        ("StepEvent", 1, None),
+        ("StepEvent", 2, None),
+        ("DoneEvent", None, "ok"),
+    ]
+    assert events[0]["detail"] == {"tool": "search"}
+
+
+def test_each_event_type_is_written_as_one_columnar_block(sink, tmp_path):
+    for step in range(10):
+        sink.record(None, StepEvent(step=step))
+    sink.close()
+
+    (name,) = segments(tmp_path)
+    with gzip.open(tmp_path / name, "rt", encoding="utf-8") as segment:
+        blocks = [json.loads(line) for line in segment]
+
+    assert len(blocks) == 1
+    assert blocks[0]["columns"] == list(StepEvent.model_fields)
+    assert len(blocks[0]["rows"]) == 10
+
+
+def test_recording_does_not_write(sink, tmp_path):
+    sink.record(None, StepEvent())
+
+    assert segments(tmp_path) == []
+
+
+def test_batch_size_wakes_the_writer(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=60, batch_size=5)
+    for step in range(5):
+        sink.record(None, StepEvent(step=step))
+
+    for _ in range(100):
+        if not sink._pending:
+            break
+        time.sleep(0.01)
+    sink.close()
+
+    assert len(list(read_events(str(tmp_path)))) == 5
+
+
+def test_segments_rotate_by_size(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=60, max_segment_bytes=1)
+    for step in range(3):
+        sink.record(None, StepEvent(step=step))
+        sink.flush()
+    sink.close()
+
+    assert len(segments(tmp_path)) == 3
+    assert [e["step"] for e in read_events(str(tmp_path))] == [0, 1, 2]
+
+
+def test_overflow_is_counted(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=60, max_pending=2)
+    for step in range(5):
+        sink.record(None, StepEvent(step=step))
+    sink.close()
+
+    assert sink.dropped == 3
+    assert len(list(read_events(str(tmp_path)))) == 2
+
+
+def test_unserializable_events_are_counted_and_the_writer_keeps_running(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=0.01)
+    sink.record(None, StepEvent(step=1))
+    sink.record(None, StepEvent(step=2, detail={"bad": Unprintable()}))
+    time.sleep(0.05)
+    sink.record(None, StepEvent(step=3))
+    time.sleep(0.05)
+
+    assert sink._worker.is_alive()
+    sink.close()
+
+    assert sink.failed == 1
+    assert [e["step"] for e in read_events(str(tmp_path))] == [1, 3]
+
+
+def test_events_are_snapshot_when_recorded(sink, tmp_path):
+    event = StepEvent(step=1, detail={"status": "running"})
+    sink.record(None, event)
+    event.detail["status"] = "changed later"
+    sink.close()
+
+    (event,) = read_events(str(tmp_path))
+    assert event["detail"] == {"status": "running"}
+
+
+def test_events_are_converted_on_the_writer_thread(tmp_path, monkeypatch):
+    import event_sink
+
+    threads = []
+
+    def convert(value):
+        threads.append(threading.current_thread().name)
+        return value
+
+    monkeypatch.setattr(event_sink, "to_serializable", convert)
+    sink = EventSink(str(tmp_path), flush_interval=0.01)
+    sink.record(None, StepEvent(step=1))
+    assert threads == []
+
+    time.sleep(0.1)
+    sink.close()
+    assert threads and set(threads) == {"event-sink"}
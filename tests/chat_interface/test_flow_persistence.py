@@ -0,0 +1,275 @@
+import json
+import os
+import sqlite3
+import time
+
+import pytest
+
+# flows report telemetry on kickoff; keep the tests offline
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+from crewai.flow.flow import Flow, listen, start
+from crewai.flow.persistence import persist
+from crewai.flow.persistence.sqlite import SQLiteFlowPersistence
+from pydantic import BaseModel
+
+import flow_persistence
+from flow_persistence import LMDBFlowPersistence, RetentionJob, SQLiteWALFlowPersistence
+
+
+class CounterState(BaseModel):
+    id: str = "counter"
+    count: int = 0
+    steps: list = []
+
+
+def counter_flow(persistence):
+    @persist(persistence=persistence)
+    class CounterFlow(Flow[CounterState]):
+        @start()
+        def first(self):
+            self.state.count += 1
+            self.state.steps.append("first")
+
+        @listen(first)
+        def second(self):
+            self.state.count += 1
+            self.state.steps.append("second")
+
+        @listen(second)
+        def third(self):
+            self.state.count += 1
+            self.state.steps.append("third")
+
+    return CounterFlow
+
+
+def rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT method_name FROM flow_states ORDER BY id").fetchall()
+
+
+def test_persist_decorator_saves_every_step(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path)
+    counter_flow(persistence)().kickoff()
+
+    assert rows(path) == [("first",), ("second",), ("third",)]
+    assert persistence.load_state("counter")["count"] == 3
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    persistence.close()
+
+
+def test_restores_a_flow_from_the_database(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path)
+    counter_flow(persistence)().kickoff()
+    persistence.close()
+
+    reopened = SQLiteWALFlowPersistence(path)
+    flow = counter_flow(reopened)()
+    flow.kickoff(inputs={"id": "counter"})
+
+    assert flow.state.count == 6
+    assert reopened.load_state("counter")["steps"][-1] == "third"
+    reopened.close()
+
+
+def test_persist_every_n_steps_groups_writes(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, persist_every=2)
+    counter_flow(persistence)().kickoff()
+
+    # the third step waits for the next write but is already visible to load_state
+    assert rows(path) == [("second",)]
+    assert persistence.load_state("counter")["count"] == 3
+
+    persistence.flush()
+    assert rows(path) == [("second",), ("third",)]
+    persistence.close()
+
+
+def test_persist_interval_writes_pending_flows_together(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, persist_every=None, persist_interval=0)
+    persistence.save_state("a", "step", {"id": "a", "value": 1})
+    assert rows(path) == [("step",)]
+
+    persistence.persist_interval = 60
+    persistence.save_state("a", "later", {"id": "a", "value": 2})
+    persistence.save_state("b", "later", {"id": "b", "value": 1})
+    assert len(rows(path)) == 1
+    persistence.close()
+    assert len(rows(path)) == 3
+
+
+def test_persist_interval_writes_without_another_save(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, persist_every=None, persist_interval=0.05)
+    persistence.save_state("a", "step", {"id": "a", "value": 1})
+    assert rows(path) == []
+
+    deadline = time.monotonic() + 5
+    while not rows(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert rows(path) == [("step",)]
+    persistence.close()
+
+
+def test_pending_states_are_written_at_exit(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, persist_every=None, persist_interval=60)
+    persistence.save_state("a", "step", {"id": "a", "value": 1})
+
+    flow_persistence._flush_at_exit()
+    assert rows(path) == [("step",)]
+    persistence.close()
+
+
+def test_reads_databases_written_by_sqlite_flow_persistence(tmp_path):
+    path = str(tmp_path / "flows.db")
+    SQLiteFlowPersistence(path).save_state("old", "step", {"id": "old", "value": 7})
+
+    persistence = SQLiteWALFlowPersistence(path)
+    assert persistence.load_state("old") == {"id": "old", "value": 7}
+    assert persistence.load_state("missing") is None
+    persistence.close()
+
+
+def test_delta_mode_saves_changed_fields_and_restores_the_latest_state(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, compact_after=10)
+    counter_flow(persistence)().kickoff()
+
+    assert rows(path) == [("first",)]
+    with sqlite3.connect(path) as conn:
+        deltas = conn.execute("SELECT method_name, delta_json FROM flow_state_deltas ORDER BY id").fetchall()
+    assert [name for name, _ in deltas] == ["second", "third"]
+    # only the new list item and the changed counter are written after the snapshot
+    assert json.loads(deltas[1][1]) == {"set": {"count": 3}, "extend": {"steps": ["third"]}}
+    # the stock backend never reads a delta as a state, only the last full snapshot
+    assert SQLiteFlowPersistence(path).load_state("counter") == {
+        "id": "counter",
+        "count": 1,
+        "steps": ["first"],
+    }
+
+    reopened = SQLiteWALFlowPersistence(path, compact_after=10)
+    assert reopened.load_state("counter") == {
+        "id": "counter",
+        "count": 3,
+        "steps": ["first", "second", "third"],
+    }
+    persistence.close()
+    reopened.close()
+
+
+def test_delta_mode_compacts_into_a_new_snapshot(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, compact_after=2)
+    state = {"id": "flow", "items": []}
+    for step in range(7):
+        state["items"].append(step)
+        state["last"] = step
+        if step == 4:
+            state.pop("first", None)
+        elif step == 0:
+            state["first"] = True
+        persistence.save_state("flow", f"step{step}", state)
+        assert persistence.load_state("flow") == state
+
+    assert rows(path) == [("step6",)]
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM flow_state_deltas").fetchone()[0] == 0
+    persistence.close()
+
+
+def test_lmdb_backend_persists_and_restores_flows(tmp_path):
+    pytest.importorskip("lmdb")
+    path = str(tmp_path / "flows.lmdb")
+    persistence = LMDBFlowPersistence(path)
+    counter_flow(persistence)().kickoff()
+    assert persistence.load_state("counter")["steps"] == ["first", "second", "third"]
+    assert persistence.load_state("missing") is None
+    persistence.close()
+
+    reopened = LMDBFlowPersistence(path)
+    flow = counter_flow(reopened)()
+    flow.kickoff(inputs={"id": "counter"})
+    assert flow.state.count == 6
+    reopened.close()
+
+
+def test_prune_keeps_the_latest_states_of_each_flow(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path)
+    deltas = SQLiteWALFlowPersistence(path, compact_after=10)
+    for step in range(5):
+        persistence.save_state("full", f"step{step}", {"id": "full", "step": step})
+        deltas.save_state("delta", f"step{step}", {"id": "delta", "step": step})
+
+    assert persistence.prune(keep_states=2) == 0
+    with sqlite3.connect(path) as conn:
+        kept = conn.execute("SELECT flow_uuid, method_name FROM flow_states ORDER BY id").fetchall()
+        deltas_kept = conn.execute("SELECT COUNT(*) FROM flow_state_deltas").fetchone()[0]
+    # the delta flow still needs its snapshot and deltas to rebuild the latest state
+    assert [name for flow, name in kept if flow == "full"] == ["step3", "step4"]
+    assert [name for flow, name in kept if flow == "delta"] == ["step0"]
+    assert deltas_kept == 4
+    assert deltas.load_state("delta")["step"] == 4
+    persistence.close()
+    deltas.close()
+
+
+def test_prune_drops_flows_that_stopped_saving(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path, compact_after=10)
+    persistence.save_state("stale", "step", {"id": "stale"})
+    persistence.save_state("active", "step", {"id": "active"})
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE flow_states SET timestamp = '2020-01-01T00:00:00+00:00'")
+    # the next save is a delta: the flow stays active though its snapshot is old
+    persistence.save_state("active", "later", {"id": "active", "done": True})
+    persistence.save_state("stale", "later", {"id": "stale", "done": True})
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "UPDATE flow_state_deltas SET timestamp = '2020-01-01T00:00:00+00:00' WHERE flow_uuid = 'stale'"
+        )
+
+    assert persistence.prune(max_age=3600) == 1
+    assert persistence.load_state("stale") is None
+    assert persistence.load_state("active") == {"id": "active", "done": True}
+    # the dropped flow starts again from a full snapshot
+    persistence.save_state("stale", "again", {"id": "stale"})
+    assert persistence.load_state("stale") == {"id": "stale"}
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT flow_uuid FROM flow_state_deltas").fetchall() == [("active",)]
+    assert persistence.compact(min_free_ratio=0) is True
+    persistence.close()
+
+
+def test_retention_job_prunes_periodically(tmp_path):
+    path = str(tmp_path / "flows.db")
+    persistence = SQLiteWALFlowPersistence(path)
+    for step in range(5):
+        persistence.save_state("flow", f"step{step}", {"id": "flow", "step": step})
+
+    retention = RetentionJob(persistence, interval=0.01, keep_states=1)
+    deadline = time.monotonic() + 5
+    while len(rows(path)) > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    retention.stop()
+
+    assert rows(path) == [("step4",)]
+    persistence.close()
+
+
+def test_lmdb_prune_drops_flows_that_stopped_saving(tmp_path):
+    pytest.importorskip("lmdb")
+    persistence = LMDBFlowPersistence(str(tmp_path / "flows.lmdb"))
+    persistence.save_state("stale", "step", {"id": "stale"})
+    assert persistence.prune(max_age=3600) == 0
+    assert persistence.prune(max_age=-1) == 1
+    assert persistence.load_state("stale") is None
+    persistence.close()
@@ -0,0 +1,115 @@
+import threading
+import time
+from unittest.mock import Mock
+
+from llm_pool import LLMPool
+from model_index import ModelConfig
+
+CONFIGS = {}
+
+
+def make_config(model="mistral-7b", temperature=0.7):
+    # the index guarantees one object per unique config
+    key = (model, temperature)
+    if key not in CONFIGS:
+        CONFIGS[key] = ModelConfig(
+            model=model,
+            api_key="hf_test",
+            base_url="https://api-inference.huggingface.co",
+            temperature=temperature,
+        )
+    return CONFIGS[key]
+
+
+def test_llm_is_created_once_per_key():
+    factory = Mock(side_effect=lambda **kwargs: object())
+    pool = LLMPool(factory)
+
+    first = pool.get(make_config())
+    second = pool.get(make_config())
+
+    assert first is second
+    factory.assert_called_once_with(
+        model="mistral-7b",
+        api_key="hf_test",
+        base_url="https://api-inference.huggingface.co",
+        temperature=0.7,
+        stream=False,
+    )
+
+
+def test_distinct_keys_get_distinct_llms():
+    pool = LLMPool(lambda **kwargs: object())
+
+    base = pool.get(make_config())
+    assert pool.get(make_config(temperature=0.2)) is not base
+    assert pool.get(make_config(model="codellama-7b")) is not base
+    assert pool.get(make_config(), stream=True) is not base
+    assert len(pool) == 4
+
+
+def test_least_recently_used_llm_is_evicted_when_full():
+    pool = LLMPool(lambda **kwargs: object(), max_size=2)
+
+    a = pool.get(make_config(model="a"))
+    pool.get(make_config(model="b"))
+    pool.get(make_config(model="a"))
+    pool.get(make_config(model="c"))
+
+    assert len(pool) == 2
+    assert pool.get(make_config(model="a")) is a
+
+
+def test_idle_llms_are_evicted():
+    pool = LLMPool(lambda **kwargs: object(), idle_ttl=0.01)
+
+    pool.get(make_config(model="a"))
+    time.sleep(0.02)
+    pool.evict_idle()
+
+    assert len(pool) == 0
+
+
+def test_slow_creation_does_not_block_other_models():
+    started = threading.Event()
+    release = threading.Event()
+
+    def factory(**kwargs):
+        if kwargs["model"] == "slow":
+            started.set()
+            release.wait(5)
+        return object()
+
+    pool = LLMPool(factory)
+    slow = threading.Thread(target=pool.get, args=(make_config("slow"),))
+    slow.start()
+    started.wait(5)
+
+    begin = time.monotonic()
+    pool.get(make_config("fast"))
+    assert time.monotonic() - begin < 1
+    release.set()
+    slow.join()
+    assert len(pool) == 2
+
+
+def test_concurrent_first_use_keeps_one_llm():
+    barrier = threading.Barrier(4)
+
+    def factory(**kwargs):
+        return object()
+
+    pool = LLMPool(factory)
+    results = []
+
+    def get():
+        barrier.wait()
+        results.append(pool.get(make_config("shared")))
+
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(llm) for llm in results}) == 1
@@ -0,0 +1,97 @@
+import dataclasses
+from unittest.mock import Mock
+
+import pytest
+
+from model_index import ModelConfig, ModelIndex, normalize_task_type
+
+MODELS = {
+    "fast": "deepseek-coder-6.7b",
+    "balanced": "codellama-7b",
+    "best": "codellama-34b",
+}
+
+
+def select_model(task_type, performance_level="balanced"):
+    if task_type == "unknown":
+        raise ValueError(f"Unknown task type: {task_type}")
+    if task_type == "arabic":
+        model = "jais-13b"
+    else:
+        model = MODELS[performance_level]
+    return {
+        "model": model,
+        "api_key": "hf_test",
+        "base_url": "https://api-inference.huggingface.co",
+        "temperature": 0.1,
+    }
+
+
+@pytest.fixture
+def manager():
+    return Mock(select_model=Mock(side_effect=select_model))
+
+
+def test_candidates_put_default_level_first(manager):
+    index = ModelIndex(manager)
+    models = [config.model for config in index.candidates("code_python")]
+    assert models == ["codellama-7b", "deepseek-coder-6.7b", "codellama-34b"]
+
+
+def test_levels_restrict_candidates(manager):
+    index = ModelIndex(manager, levels=("fast",), default_level="fast")
+    assert [c.model for c in index.candidates("code")] == ["deepseek-coder-6.7b"]
+
+
+def test_task_type_is_resolved_once(manager):
+    index = ModelIndex(manager)
+    first = index.resolve("code_python")
+    calls = manager.select_model.call_count
+
+    assert index.resolve("code_python") is first
+    assert index.resolve("Code-Python") is first
+    assert manager.select_model.call_count == calls
+
+
+def test_identical_configs_are_interned(manager):
+    index = ModelIndex(manager)
+    candidates = index.candidates("arabic")
+
+    assert len(candidates) == 1
+    assert index.resolve("code_python") is not candidates[0]
+    assert index.candidates("code")[0] is index.candidates("code_python")[0]
+
+
+def test_warm_skips_unavailable_task_types(manager):
+    index = ModelIndex(manager)
+    index.warm(["code", "unknown"])
+
+    assert index.resolve("code").model == "codellama-7b"
+    with pytest.raises(ValueError):
+        index.resolve("unknown")
+
+
+def test_model_config_is_frozen():
+    config = ModelConfig("m", "key", "url", 0.5)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.model = "other"
+    assert config.as_dict() == {
+        "model": "m",
+        "api_key": "key",
+        "base_url": "url",
+        "temperature": 0.5,
+    }
+
+
+def test_normalize_task_type():
+    assert normalize_task_type(" Code-Python ") == "code_python"
+    assert normalize_task_type("code python") == "code_python"
+    assert normalize_task_type("عربي") == "عربي"
+
+
+def test_default_level_outside_budget_is_not_used(manager):
+    index = ModelIndex(manager, levels=("fast", "best"))
+    assert [c.model for c in index.candidates("code")] == [
+        "deepseek-coder-6.7b",
+        "codellama-34b",
+    ]
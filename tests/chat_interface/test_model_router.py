@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from model_index import ModelIndex
+from model_router import ModelRouter, ModelStats
+
+MODELS = {
+    "fast": "deepseek-coder-6.7b",
+    "balanced": "codellama-7b",
+    "best": "codellama-34b",
+}
+
+
+class FakeManager:
+    def select_model(self, task_type, performance_level="balanced"):
+        return {
+            "model": MODELS[performance_level],
+            "api_key": "hf_test",
+            "base_url": "https://api-inference.huggingface.co",
+            "temperature": 0.1,
+        }
+
+
+def record_calls(router, model, latency, count=5, ok=True):
+    for i in range(count):
+        router.call_started(model, (model, i))
+        _, started = router._started[(model, i)]
+        router._started[(model, i)] = (model, started - latency)
+        router.call_finished(model, (model, i), ok=ok, tokens=100)
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(ModelIndex(FakeManager()), min_samples=5)
+
+
+def test_preferred_model_is_used_without_statistics(router):
+    assert router.choose("code_python").model == "codellama-7b"
+
+
+def test_faster_model_is_chosen(router):
+    record_calls(router, "codellama-7b", latency=4.0)
+    record_calls(router, "deepseek-coder-6.7b", latency=1.0)
+    record_calls(router, "codellama-34b", latency=8.0)
+
+    assert router.choose("code_python").model == "deepseek-coder-6.7b"
+
+
+def test_similar_latency_keeps_preferred_model(router):
+    record_calls(router, "codellama-7b", latency=1.0)
+    record_calls(router, "deepseek-coder-6.7b", latency=0.9)
+
+    assert router.choose("code_python").model == "codellama-7b"
+
+
+def test_loaded_preferred_model_spills_to_alternatives(router):
+    record_calls(router, "codellama-7b", latency=1.0)
+    for i in range(3):
+        router.call_started("codellama-7b", ("busy", i))
+
+    assert router.choose("code_python").model != "codellama-7b"
+
+
+def test_calls_without_a_finish_event_expire(router):
+    router = ModelRouter(ModelIndex(FakeManager()), min_samples=5, stale_after=0.05)
+    record_calls(router, "codellama-7b", latency=1.0)
+    for i in range(3):
+        router.call_started("codellama-7b", ("cancelled", i))
+    assert router.stats()["codellama-7b"]["inflight"] == 3
+
+    time.sleep(0.06)
+
+    assert router.stats()["codellama-7b"]["inflight"] == 0
+    assert router.choose("code_python").model == "codellama-7b"
+    # a late finish event for an expired call must not decrement again
+    router.call_finished("codellama-7b", ("cancelled", 0))
+    assert router.stats()["codellama-7b"]["calls"] == 5
+
+
+def test_reused_call_id_does_not_leak_inflight(router):
+    router.call_started("codellama-7b", "same")
+    router.call_started("codellama-7b", "same")
+    router.call_finished("codellama-7b", "same")
+
+    assert router.stats()["codellama-7b"]["inflight"] == 0
+
+
+def test_degraded_model_fails_over(router):
+    record_calls(router, "codellama-7b", latency=1.0, ok=False)
+
+    assert router.stats()["codellama-7b"]["available"] is False
+    assert router.choose("code_python").model == "deepseek-coder-6.7b"
+
+
+def test_model_stats():
+    stats = ModelStats(window=3)
+    for latency, ok in [(1.0, True), (2.0, True), (3.0, False), (4.0, True)]:
+        stats.record(latency, ok, tokens=10)
+
+    assert stats.error_rate == pytest.approx(1 / 3)
+    assert stats.p95_latency == 4.0
+    assert stats.tokens_per_second == pytest.approx(20 / 6)
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+
+import pytest
+
+# flows report telemetry on kickoff; keep the tests offline
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+from crewai.flow.flow import listen, router, start
+from crewai.flow.persistence import persist
+from crewai.flow.persistence.sqlite import SQLiteFlowPersistence
+from pydantic import BaseModel
+
+from parallel_flow import BranchConflictError, ParallelFlow
+
+
+class FanOutState(BaseModel):
+    id: str = "fan-out"
+    started: bool = False
+    a: str = ""
+    b: str = ""
+    c: str = ""
+    results: list = []
+    scores: dict = {}
+
+
+class FanOutFlow(ParallelFlow[FanOutState]):
+    @start()
+    def begin(self):
+        self.state.started = True
+
+    @listen(begin)
+    def branch_a(self):
+        time.sleep(0.3)
+        self.state.a = "a"
+        self.state.results.append("a")
+        self.state.scores["a"] = 1
+
+    @listen(begin)
+    def branch_b(self):
+        time.sleep(0.3)
+        self.state.b = "b"
+        self.state.results.append("b")
+        self.state.scores["b"] = 2
+
+    @listen(begin)
+    def branch_c(self):
+        time.sleep(0.3)
+        self.state.c = threading.current_thread().name
+
+
+def test_independent_listeners_run_concurrently():
+    flow = FanOutFlow()
+    start_time = time.perf_counter()
+    flow.kickoff()
+    elapsed = time.perf_counter() - start_time
+
+    assert elapsed < 0.6
+    assert flow.state.started
+    assert (flow.state.a, flow.state.b) == ("a", "b")
+    assert flow.state.c.startswith("flow-method")
+
+
+def test_branches_appending_to_the_same_list_keep_every_item():
+    flow = FanOutFlow()
+    flow.kickoff()
+
+    assert sorted(flow.state.results) == ["a", "b"]
+    assert flow.state.scores == {"a": 1, "b": 2}
+
+
+class ConflictState(BaseModel):
+    winner: str = ""
+
+
+class ConflictFlow(ParallelFlow[ConflictState]):
+    @start()
+    def begin(self):
+        pass
+
+    @listen(begin)
+    def branch_a(self):
+        time.sleep(0.1)
+        self.state.winner = "a"
+
+    @listen(begin)
+    def branch_b(self):
+        time.sleep(0.1)
+        self.state.winner = "b"
+
+
+def test_conflicting_writes_raise():
+    flow = ConflictFlow()
+
+    with pytest.raises(BranchConflictError):
+        flow.kickoff()
+    # only the first branch to finish was merged
+    assert flow.state.winner in ("a", "b")
+
+
+class RoutedFlow(ParallelFlow):
+    @start()
+    def begin(self):
+        self.state["count"] = 1
+        return "ready"
+
+    @router(begin)
+    def choose(self):
+        return "left" if self.state["count"] else "right"
+
+    @listen("left")
+    def on_left(self):
+        self.state["count"] += 1
+        return "left done"
+
+
+def test_routers_and_dict_state_keep_flow_semantics():
+    flow = RoutedFlow()
+
+    assert flow.kickoff() == "left done"
+    assert flow.state["count"] == 2
+
+
+def test_persist_saves_the_merged_state(tmp_path):
+    path = str(tmp_path / "flows.db")
+
+    @persist(persistence=SQLiteFlowPersistence(path))
+    class PersistedFanOutFlow(ParallelFlow[FanOutState]):
+        @start()
+        def begin(self):
+            self.state.started = True
+
+        @listen(begin)
+        def branch_a(self):
+            time.sleep(0.1)
+            self.state.a = "a"
+
+        @listen(begin)
+        def branch_b(self):
+            time.sleep(0.2)
+            self.state.b = "b"
+
+    PersistedFanOutFlow().kickoff()
+
+    # the last branch to finish is saved with the write of the branch that finished before it
+    stored = SQLiteFlowPersistence(path).load_state("fan-out")
+    assert (stored["started"], stored["a"], stored["b"]) == (True, "a", "b")
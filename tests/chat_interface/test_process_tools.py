@@ -0,0 +1,166 @@
+import os
+import pickle
+import time
+
+import pytest
+from crewai.tools import BaseTool
+
+from process_tools import ProcessPoolTool, ProcessToolExecutor, ToolProcessError, ToolTimeoutError
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = ProcessToolExecutor(max_workers=2)
+    executor.warm()
+    yield executor
+    executor.shutdown()
+
+
+class WordCount(ProcessPoolTool):
+    name: str = "word_count"
+    description: str = "counts words"
+    separator: str = " "
+
+    def _run(self, text: str) -> dict:
+        return {"words": len(text.split(self.separator)), "pid": os.getpid(), "instance": id(self)}
+
+
+class Sleeper(ProcessPoolTool):
+    name: str = "sleeper"
+    description: str = "sleeps"
+
+    def _run(self, seconds: float) -> str:
+        time.sleep(seconds)
+        return "awake"
+
+
+class Hog(ProcessPoolTool):
+    name: str = "hog"
+    description: str = "allocates memory"
+
+    def _run(self, megabytes: int) -> int:
+        return len(bytearray(megabytes * 1024 * 1024))
+
+
+def _describe(data):
+    return type(data).__name__, len(data), bytes(data[:3])
+
+
+def _fail():
+    raise KeyError("missing")
+
+
+def test_run_executes_in_a_worker_and_keeps_usage_count(executor):
+    tool = WordCount(separator=",", process_executor=executor)
+
+    result = tool.run(text="a,b,c")
+
+    assert result["words"] == 3
+    assert result["pid"] != os.getpid()
+    assert tool.current_usage_count == 1
+    assert tool.args_schema.model_fields.keys() == {"text"}
+
+
+def test_field_changes_reach_the_worker(executor):
+    tool = WordCount(separator=",", process_executor=executor)
+    assert tool.run(text="a,b,c d")["words"] == 3
+
+    tool.separator = " "
+    assert tool.run(text="a,b,c d")["words"] == 2
+
+
+def test_the_worker_keeps_its_tool_instance_between_calls(executor):
+    tool = WordCount(process_executor=executor)
+    first = tool.run(text="one two")
+    second = tool.run(text="one two three")
+
+    # the usage count changes on every call without rebuilding the tool in the worker
+    assert tool.current_usage_count == 2
+    assert (second["pid"], second["instance"]) == (first["pid"], first["instance"])
+
+
+def test_copies_run_with_their_own_fields(executor):
+    tool = WordCount(separator=",", process_executor=executor)
+    copy = tool.model_copy(update={"separator": " "})
+
+    assert copy.run(text="a b c")["words"] == 3
+    assert tool.run(text="a b c")["words"] == 1
+
+
+def test_unreadable_calls_are_answered_and_the_worker_survives(executor):
+    worker = executor._checkout()
+    worker.conn.send_bytes(b"not a pickle")
+    ok, error = worker.conn.recv()
+    executor._idle.put(worker)
+
+    assert not ok and isinstance(error, ToolProcessError)
+    assert worker.process.is_alive()
+    assert WordCount(process_executor=executor).run(text="still here")["words"] == 2
+
+
+def test_structured_tool_goes_through_the_worker(executor):
+    tool = WordCount(process_executor=executor)
+
+    result = tool.to_structured_tool().invoke({"text": "one two"})
+
+    assert result["words"] == 2
+    assert result["pid"] != os.getpid()
+
+
+def test_large_buffers_pass_through_shared_memory(executor):
+    data = b"abc" * 1024 * 1024
+    payload, blocks, created = executor._dump(_describe, (data,), {"extra": bytearray(data)})
+    for shm in created:
+        shm.close()
+        shm.unlink()
+
+    assert len(payload) < 1024
+    assert len(created) == 2
+    assert executor.call(_describe, (data,)) == ("bytes", len(data), b"abc")
+    assert executor.call(_describe, (bytearray(data),)) == ("bytearray", len(data), b"abc")
+    assert executor.call(_describe, (pickle.PickleBuffer(data),))[1:] == (len(data), b"abc")
+    assert executor.call(_describe, (b"xyz",)) == ("bytes", 3, b"xyz")
+
+
+def test_errors_are_raised_in_the_caller(executor):
+    with pytest.raises(KeyError, match="missing"):
+        executor.call(_fail)
+
+
+def test_timeout_kills_the_worker_and_the_pool_recovers(executor):
+    tool = Sleeper(process_executor=executor, process_timeout=0.2)
+
+    with pytest.raises(ToolTimeoutError):
+        tool.run(seconds=5)
+
+    assert Sleeper(process_executor=executor).run(seconds=0) == "awake"
+    assert tool.current_usage_count == 0
+
+
+@pytest.mark.skipif(os.name != "posix", reason="RLIMIT_AS is POSIX only")
+def test_memory_limit_is_per_call(executor):
+    tool = Hog(process_executor=executor, process_memory_limit=1024 * 1024 * 1024)
+
+    with pytest.raises(MemoryError):
+        tool.run(megabytes=2048)
+
+    assert Hog(process_executor=executor).run(megabytes=64) == 64 * 1024 * 1024
+
+
+def test_shutdown_rejects_new_calls():
+    executor = ProcessToolExecutor(max_workers=1)
+    executor.shutdown()
+
+    with pytest.raises(ToolProcessError):
+        executor.call(_fail)
+
+
+def test_plain_base_tools_are_untouched():
+    class Local(BaseTool):
+        name: str = "local"
+        description: str = "runs in process"
+
+        def _run(self) -> int:
+            return os.getpid()
+
+    assert Local().run() == os.getpid()
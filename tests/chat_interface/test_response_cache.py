@@ -0,0 +1,93 @@
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from response_cache import (
+    ResponseCache,
+    ResponseCacheHitEvent,
+    ResponseCacheMissEvent,
+)
+
+VECTORS = {
+    "what is python?": [1.0, 0.0, 0.0],
+    "what is python": [0.99, 0.1, 0.0],
+    "what is java?": [0.0, 1.0, 0.0],
+}
+
+
+def fake_embedder(texts):
+    return [VECTORS[text] for text in texts]
+
+
+@pytest.fixture
+def semantic_cache():
+    with patch("response_cache.EmbeddingConfigurator") as configurator:
+        configurator.return_value.configure_embedder.return_value = fake_embedder
+        yield ResponseCache(embedder_config={"provider": "openai"}, threshold=0.95)
+
+
+def test_exact_match_is_served_from_cache():
+    cache = ResponseCache()
+    response, key = cache.lookup("mistral-7b", "What is  Python?")
+    assert response is None
+
+    cache.store(key, "A language")
+
+    assert cache.lookup("mistral-7b", "what is python?")[0] == "A language"
+    assert cache.lookup("codellama-7b", "what is python?")[0] is None
+
+
+def test_similar_prompt_is_served_from_cache(semantic_cache):
+    _, key = semantic_cache.lookup("mistral-7b", "What is Python?")
+    semantic_cache.store(key, "A language")
+
+    assert semantic_cache.lookup("mistral-7b", "What is Python")[0] == "A language"
+    assert semantic_cache.lookup("mistral-7b", "What is Java?")[0] is None
+
+
+def test_expired_entries_are_not_served():
+    cache = ResponseCache(ttl=0.01)
+    _, key = cache.lookup("mistral-7b", "hello")
+    cache.store(key, "hi")
+    time.sleep(0.02)
+
+    assert cache.lookup("mistral-7b", "hello")[0] is None
+
+
+def test_cache_size_is_bounded():
+    cache = ResponseCache(max_entries=2)
+    for prompt in ["a", "b", "c"]:
+        _, key = cache.lookup("mistral-7b", prompt)
+        cache.store(key, prompt.upper())
+
+    assert len(cache) == 2
+    assert cache.lookup("mistral-7b", "a")[0] is None
+    assert cache.lookup("mistral-7b", "c")[0] == "C"
+
+
+def test_cache_emits_hit_and_miss_events():
+    hits = Mock()
+    misses = Mock()
+    cache = ResponseCache()
+
+    with crewai_event_bus.scoped_handlers():
+
+        @crewai_event_bus.on(ResponseCacheHitEvent)
+        def on_hit(source, event):
+            hits(event)
+
+        @crewai_event_bus.on(ResponseCacheMissEvent)
+        def on_miss(source, event):
+            misses(event)
+
+        _, key = cache.lookup("mistral-7b", "hello")
+        cache.store(key, "hi")
+        cache.lookup("mistral-7b", "hello")
+
+    assert misses.call_count == 1
+    assert hits.call_count == 1
+    assert hits.call_args[0][0].similarity == 1.0
+    assert hits.call_args[0][0].model == "mistral-7b"
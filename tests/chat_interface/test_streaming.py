@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import pytest
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallType,
+    LLMStreamChunkEvent,
+)
+
+from streaming import (
+    ChunkCoalescer,
+    forward_stream_chunk,
+    resubscribe_chunk_handlers,
+    stream_to,
+    subscribe_chunks,
+)
+
+
+def emit_chunks(*chunks):
+    for chunk in chunks:
+        crewai_event_bus.emit("llm", event=LLMStreamChunkEvent(chunk=chunk))
+
+
+def test_chunks_are_forwarded_only_inside_stream_scope():
+    received = []
+
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(LLMStreamChunkEvent)(forward_stream_chunk)
+
+        emit_chunks("ignored")
+        with stream_to(received.append):
+            emit_chunks("Hello", ", ", "world")
+        emit_chunks("ignored")
+
+    assert "".join(received) == "Hello, world"
+
+
+def test_concurrent_requests_receive_their_own_chunks():
+    first, second = [], []
+
+    async def request(callback, *chunks):
+        with stream_to(callback):
+            await asyncio.to_thread(emit_chunks, *chunks)
+
+    async def main():
+        await asyncio.gather(
+            request(first.append, "a1", "a2"),
+            request(second.append, "b1", "b2"),
+        )
+
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(LLMStreamChunkEvent)(forward_stream_chunk)
+        asyncio.run(main())
+
+    assert first == ["a1", "a2"]
+    assert second == ["b1", "b2"]
+
+
+def emit_call(source, *chunks, failed=False):
+    for chunk in chunks:
+        crewai_event_bus.emit(source, event=LLMStreamChunkEvent(chunk=chunk))
+    if failed:
+        crewai_event_bus.emit(source, event=LLMCallFailedEvent(error="boom"))
+    else:
+        crewai_event_bus.emit(
+            source,
+            event=LLMCallCompletedEvent(
+                response="".join(chunks), call_type=LLMCallType.LLM_CALL
+            ),
+        )
+
+
+def test_coalescer_groups_chunks_by_size_and_keeps_the_text():
+    sent = []
+    coalescer = ChunkCoalescer(sent.append, window=60, max_bytes=4)
+
+    with stream_to(coalescer):
+        for chunk in ["a", "b", "c", "d", "e", "f"]:
+            coalescer(chunk)
+
+    assert sent == ["a", "bcde", "f"]
+
+
+def test_coalescer_sends_the_first_chunk_immediately():
+    sent = []
+    coalescer = ChunkCoalescer(sent.append, window=60, max_bytes=1024)
+
+    coalescer("first")
+    coalescer("second")
+
+    assert sent == ["first"]
+
+
+def test_coalescer_flushes_after_window_without_a_new_chunk():
+    sent = []
+    coalescer = ChunkCoalescer(sent.append, window=0.05, max_bytes=1024)
+
+    coalescer("a")
+    coalescer("b")
+    coalescer("c")
+    deadline = time.monotonic() + 2
+    while len(sent) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert sent == ["a", "bc"]
+    coalescer.flush()
+    assert sent == ["a", "bc"]
+
+
+def test_coalesced_stream_matches_the_response():
+    sent = []
+    chunks = ["مر", "حباً", " بك", "!"] * 50
+
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(LLMStreamChunkEvent)(forward_stream_chunk)
+        with stream_to(ChunkCoalescer(sent.append, window=60, max_bytes=32)):
+            emit_chunks(*chunks)
+
+    assert "".join(sent) == "".join(chunks)
+    assert len(sent) < len(chunks)
+
+
+def test_final_only_subscription_gets_one_event_per_call():
+    seen = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @subscribe_chunks(crewai_event_bus, mode="final_only")
+        def on_chunk(source, event):
+            seen.append(event.chunk)
+
+        emit_call("llm-1", "Hel", "lo")
+        emit_call("llm-2", "Bye", failed=True)
+
+    assert seen == ["Hello", "Bye"]
+
+
+def test_interval_subscription_batches_chunks():
+    seen = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @subscribe_chunks(crewai_event_bus, mode="interval", interval=60)
+        def on_chunk(source, event):
+            seen.append(event.chunk)
+
+        emit_call("llm", "a", "b", "c")
+
+    assert seen == ["abc"]
+
+
+def test_every_chunk_subscription_sees_each_chunk():
+    seen = []
+
+    with crewai_event_bus.scoped_handlers():
+
+        @subscribe_chunks(crewai_event_bus)
+        def on_chunk(source, event):
+            seen.append(event.chunk)
+
+        emit_call("llm", "a", "b")
+
+    assert seen == ["a", "b"]
+
+
+def test_resubscribe_keeps_forwarding_every_chunk():
+    console, forwarded = [], []
+
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(LLMStreamChunkEvent)(forward_stream_chunk)
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def console_handler(source, event):
+            console.append(event.chunk)
+
+        resubscribe_chunk_handlers(crewai_event_bus, "final_only", keep=[forward_stream_chunk])
+        with stream_to(forwarded.append):
+            emit_call("llm", "x", "y")
+
+    assert forwarded == ["x", "y"]
+    assert console == ["xy"]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        subscribe_chunks(crewai_event_bus, mode="sometimes")
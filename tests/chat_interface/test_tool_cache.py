@@ -0,0 +1,113 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from crewai import Agent, Crew, Task
+
+from bulk_kickoff import kickoff_each
+from tool_cache import ToolResultCache, cache_key, use_tool_cache
+
+
+def test_key_ignores_argument_order():
+    assert cache_key("search", {"q": "x", "n": 3}) == cache_key("search", {"n": 3, "q": "x"})
+    assert cache_key("search", {"q": "x"}) != cache_key("scrape", {"q": "x"})
+
+
+def test_results_are_shared_through_the_disk_tier(tmp_path):
+    path = str(tmp_path / "tools.db")
+    writer = ToolResultCache(path=path)
+    writer.add("search", {"q": "crewai"}, "result")
+
+    reader = ToolResultCache(path=path)
+
+    assert reader.read("search", {"q": "crewai"}) == "result"
+    assert reader.read("search", {"q": "other"}) is None
+
+
+def test_per_tool_ttl_and_predicates(tmp_path):
+    cache = ToolResultCache(
+        path=str(tmp_path / "tools.db"),
+        tool_ttl={"clock": 0, "news": 0.05},
+        cacheable={"search": lambda arguments, output: not output.startswith("Error")},
+    )
+    cache.add("clock", {}, "12:00")
+    cache.add("search", {"q": "a"}, "Error: timeout")
+    cache.add("search", {"q": "b"}, "ok")
+    cache.add("news", {}, "headline")
+
+    assert cache.read("clock", {}) is None
+    assert cache.read("search", {"q": "a"}) is None
+    assert cache.read("search", {"q": "b"}) == "ok"
+    assert cache.read("news", {}) == "headline"
+
+    time.sleep(0.06)
+    assert cache.read("news", {}) is None
+    assert ToolResultCache(path=cache.path).read("news", {}) is None
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = ToolResultCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.add("tool", {"name": name}, name)
+    cache.read("tool", {"name": "a"})
+    cache.add("tool", {"name": "c"}, "c")
+
+    assert cache.read("tool", {"name": "a"}) == "a"
+    assert cache.read("tool", {"name": "b"}) is None
+
+
+def test_disk_tier_evicts_least_recently_used_past_max_bytes(tmp_path):
+    cache = ToolResultCache(path=str(tmp_path / "tools.db"), max_entries=1, max_bytes=250)
+    for i in range(3):
+        cache.add("fetch", {"page": i}, "x" * 100)
+        time.sleep(0.01)
+    cache.read("fetch", {"page": 0})
+    cache.evict()
+
+    fresh = ToolResultCache(path=cache.path)
+    assert fresh.read("fetch", {"page": 0}) is not None
+    assert fresh.read("fetch", {"page": 1}) is None
+    assert fresh.read("fetch", {"page": 2}) is not None
+
+
+def test_concurrent_writes_are_all_counted(tmp_path):
+    cache = ToolResultCache(path=str(tmp_path / "tools.db"))
+
+    def write(worker):
+        for i in range(50):
+            cache.add("fetch", {"worker": worker, "page": i}, "ok")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, range(8)))
+
+    assert cache._writes == 400
+    cache.close()
+
+
+def test_crew_agents_use_the_shared_cache():
+    agent = Agent(role="researcher", goal="g", backstory="b", llm="gpt-4o-mini")
+    crew = Crew(agents=[agent], tasks=[Task(description="d", expected_output="o", agent=agent)])
+    cache = ToolResultCache()
+
+    use_tool_cache(crew, cache)
+
+    assert crew._cache_handler is cache
+    assert agent.tools_handler.cache is cache
+
+
+def test_kickoff_each_keeps_the_shared_cache_on_every_copy(monkeypatch):
+    agent = Agent(role="researcher", goal="g", backstory="b", llm="gpt-4o-mini")
+    crew = Crew(agents=[agent], tasks=[Task(description="d", expected_output="o", agent=agent)])
+    cache = ToolResultCache()
+    use_tool_cache(crew, cache)
+    seen = []
+
+    def kickoff(self, inputs=None):
+        seen.append((self, self._cache_handler, self.agents[0].tools_handler.cache))
+        return inputs["n"]
+
+    monkeypatch.setattr(Crew, "kickoff", kickoff)
+    results = list(kickoff_each(crew, [{"n": n} for n in range(3)], max_workers=2))
+
+    assert sorted(result.output for result in results) == [0, 1, 2]
+    assert all(copy is not crew for copy, _, _ in seen)
+    assert all(crew_cache is cache and agent_cache is cache for _, crew_cache, agent_cache in seen)
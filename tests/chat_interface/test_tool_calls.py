@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from crewai.tools import BaseTool, tool
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.tool_usage_events import (
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+from tool_calls import ConcurrentToolLLM, ToolCallRunner
+
+
+class _Overlap:
+    # peak number of tools running at the same moment
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+
+
+_overlap = _Overlap()
+
+
+class SlowTool(BaseTool):
+    name: str = "slow"
+    description: str = "sleeps then echoes"
+
+    def _run(self, text: str) -> str:
+        _overlap.enter()
+        time.sleep(0.2)
+        _overlap.leave()
+        return text.upper()
+
+
+class AsyncTool(BaseTool):
+    name: str = "fetch"
+    description: str = "awaits then echoes"
+
+    async def _run(self, url: str) -> str:
+        _overlap.enter()
+        await asyncio.sleep(0.2)
+        _overlap.leave()
+        return f"fetched {url}"
+
+
+def test_calls_run_concurrently_and_keep_their_order():
+    runner = ToolCallRunner([SlowTool(), AsyncTool()])
+    calls = [("slow", {"text": "a"}), ("fetch", {"url": "x"}), ("slow", {"text": "b"})]
+
+    _overlap.peak = 0
+    results = runner.run(calls)
+
+    assert _overlap.peak == 3
+    assert [result.output for result in results] == ["A", "fetched x", "B"]
+
+
+def test_events_are_emitted_for_every_call():
+    seen = []
+    with crewai_event_bus.scoped_handlers():
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def on_started(source, event):
+            seen.append(("started", event.tool_args["text"]))
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_finished(source, event):
+            seen.append(("finished", event.output))
+
+        ToolCallRunner([SlowTool()]).run([("slow", {"text": "a"}), ("slow", {"text": "b"})])
+
+    assert sorted(seen) == [("finished", "A"), ("finished", "B"), ("started", "a"), ("started", "b")]
+
+
+def test_usage_limit_is_exact_under_concurrency():
+    @tool("counter", max_usage_count=3)
+    def counter(n: int) -> int:
+        """returns n"""
+        time.sleep(0.05)
+        return n
+
+    results = ToolCallRunner([counter]).run([("counter", {"n": i}) for i in range(8)])
+
+    assert sum(result.error is None for result in results) == 3
+    assert counter.current_usage_count == 3
+    assert "usage limit of 3" in results[-1].error
+
+
+def test_usage_limit_is_shared_by_every_runner():
+    @tool("counter", max_usage_count=3)
+    def counter(n: int) -> int:
+        """returns n"""
+        time.sleep(0.05)
+        return n
+
+    runners = [ToolCallRunner([counter]) for _ in range(4)]
+    results = []
+    threads = [
+        threading.Thread(target=lambda runner=runner: results.extend(runner.run([("counter", {"n": 1})] * 2)))
+        for runner in runners
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(result.error is None for result in results) == 3
+    assert counter.current_usage_count == 3
+
+
+def test_arguments_are_validated_before_the_tool_runs():
+    calls = []
+
+    @tool("double")
+    def double(n: int) -> int:
+        """doubles n"""
+        calls.append(n)
+        return n * 2
+
+    results = ToolCallRunner([double]).run([("double", {"n": "21"}), ("double", {"n": "many"})])
+
+    assert results[0].output == 42
+    assert results[1].error.startswith("Arguments validation failed")
+    assert calls == [21]
+    assert double.current_usage_count == 1
+
+
+def test_failed_calls_do_not_count_towards_the_limit():
+    @tool("flaky", max_usage_count=2)
+    def flaky(fail: bool) -> str:
+        """fails on demand"""
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+    results = ToolCallRunner([flaky]).run([("flaky", {"fail": True}), ("flaky", {"fail": False})])
+
+    assert results[0].error == "Tool execution error: boom"
+    assert results[1].output == "ok"
+    assert flaky.current_usage_count == 1
+
+
+def test_run_works_inside_a_running_loop():
+    async def main():
+        return ToolCallRunner({"echo": lambda text: text}).run([("echo", {"text": "hi"})])
+
+    assert asyncio.run(main())[0].output == "hi"
+
+
+def _tool_call(name, arguments):
+    return SimpleNamespace(function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def test_llm_runs_every_tool_call_in_the_response():
+    llm = ConcurrentToolLLM(model="gpt-4o-mini")
+    threads = set()
+
+    def lookup(city):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.1)
+        return f"{city}: sunny"
+
+    response = llm._handle_tool_call(
+        [_tool_call("lookup", '{"city": "Cairo"}'), _tool_call("lookup", '{"city": "Riyadh"}')],
+        {"lookup": lookup},
+    )
+
+    assert response == "Cairo: sunny\n\nRiyadh: sunny"
+    assert all(name.startswith("tool-call") for name in threads)
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from crewai.tools.tool_usage import ToolUsage
+
+from tool_input import INVALID_INPUT_MESSAGE, install_tool_input_parser, parse_tool_input
+
+
+@pytest.mark.parametrize(
+    "text, tier",
+    [
+        ('{"query": "x", "limit": 3}', "json"),
+        ("  {'query': 'x', 'exact': True}", "python"),
+        ('{"query": "x", "limit": 3,}', "python"),
+        ("{query: 'x', limit: 3}", "json5"),
+        ('{"query": "x", "limit": 3', "repair"),
+    ],
+)
+def test_each_dialect_is_parsed_by_its_tier(text, tier):
+    parsed = parse_tool_input(text)
+
+    assert parsed.tier == tier
+    assert parsed.arguments["query"] == "x"
+    assert parsed.seconds >= 0
+
+
+def test_strict_json_skips_every_other_tier():
+    payload = json.dumps({"data": [{"id": i, "name": f"item {i}"} for i in range(1000)]})
+
+    parsed = parse_tool_input(payload)
+
+    assert parsed.attempts == ("json",)
+    assert len(parsed.arguments["data"]) == 1000
+
+
+def test_unquoted_keys_try_json5_before_python():
+    assert parse_tool_input("{query: 'x'}").attempts == ("json", "json5")
+
+
+@pytest.mark.parametrize("text", ["", "   ", "[1, 2]", 42])
+def test_invalid_input_is_rejected(text):
+    with pytest.raises(ValueError):
+        parse_tool_input(text)
+
+
+def test_none_means_no_arguments():
+    assert parse_tool_input(None).arguments == {}
+
+
+def test_installed_parser_records_the_tier_on_tool_usage(monkeypatch):
+    # restored after the test
+    monkeypatch.setattr(ToolUsage, "_validate_tool_input", ToolUsage._validate_tool_input)
+    install_tool_input_parser()
+    install_tool_input_parser()
+    usage = object.__new__(ToolUsage)
+
+    assert usage._validate_tool_input("{'query': 'x'}") == {"query": "x"}
+    assert usage.tool_input_parse.tier == "python"
+    assert not hasattr(ToolUsage._validate_tool_input.__wrapped__, "__wrapped__")
+
+
+@pytest.mark.parametrize("text, emitted", [("   ", []), ("[1, 2]", [INVALID_INPUT_MESSAGE])])
+def test_installed_parser_emits_validation_errors_like_tool_usage(monkeypatch, text, emitted):
+    monkeypatch.setattr(ToolUsage, "_validate_tool_input", ToolUsage._validate_tool_input)
+    install_tool_input_parser()
+    usage = object.__new__(ToolUsage)
+    errors = []
+    usage._emit_validate_input_error = errors.append
+
+    with pytest.raises(Exception, match="valid dictionary"):
+        usage._validate_tool_input(text)
+    assert errors == emitted
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from crewai.utilities.events.crew_events import (
+    CrewKickoffCompletedEvent,
+    CrewKickoffStartedEvent,
+)
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.flow_events import (
+    MethodExecutionFailedEvent,
+    MethodExecutionStartedEvent,
+)
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallStartedEvent,
+    LLMCallType,
+)
+from crewai.utilities.events.tool_usage_events import (
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from tracing import EventTracer
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with crewai_event_bus.scoped_handlers():
+        EventTracer(provider.get_tracer("test")).listen(crewai_event_bus)
+        yield exporter
+
+
+def at(seconds):
+    return START + timedelta(seconds=seconds)
+
+
+def tool_event(event_class, seconds, **fields):
+    return event_class(
+        tool_name="search",
+        tool_args={"query": "x"},
+        timestamp=at(seconds),
+        **fields,
+    )
+
+
+def test_event_pairs_become_nested_spans(exporter):
+    crew, llm = object(), SimpleNamespace(model="mistral-7b")
+    tool_usage = SimpleNamespace(tool_input_parse=SimpleNamespace(tier="python", seconds=0.25))
+    usage = SimpleNamespace(
+        total_tokens=30, prompt_tokens=20, completion_tokens=10,
+        cached_prompt_tokens=0, successful_requests=1,
+    )
+
+    crewai_event_bus.emit(crew, CrewKickoffStartedEvent(crew_name="research", inputs={}, timestamp=at(0)))
+    crewai_event_bus.emit(llm, LLMCallStartedEvent(messages="hi", timestamp=at(1)))
+    crewai_event_bus.emit(llm, LLMCallCompletedEvent(
+        response="12345678", call_type=LLMCallType.LLM_CALL, timestamp=at(2)))
+    crewai_event_bus.emit(tool_usage, tool_event(ToolUsageStartedEvent, 3))
+    crewai_event_bus.emit(tool_usage, tool_event(
+        ToolUsageFinishedEvent, 4, started_at=at(3), finished_at=at(4), from_cache=True, output="ok"))
+    crewai_event_bus.emit(crew, CrewKickoffCompletedEvent(
+        crew_name="research", output=SimpleNamespace(token_usage=usage), timestamp=at(5)))
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    crew_span, llm_span, tool_span = spans["crew research"], spans["llm mistral-7b"], spans["tool search"]
+
+    assert llm_span.parent.span_id == crew_span.context.span_id
+    assert tool_span.parent.span_id == crew_span.context.span_id
+    assert crew_span.end_time - crew_span.start_time == 5_000_000_000
+    assert tool_span.attributes["crewai.from_cache"] is True
+    assert tool_span.attributes["crewai.input_parse_tier"] == "python"
+    assert tool_span.attributes["crewai.input_parse_seconds"] == 0.25
+    assert llm_span.attributes["crewai.estimated_completion_tokens"] == 2
+    assert crew_span.attributes["crewai.total_tokens"] == 30
+
+
+def test_failures_mark_the_span_as_error(exporter):
+    flow = object()
+
+    crewai_event_bus.emit(flow, MethodExecutionStartedEvent(
+        flow_name="pipeline", method_name="fetch", state={}, timestamp=at(0)))
+    crewai_event_bus.emit(flow, MethodExecutionFailedEvent(
+        flow_name="pipeline", method_name="fetch", error=RuntimeError("boom"), timestamp=at(1)))
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "flow.method fetch"
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.events[0].attributes["exception.message"] == "boom"
+
+
+def test_unfinished_children_are_closed_with_their_parent(exporter):
+    crew, llm = object(), SimpleNamespace(model="mistral-7b")
+
+    crewai_event_bus.emit(crew, CrewKickoffStartedEvent(crew_name="c", inputs={}, timestamp=at(0)))
+    crewai_event_bus.emit(llm, LLMCallStartedEvent(messages="hi", timestamp=at(1)))
+    crewai_event_bus.emit(crew, CrewKickoffCompletedEvent(crew_name="c", output=None, timestamp=at(2)))
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert spans["llm mistral-7b"].status.status_code == StatusCode.ERROR
+    assert spans["crew c"].status.status_code == StatusCode.UNSET
+
+
+def test_end_without_start_is_ignored(exporter):
+    crewai_event_bus.emit(object(), CrewKickoffCompletedEvent(crew_name="c", output=None, timestamp=at(0)))
+
+    assert exporter.get_finished_spans() == ()